@@ -0,0 +1,91 @@
+import csv
+import io
+import random
+
+COLUMNS = [
+    "account_id",
+    "account_name",
+    "category",
+    "current_period_amount",
+    "prior_period_amount",
+    "threshold_type",
+    "threshold_value",
+    "je_details",
+    "operational_drivers",
+]
+
+CATEGORIES = [
+    ("1", "Assets", ["Cash", "Receivables", "Inventory", "Prepaids", "Fixed Assets"]),
+    ("2", "Liabilities", ["Payables", "Accrued Expenses", "Deferred Revenue", "Debt"]),
+    ("3", "Equity", ["Common Stock", "Retained Earnings"]),
+    ("4", "Revenue", ["Product Sales", "Service Revenue", "Interest Income"]),
+    ("5", "Cost of Sales", ["Materials", "Freight", "Direct Labor"]),
+    ("6", "Operating Expenses", ["Salaries", "Rent", "Travel", "Software", "Marketing"]),
+]
+
+THRESHOLD_MIXES = {
+    "none": {"": 1.0},
+    "percentage": {"percentage": 1.0},
+    "absolute": {"absolute": 1.0},
+    "mixed": {"percentage": 0.45, "absolute": 0.35, "": 0.2},
+}
+
+_JE_DETAILS = ["Accrual reversal", "Reclass from suspense", "Year-end true-up", "Vendor credit memo"]
+_DRIVERS = ["Volume growth", "Price increase", "Timing of payments", "New contract", "Headcount change"]
+
+
+def generate_ledger(
+    rows: int,
+    seed: int = 0,
+    threshold_mix: str = "mixed",
+    negative_ratio: float = 0.1,
+    empty_ratio: float = 0.05,
+    invalid_ratio: float = 0.01,
+) -> str:
+    if threshold_mix not in THRESHOLD_MIXES:
+        raise ValueError(f"Unknown threshold mix: {threshold_mix}. Use one of: {', '.join(THRESHOLD_MIXES)}.")
+    rng = random.Random(seed)
+    kinds, weights = zip(*THRESHOLD_MIXES[threshold_mix].items())
+
+    def amount(base: float) -> str:
+        roll = rng.random()
+        if roll < empty_ratio:
+            return ""
+        roll -= empty_ratio
+        if roll < invalid_ratio:
+            return rng.choice(["N/A", "-", "#REF!"])
+        value = round(base, 2)
+        if rng.random() < negative_ratio:
+            return f"({value:,.2f})"
+        if rng.random() < 0.3:
+            return f"{value:,.2f}"
+        return f"{value:.2f}"
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for index in range(rows):
+        prefix, category, names = CATEGORIES[index % len(CATEGORIES)]
+        prior = rng.lognormvariate(9, 1.5)
+        current = prior * rng.gauss(1.0, 0.15)
+        threshold_type = rng.choices(kinds, weights)[0]
+        if threshold_type == "percentage":
+            threshold_value = str(rng.choice([5, 10, 15]))
+        elif threshold_type == "absolute":
+            threshold_value = str(rng.choice([1000, 5000, 25000]))
+        else:
+            threshold_value = ""
+        writer.writerow(
+            [
+                f"{prefix}{index // len(CATEGORIES):06d}",
+                f"{rng.choice(names)} {index % 97:02d}",
+                category,
+                amount(current),
+                amount(prior),
+                threshold_type,
+                threshold_value,
+                rng.choice(_JE_DETAILS) if rng.random() < 0.2 else "",
+                rng.choice(_DRIVERS) if rng.random() < 0.3 else "",
+            ]
+        )
+    return buffer.getvalue()
@@ -0,0 +1,311 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any
+
+if __package__ in (None, ""):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from flux_analysis_agent import config
+from flux_analysis_agent.benchmarks.ledger import THRESHOLD_MIXES, generate_ledger
+from flux_analysis_agent.benchmarks.stub_llm import StubLLMServer
+from flux_analysis_agent.benchmarks.timer import StageTimer
+from flux_analysis_agent.core import schema_inference
+from flux_analysis_agent.core.column_profile import profile_table
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.flux_cache import FluxCache
+from flux_analysis_agent.core.llm_manager import LLMManager
+from flux_analysis_agent.tools import flux_agent, get_analysis_result
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+AGENT_QUERY = "Which accounts moved the most and do they exceed their thresholds?"
+
+
+async def run_case(
+    rows: int,
+    threshold_mix: str,
+    timer: StageTimer,
+    llm: LLMManager | None,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    csv_text = generate_ledger(rows, seed=seed, threshold_mix=threshold_mix)
+    input_bytes = len(csv_text.encode("utf-8"))
+    results = [
+        await timer.measure(
+            "parse",
+            lambda _: _new_store().add_data(csv_text),
+            rows=rows,
+            input_bytes=input_bytes,
+        )
+    ]
+
+    store = _new_store()
+    data_id = store.add_data(csv_text)
+    dataset = store.get_data(data_id)
+    columns = dataset["meta"]["columns"]
+    sample_rows = dataset["data"][:5]
+    profile = dataset["meta"]["column_profile"]
+    results.append(await timer.measure("profile", lambda _: profile_table(dataset["table"]), rows=rows))
+    results.append(
+        await timer.measure("schema", lambda _: schema_inference.heuristic_schema(columns, sample_rows, profile))
+    )
+    results.append(
+        await _measure_llm(
+            timer,
+            llm,
+            "schema_llm",
+            lambda _: schema_inference.arequest_schema(columns, sample_rows, llm, profile=profile),
+        )
+    )
+
+    results.append(
+        await timer.measure(
+            "compute",
+            lambda cache: cache.get_flux(data_id),
+            setup=lambda: FluxCache(store),
+            rows=rows,
+        )
+    )
+
+    def warm_cache() -> FluxCache:
+        cache = FluxCache(store)
+        cache.get_flux(data_id)
+        return cache
+
+    async def serialize(cache: FluxCache) -> str:
+        result = await get_analysis_result.handle(data_id, False, store, cache, sort_by="abs_change_amount")
+        return json.dumps(_check(result))
+
+    results.append(await timer.measure("serialize", serialize, setup=warm_cache, rows=rows))
+
+    async def agent(cache: FluxCache) -> dict[str, Any]:
+        return _check(await flux_agent.handle(data_id, AGENT_QUERY, store, llm, cache))
+
+    results.append(await _measure_llm(timer, llm, "agent", agent, setup=warm_cache, rows=rows))
+
+    first_outputs: list[float] = []
+
+    async def agent_stream(cache: FluxCache) -> dict[str, Any]:
+        started = time.perf_counter()
+        first_output: list[float] = []
+
+        async def on_progress(kind: str, message: str) -> None:
+            if kind == "draft" and not first_output:
+                first_output.append(time.perf_counter() - started)
+
+        result = _check(await flux_agent.handle(data_id, AGENT_QUERY, store, llm, cache, on_progress=on_progress))
+        first_outputs.extend(first_output)
+        return result
+
+    result = await _measure_llm(timer, llm, "agent_stream", agent_stream, setup=warm_cache, rows=rows)
+    if first_outputs:
+        result["first_output_seconds"] = min(first_outputs)
+    results.append(result)
+
+    case = f"rows={rows},thresholds={threshold_mix}"
+    for result in results:
+        result["case"] = case
+    return results
+
+
+async def run(
+    row_counts: list[int],
+    threshold_mixes: list[str],
+    repeat: int = 3,
+    track_memory: bool = True,
+    seed: int = 0,
+    stub_latency_seconds: float = 0.0,
+    stub_token_latency_seconds: float = 0.0,
+) -> dict[str, Any]:
+    timer = StageTimer(repeat=repeat, track_memory=track_memory)
+    results: list[dict[str, Any]] = []
+    with StubLLMServer(latency_seconds=stub_latency_seconds, token_latency_seconds=stub_token_latency_seconds) as stub:
+        llm = _stub_llm(stub.url)
+        try:
+            for rows in row_counts:
+                for threshold_mix in threshold_mixes:
+                    results.extend(await run_case(rows, threshold_mix, timer, llm, seed=seed))
+        finally:
+            if llm is not None:
+                await llm.aclose()
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "repeat": repeat,
+            "seed": seed,
+            "stub_latency_seconds": stub_latency_seconds,
+            "stub_token_latency_seconds": stub_token_latency_seconds,
+            "default_threshold_percent": config.DEFAULT_THRESHOLD_PERCENT,
+            "max_rss_bytes": _max_rss_bytes(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float,
+    min_seconds: float = 0.002,
+) -> list[dict[str, Any]]:
+    previous = {(item["case"], item["stage"]): item for item in baseline.get("results", [])}
+    regressions = []
+    for item in report["results"]:
+        base = previous.get((item["case"], item["stage"]))
+        if base is None:
+            continue
+        for metric, floor in (
+            ("seconds", min_seconds),
+            ("first_output_seconds", min_seconds),
+            ("peak_memory_bytes", 64 * 1024),
+        ):
+            current, before = item.get(metric), base.get(metric)
+            if current is None or before is None:
+                continue
+            if current > before * (1 + threshold) and current - before > floor:
+                regressions.append(
+                    {
+                        "case": item["case"],
+                        "stage": item["stage"],
+                        "metric": metric,
+                        "baseline": before,
+                        "current": current,
+                        "change": current / before - 1 if before else None,
+                    }
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ingest, flux computation and the agent loop.")
+    parser.add_argument("--rows", default="1000,10000,100000", help="Comma-separated row counts.")
+    parser.add_argument(
+        "--thresholds",
+        default="mixed",
+        help=f"Comma-separated threshold mixes: {', '.join(THRESHOLD_MIXES)}.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the fastest is reported.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds the stub LLM waits per request.")
+    parser.add_argument(
+        "--stub-token-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the stub LLM waits between streamed tokens.",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass for peak memory.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Allowed slowdown or memory growth over the baseline, as a fraction.",
+    )
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run(
+            [int(rows) for rows in args.rows.split(",") if rows.strip()],
+            [mix.strip() for mix in args.thresholds.split(",") if mix.strip()],
+            repeat=args.repeat,
+            track_memory=not args.no_memory,
+            seed=args.seed,
+            stub_latency_seconds=args.stub_latency,
+            stub_token_latency_seconds=args.stub_token_latency,
+        )
+    )
+    _print_report(report)
+
+    regressions: list[dict[str, Any]] = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            regressions = compare(report, json.load(handle), args.threshold)
+        report["baseline"] = {"path": args.baseline, "threshold": args.threshold, "regressions": regressions}
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['case']} {regression['stage']} {regression['metric']}: "
+                f"{regression['baseline']:.6g} -> {regression['current']:.6g}",
+                file=sys.stderr,
+            )
+
+    _write_json(args.output, report)
+    if args.save_baseline:
+        _write_json(args.baseline, report)
+    return 1 if regressions else 0
+
+
+def _new_store() -> DataStore:
+    return DataStore(data_dir="", max_memory_bytes=0)
+
+
+def _stub_llm(url: str) -> LLMManager | None:
+    try:
+        return LLMManager(api_key="stub", model="stub", api_base=url, max_retries=0)
+    except RuntimeError:
+        return None
+
+
+async def _measure_llm(
+    timer: StageTimer,
+    llm: LLMManager | None,
+    stage: str,
+    func: Any,
+    setup: Any = None,
+    rows: int | None = None,
+) -> dict[str, Any]:
+    if llm is None:
+        return {"stage": stage, "skipped": "The openai package is not installed."}
+    return await timer.measure(stage, func, setup=setup, rows=rows)
+
+
+def _check(result: dict[str, Any]) -> dict[str, Any]:
+    if "error" in result:
+        raise RuntimeError(result["error"]["message"])
+    return result
+
+
+def _max_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    for item in report["results"]:
+        if "skipped" in item:
+            print(f"{item['case']:<32} {item['stage']:<12} skipped: {item['skipped']}")
+            continue
+        line = f"{item['case']:<32} {item['stage']:<12} {item['seconds'] * 1000:10.2f} ms"
+        if item.get("rows_per_second"):
+            line += f" {item['rows_per_second']:14,.0f} rows/s"
+        if item.get("peak_memory_bytes") is not None:
+            line += f" {item['peak_memory_bytes'] / 1e6:9.1f} MB peak"
+        if item.get("first_output_seconds") is not None:
+            line += f" {item['first_output_seconds'] * 1000:9.2f} ms to first output"
+        print(line)
+
+
+def _write_json(path: str, value: Any) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(value, handle, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+class StubLLMServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_seconds: float = 0.0,
+        token_latency_seconds: float = 0.0,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.token_latency_seconds = token_latency_seconds
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def complete(self, request: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            self.requests += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        messages = request.get("messages", [])
+        system_prompt = str(messages[0].get("content") or "") if messages else ""
+        if request.get("tools") and not any(message.get("role") == "tool" for message in messages):
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": f"call_{uuid.uuid4().hex[:12]}",
+                        "type": "function",
+                        "function": {"name": "compute_flux", "arguments": json.dumps({"only_significant": True})},
+                    }
+                ],
+            }
+            finish_reason = "tool_calls"
+        elif "schema" in system_prompt.lower():
+            message = {"role": "assistant", "content": json.dumps(_schema_answer(messages))}
+            finish_reason = "stop"
+        else:
+            tool_bytes = sum(len(message.get("content") or "") for message in messages if message.get("role") == "tool")
+            message = {
+                "role": "assistant",
+                "content": f"Stub analysis based on {tool_bytes} bytes of tool output.",
+            }
+            finish_reason = "stop"
+
+        prompt_bytes = len(json.dumps(messages))
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_bytes // 4,
+                "completion_tokens": 16,
+                "total_tokens": prompt_bytes // 4 + 16,
+            },
+        }
+
+
+def _stream_chunks(response: dict[str, Any], include_usage: bool) -> list[dict[str, Any]]:
+    choice = response["choices"][0]
+    message = choice["message"]
+    deltas: list[dict[str, Any]] = [{"role": "assistant", "content": ""}]
+    content = message.get("content") or ""
+    deltas.extend({"content": word} for word in re.findall(r"\S+\s*|\s+", content))
+    for index, call in enumerate(message.get("tool_calls") or []):
+        deltas.append({"tool_calls": [{"index": index, **call}]})
+
+    base = {key: response[key] for key in ("id", "created", "model")}
+    chunks = [
+        {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+        for delta in deltas
+    ]
+    chunks.append(
+        {
+            **base,
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": {}, "finish_reason": choice["finish_reason"]}],
+        }
+    )
+    if include_usage:
+        chunks.append({**base, "object": "chat.completion.chunk", "choices": [], "usage": response["usage"]})
+    return chunks
+
+
+def _schema_answer(messages: list[dict[str, Any]]) -> dict[str, Any]:
+    prompt = str(messages[-1].get("content", ""))
+    start = prompt.find("columns: ") + len("columns: ")
+    end = prompt.find(". Here are sample rows")
+    columns = [column.strip() for column in prompt[start:end].split(",") if column.strip()]
+    return {
+        "description": "Synthetic trial balance with current and prior period amounts per account.",
+        "column_types": {
+            column: "numeric" if column.endswith("_amount") or column == "threshold_value" else "text"
+            for column in columns
+        },
+    }
+
+
+def _handler(stub: StubLLMServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": f"Unknown path: {self.path}"}})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"error": {"message": "Request body is not valid JSON."}})
+                return
+            response = stub.complete(request)
+            if request.get("stream"):
+                include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+                self._stream(_stream_chunks(response, include_usage))
+            else:
+                self._send(200, response)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            return
+
+        def _send(self, status: int, body: dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, chunks: list[dict[str, Any]]) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            for chunk in chunks:
+                if stub.token_latency_seconds and chunk["choices"] and "content" in chunk["choices"][0]["delta"]:
+                    time.sleep(stub.token_latency_seconds)
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return Handler
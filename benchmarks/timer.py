@@ -0,0 +1,65 @@
+import inspect
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+
+class StageTimer:
+    def __init__(self, repeat: int = 3, track_memory: bool = True) -> None:
+        self.repeat = max(1, repeat)
+        self.track_memory = track_memory
+
+    async def measure(
+        self,
+        stage: str,
+        func: Callable[[Any], Any],
+        setup: Callable[[], Any] | None = None,
+        rows: int | None = None,
+        input_bytes: int | None = None,
+    ) -> dict[str, Any]:
+        timings = []
+        for _ in range(self.repeat):
+            state = setup() if setup is not None else None
+            started = time.perf_counter()
+            await _call(func, state)
+            timings.append(time.perf_counter() - started)
+
+        seconds = min(timings)
+        result: dict[str, Any] = {
+            "stage": stage,
+            "seconds": seconds,
+            "mean_seconds": sum(timings) / len(timings),
+            "repeat": len(timings),
+        }
+        if rows is not None:
+            result["rows"] = rows
+            result["rows_per_second"] = rows / seconds if seconds else None
+        if input_bytes is not None:
+            result["input_bytes"] = input_bytes
+            result["megabytes_per_second"] = input_bytes / seconds / 1e6 if seconds else None
+        if self.track_memory:
+            result["peak_memory_bytes"] = await self._peak_memory(func, setup)
+        return result
+
+    @staticmethod
+    async def _peak_memory(func: Callable[[Any], Any], setup: Callable[[], Any] | None) -> int:
+        state = setup() if setup is not None else None
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            await _call(func, state)
+            return tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+
+async def _call(func: Callable[[Any], Any], state: Any) -> Any:
+    result = func(state)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
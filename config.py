@@ -13,6 +13,49 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
 PORT = int(os.getenv("PORT", "8000"))
+HOST = os.getenv("HOST", "127.0.0.1")
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
 LLM_ENABLED = bool(OPENAI_API_KEY)
 DEFAULT_THRESHOLD_PERCENT = float(os.getenv("DEFAULT_THRESHOLD_PERCENT", "0"))
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
\ No newline at end of file
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+FLUX_CACHE_MAX_MB = float(os.getenv("FLUX_CACHE_MAX_MB", "256"))
+UPLOAD_SESSION_TTL_SECONDS = float(os.getenv("UPLOAD_SESSION_TTL_SECONDS", "3600"))
+DATA_STORE_DIR = os.getenv("DATA_STORE_DIR")
+STORE_MAX_MEMORY_MB = float(os.getenv("STORE_MAX_MEMORY_MB", "0"))
+STORE_SPILL_DIR = os.getenv("STORE_SPILL_DIR")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+SCHEMA_CACHE_PATH = os.getenv(
+    "SCHEMA_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "flux_analysis_agent", "schema_cache.json"),
+)
+SCHEMA_CACHE_TTL_SECONDS = float(os.getenv("SCHEMA_CACHE_TTL_SECONDS", "604800"))
+SCHEMA_CACHE_MAX_ENTRIES = int(os.getenv("SCHEMA_CACHE_MAX_ENTRIES", "500"))
+FLUX_TOOL_PAYLOAD_MAX_TOKENS = int(os.getenv("FLUX_TOOL_PAYLOAD_MAX_TOKENS", "4000"))
+ANSWER_CACHE_PATH = os.getenv(
+    "ANSWER_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "flux_analysis_agent", "answer_cache.json"),
+)
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+AGENT_MAX_TOOL_ROUNDS = int(os.getenv("AGENT_MAX_TOOL_ROUNDS", "4"))
+AGENT_PROGRESS_INTERVAL_SECONDS = float(os.getenv("AGENT_PROGRESS_INTERVAL_SECONDS", "0.1"))
+ROLLUP_PREFIX_LENGTHS = [
+    int(length) for length in os.getenv("ROLLUP_PREFIX_LENGTHS", "").split(",") if length.strip()
+]
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", "0"))
+SHARD_MIN_ROWS = int(os.getenv("SHARD_MIN_ROWS", "500000"))
+METRICS_PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH", "")
+METRICS_PROMETHEUS_INTERVAL_SECONDS = float(os.getenv("METRICS_PROMETHEUS_INTERVAL_SECONDS", "15"))
+METRICS_RESPONSE_SAMPLE_RATE = float(os.getenv("METRICS_RESPONSE_SAMPLE_RATE", "0.1"))
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "flux_analysis_agent", "profiles"),
+)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+MAX_CONCURRENT_TOOL_CALLS = int(os.getenv("MAX_CONCURRENT_TOOL_CALLS", "4"))
+MAX_CONCURRENT_CALLS_PER_CLIENT = int(os.getenv("MAX_CONCURRENT_CALLS_PER_CLIENT", "2"))
+TOOL_QUEUE_TIMEOUT_SECONDS = float(os.getenv("TOOL_QUEUE_TIMEOUT_SECONDS", "60"))
@@ -1,9 +1,302 @@
+import math
+import operator
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
 from typing import Any
 
 from flux_analysis_agent import config
+from flux_analysis_agent.core.columnar import (
+    MISSING,
+    PRESENT,
+    CategoricalColumn,
+    ColumnarTable,
+    NumericColumn,
+    RowView,
+)
+from flux_analysis_agent.core.columnar import parse_float as _to_float
 
+_DEFAULT_RULE = 0
+_NEVER_RULE = 1
+_PERCENTAGE_RULE = 2
+_ABSOLUTE_RULE = 3
+_DISABLE_DEFAULT_RULE = bytes([_NEVER_RULE]) + bytes(range(1, 256))
 
-def compute_flux(data: list[dict[str, Any]], options: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+SORT_KEYS = ("abs_change_amount", "abs_change_percent", "account_id")
+
+
+class FluxColumns:
+    def __init__(
+        self,
+        table: ColumnarTable,
+        rows: array,
+        current: array,
+        prior: array,
+        change_amount: array,
+        change_percent: array,
+        has_percent: bytearray,
+        exceeds: bytearray,
+    ) -> None:
+        self.table = table
+        self.rows = rows
+        self.current = current
+        self.prior = prior
+        self.change_amount = change_amount
+        self.change_percent = change_percent
+        self.has_percent = has_percent
+        self.exceeds = exceeds
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def significant_positions(self) -> list[int]:
+        return [position for position, flag in enumerate(self.exceeds) if flag]
+
+    def sorted_positions(self, sort_by: str) -> array:
+        if sort_by == "abs_change_amount":
+            keys: list[Any] = list(map(abs, self.change_amount))
+            reverse = True
+        elif sort_by == "abs_change_percent":
+            keys = [
+                magnitude if has and magnitude == magnitude else -1.0
+                for magnitude, has in zip(map(abs, self.change_percent), self.has_percent)
+            ]
+            reverse = True
+        elif sort_by == "account_id":
+            keys = [
+                (account_id is None, "" if account_id is None else str(account_id))
+                for account_id in self.table.take("account_id", self.rows)
+            ]
+            reverse = False
+        else:
+            raise ValueError(f"Unsupported sort_by: {sort_by}. Use one of: {', '.join(SORT_KEYS)}.")
+        return array("I", sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse))
+
+    def positions_for_rows(self, rows: Iterable[int]) -> list[int]:
+        flux_rows = self.rows
+        if not flux_rows or flux_rows[-1] == len(flux_rows) - 1:
+            return [row for row in rows if row < len(flux_rows)]
+        positions = []
+        for row in rows:
+            position = bisect_left(flux_rows, row)
+            if position < len(flux_rows) and flux_rows[position] == row:
+                positions.append(position)
+        return positions
+
+    def sort_key(self, sort_by: str) -> Callable[[int], tuple[Any, int]]:
+        if sort_by == "abs_change_amount":
+            change_amount = self.change_amount
+            return lambda position: (-abs(change_amount[position]), position)
+        if sort_by == "abs_change_percent":
+            change_percent = self.change_percent
+            has_percent = self.has_percent
+
+            def percent_key(position: int) -> tuple[Any, int]:
+                magnitude = abs(change_percent[position])
+                if not has_percent[position] or magnitude != magnitude:
+                    magnitude = -1.0
+                return -magnitude, position
+
+            return percent_key
+        if sort_by == "account_id":
+            account_ids = self.table.columns.get("account_id")
+
+            def account_key(position: int) -> tuple[Any, int]:
+                account_id = account_ids.get(self.rows[position]) if account_ids is not None else None
+                return (account_id is None, "" if account_id is None else str(account_id)), position
+
+            return account_key
+        raise ValueError(f"Unsupported sort_by: {sort_by}. Use one of: {', '.join(SORT_KEYS)}.")
+
+    def category_mask(self, categories: set[str]) -> bytearray:
+        return bytearray([category in categories for category in self.table.take("category", self.rows)])
+
+    def to_records(self, positions: Sequence[int] | None = None) -> list[dict[str, Any]]:
+        if positions is None:
+            positions = range(len(self.rows))
+            rows: Sequence[int] = self.rows
+            current: Sequence[float] = self.current
+            prior: Sequence[float] = self.prior
+            change_amount: Sequence[float] = self.change_amount
+        else:
+            rows = [self.rows[position] for position in positions]
+            current = [self.current[position] for position in positions]
+            prior = [self.prior[position] for position in positions]
+            change_amount = [self.change_amount[position] for position in positions]
+
+        change_percent = self.change_percent
+        has_percent = self.has_percent
+        exceeds = self.exceeds
+        percents = [
+            change_percent[position] if has_percent[position] else None
+            for position in positions
+        ]
+        flags = [exceeds[position] == 1 for position in positions]
+
+        table = self.table
+        records = [
+            {
+                "account_id": account_id,
+                "account_name": account_name,
+                "category": category,
+                "current_period_amount": current_amount,
+                "prior_period_amount": prior_amount,
+                "change_amount": change,
+                "change_percent": percent,
+                "exceeds_threshold": flag,
+            }
+            for account_id, account_name, category, current_amount, prior_amount, change, percent, flag in zip(
+                table.take("account_id", rows),
+                table.take("account_name", rows),
+                table.take("category", rows),
+                current,
+                prior,
+                change_amount,
+                percents,
+                flags,
+            )
+        ]
+
+        for name in ("je_details", "operational_drivers"):
+            if name in table.columns:
+                for record, value in zip(records, table.take(name, rows)):
+                    record[name] = value
+
+        return records
+
+
+class PeriodFlux:
+    def __init__(
+        self,
+        table: ColumnarTable,
+        period_columns: list[str],
+        rows: array,
+        amounts: list[array],
+        present: list[bytearray],
+        changes: list[array],
+        change_percents: list[array],
+        has_percents: list[bytearray],
+        exceeds: list[bytearray],
+        valid_pairs: list[bytearray],
+        rolling_window: int,
+        rolling_means: list[array],
+        rolling_present: list[bytearray],
+        change_count: array,
+        mean_change: array,
+        stdev_change: array,
+    ) -> None:
+        self.table = table
+        self.period_columns = period_columns
+        self.rows = rows
+        self.amounts = amounts
+        self.present = present
+        self.changes = changes
+        self.change_percents = change_percents
+        self.has_percents = has_percents
+        self.exceeds = exceeds
+        self.valid_pairs = valid_pairs
+        self.rolling_window = rolling_window
+        self.rolling_means = rolling_means
+        self.rolling_present = rolling_present
+        self.change_count = change_count
+        self.mean_change = mean_change
+        self.stdev_change = stdev_change
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def significant_positions(self) -> list[int]:
+        if not self.exceeds:
+            return []
+        flags = self.exceeds[0]
+        for pair_flags in self.exceeds[1:]:
+            flags = bytes(map(operator.or_, flags, pair_flags))
+        return [position for position, flag in enumerate(flags) if flag]
+
+    def to_records(self, positions: Sequence[int] | None = None) -> list[dict[str, Any]]:
+        if positions is None:
+            positions = range(len(self.rows))
+        rows = [self.rows[position] for position in positions]
+        table = self.table
+        pairs = range(len(self.changes))
+        records = []
+        for position, account_id, account_name, category in zip(
+            positions,
+            table.take("account_id", rows),
+            table.take("account_name", rows),
+            table.take("category", rows),
+        ):
+            count = self.change_count[position]
+            records.append(
+                {
+                    "account_id": account_id,
+                    "account_name": account_name,
+                    "category": category,
+                    "amounts": [
+                        values[position] if flags[position] else None
+                        for values, flags in zip(self.amounts, self.present)
+                    ],
+                    "changes": [
+                        values[position] if flags[position] else None
+                        for values, flags in zip(self.changes, self.valid_pairs)
+                    ],
+                    "change_percents": [
+                        values[position] if flags[position] else None
+                        for values, flags in zip(self.change_percents, self.has_percents)
+                    ],
+                    "exceeds": [pair for pair in pairs if self.exceeds[pair][position]],
+                    "rolling_mean": [
+                        values[position] if flags[position] else None
+                        for values, flags in zip(self.rolling_means, self.rolling_present)
+                    ],
+                    "mean_change": self.mean_change[position] if count else None,
+                    "stdev_change": self.stdev_change[position] if count else None,
+                }
+            )
+        return records
+
+
+def group_totals(
+    flux: FluxColumns,
+    keys: Sequence[Any],
+    positions: Sequence[int] | None = None,
+    label: str = "key",
+) -> list[dict[str, Any]]:
+    if positions is None:
+        current_values: Iterable[float] = flux.current
+        prior_values: Iterable[float] = flux.prior
+        flags: Iterable[int] = flux.exceeds
+    else:
+        current_values = map(flux.current.__getitem__, positions)
+        prior_values = map(flux.prior.__getitem__, positions)
+        flags = map(flux.exceeds.__getitem__, positions)
+
+    totals: dict[Any, list[Any]] = {}
+    for key, current, prior, flag in zip(keys, current_values, prior_values, flags):
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = [0, 0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += flag
+        entry[2] += current
+        entry[3] += prior
+
+    summary = [
+        {
+            label: key,
+            "count": count,
+            "significant_count": significant,
+            "current_period_amount": current,
+            "prior_period_amount": prior,
+            "change_amount": current - prior,
+        }
+        for key, (count, significant, current, prior) in totals.items()
+    ]
+    summary.sort(key=lambda item: abs(item["change_amount"]), reverse=True)
+    return summary
+
+
+def compute_flux(data: Sequence[dict[str, Any]], options: dict[str, Any] | None = None) -> list[dict[str, Any]]:
     only_significant = False
     default_threshold_percent = config.DEFAULT_THRESHOLD_PERCENT
     if options:
@@ -12,6 +305,22 @@ def compute_flux(data: list[dict[str, Any]], options: dict[str, Any] | None = No
             options.get("default_threshold_percent", default_threshold_percent)
         )
 
+    if options and options.get("period_columns"):
+        table = data.table if isinstance(data, RowView) else _table_from_rows(data)
+        period_flux = compute_period_flux(
+            table,
+            options["period_columns"],
+            default_threshold_percent,
+            int(options.get("rolling_window", 3)),
+        )
+        return period_flux.to_records(period_flux.significant_positions() if only_significant else None)
+
+    if isinstance(data, RowView):
+        flux = compute_flux_columns(data.table, default_threshold_percent)
+        if only_significant:
+            return flux.to_records(flux.significant_positions())
+        return flux.to_records()
+
     results: list[dict[str, Any]] = []
 
     for row in data:
@@ -57,23 +366,265 @@ def compute_flux(data: list[dict[str, Any]], options: dict[str, Any] | None = No
     return results
 
 
-def _to_float(value: Any) -> float | None:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = value.strip()
-        if not cleaned:
-            return None
-        cleaned = cleaned.replace(",", "")
-        if cleaned.startswith("(") and cleaned.endswith(")"):
-            cleaned = f"-{cleaned[1:-1]}"
-        try:
-            return float(cleaned)
-        except ValueError:
-            return None
-    return None
+def compute_flux_columns(
+    table: ColumnarTable,
+    default_threshold_percent: float,
+    start: int = 0,
+) -> FluxColumns:
+    current_column = table.columns.get("current_period_amount")
+    prior_column = table.columns.get("prior_period_amount")
+    if not isinstance(current_column, NumericColumn) or not isinstance(prior_column, NumericColumn):
+        return FluxColumns(
+            table, array("I"), array("d"), array("d"), array("d"), array("d"), bytearray(), bytearray()
+        )
+
+    row_count = len(table)
+    combined = bytes(map(operator.or_, current_column.states[start:], prior_column.states[start:]))
+    if start == 0 and combined.count(PRESENT) == row_count:
+        rows = array("I", range(row_count))
+        current = array("d", current_column.values)
+        prior = array("d", prior_column.values)
+    else:
+        rows = array("I", [start + index for index, state in enumerate(combined) if state == PRESENT])
+        current_values = current_column.values
+        prior_values = prior_column.values
+        current = array("d", map(current_values.__getitem__, rows))
+        prior = array("d", map(prior_values.__getitem__, rows))
+
+    return _flux_from_amounts(table, rows, current, prior, default_threshold_percent)
+
+
+def compute_flux_for_rows(
+    table: ColumnarTable,
+    rows: Sequence[int],
+    default_threshold_percent: float,
+) -> FluxColumns:
+    current_column = table.columns.get("current_period_amount")
+    prior_column = table.columns.get("prior_period_amount")
+    if not isinstance(current_column, NumericColumn) or not isinstance(prior_column, NumericColumn):
+        return FluxColumns(
+            table, array("I"), array("d"), array("d"), array("d"), array("d"), bytearray(), bytearray()
+        )
+
+    current_states = current_column.states
+    prior_states = prior_column.states
+    present = array(
+        "I", [row for row in rows if current_states[row] | prior_states[row] == PRESENT]
+    )
+    current = array("d", map(current_column.values.__getitem__, present))
+    prior = array("d", map(prior_column.values.__getitem__, present))
+    return _flux_from_amounts(table, present, current, prior, default_threshold_percent)
+
+
+def _flux_from_amounts(
+    table: ColumnarTable,
+    rows: array,
+    current: array,
+    prior: array,
+    default_threshold_percent: float,
+) -> FluxColumns:
+    change_amount = array("d", map(operator.sub, current, prior))
+    has_percent = bytearray(map(bool, prior))
+    change_percent = array(
+        "d",
+        [
+            (change / base) * 100.0 if base != 0 else 0.0
+            for change, base in zip(change_amount, prior)
+        ],
+    )
+
+    rules, thresholds = _threshold_rules(table, rows)
+    if default_threshold_percent <= 0:
+        rules = rules.translate(_DISABLE_DEFAULT_RULE)
+    exceeds = _exceeds_flags(
+        rules, thresholds, change_amount, change_percent, has_percent, default_threshold_percent
+    )
+
+    return FluxColumns(table, rows, current, prior, change_amount, change_percent, has_percent, exceeds)
+
+
+def compute_period_flux(
+    table: ColumnarTable,
+    period_columns: Sequence[str],
+    default_threshold_percent: float,
+    rolling_window: int = 3,
+) -> PeriodFlux:
+    missing = [name for name in period_columns if name not in table.columns]
+    if missing:
+        raise ValueError(f"Unknown period columns: {', '.join(missing)}.")
+    if len(period_columns) < 2:
+        raise ValueError("At least two period columns are required.")
+    rolling_window = max(1, rolling_window)
+
+    parsed = [_numeric_values(table.columns[name]) for name in period_columns]
+    any_present = bytes(len(table))
+    for _, states in parsed:
+        any_present = bytes(map(operator.or_, any_present, states))
+    rows = array("I", [index for index, flag in enumerate(any_present) if flag])
+    amounts = [array("d", map(values.__getitem__, rows)) for values, _ in parsed]
+    present = [bytearray(map(states.__getitem__, rows)) for _, states in parsed]
+
+    rules, thresholds = _threshold_rules(table, rows)
+    if default_threshold_percent <= 0:
+        rules = rules.translate(_DISABLE_DEFAULT_RULE)
+
+    changes: list[array] = []
+    change_percents: list[array] = []
+    has_percents: list[bytearray] = []
+    exceeds: list[bytearray] = []
+    valid_pairs: list[bytearray] = []
+    for earlier, later, earlier_present, later_present in zip(amounts, amounts[1:], present, present[1:]):
+        valid = bytearray(map(operator.and_, earlier_present, later_present))
+        change_amount = array("d", map(operator.mul, map(operator.sub, later, earlier), valid))
+        has_percent = bytearray(map(operator.and_, valid, map(bool, earlier)))
+        change_percent = array(
+            "d",
+            [
+                (change / base) * 100.0 if has else 0.0
+                for change, base, has in zip(change_amount, earlier, has_percent)
+            ],
+        )
+        flags = _exceeds_flags(
+            rules, thresholds, change_amount, change_percent, has_percent, default_threshold_percent
+        )
+        changes.append(change_amount)
+        change_percents.append(change_percent)
+        has_percents.append(has_percent)
+        exceeds.append(bytearray(map(operator.and_, flags, valid)))
+        valid_pairs.append(valid)
+
+    rolling_means: list[array] = []
+    rolling_present: list[bytearray] = []
+    window_sum = array("d", bytes(8 * len(rows)))
+    window_count = array("I", bytes(4 * len(rows)))
+    for index, (values, flags) in enumerate(zip(amounts, present)):
+        window_sum = array("d", map(operator.add, window_sum, map(operator.mul, values, flags)))
+        window_count = array("I", map(operator.add, window_count, flags))
+        if index >= rolling_window:
+            dropped_values = amounts[index - rolling_window]
+            dropped_flags = present[index - rolling_window]
+            window_sum = array("d", map(operator.sub, window_sum, map(operator.mul, dropped_values, dropped_flags)))
+            window_count = array("I", map(operator.sub, window_count, dropped_flags))
+        rolling_means.append(
+            array("d", [total / count if count else 0.0 for total, count in zip(window_sum, window_count)])
+        )
+        rolling_present.append(bytearray(map(bool, window_count)))
+
+    change_count = array("I", bytes(4 * len(rows)))
+    change_sum = array("d", bytes(8 * len(rows)))
+    change_squares = array("d", bytes(8 * len(rows)))
+    for change_amount, valid in zip(changes, valid_pairs):
+        change_count = array("I", map(operator.add, change_count, valid))
+        change_sum = array("d", map(operator.add, change_sum, change_amount))
+        change_squares = array("d", map(operator.add, change_squares, map(operator.mul, change_amount, change_amount)))
+    mean_change = array("d", [total / count if count else 0.0 for total, count in zip(change_sum, change_count)])
+    stdev_change = array(
+        "d",
+        [
+            math.sqrt(max(0.0, squares / count - mean * mean)) if count else 0.0
+            for squares, mean, count in zip(change_squares, mean_change, change_count)
+        ],
+    )
+
+    return PeriodFlux(
+        table,
+        list(period_columns),
+        rows,
+        amounts,
+        present,
+        changes,
+        change_percents,
+        has_percents,
+        exceeds,
+        valid_pairs,
+        rolling_window,
+        rolling_means,
+        rolling_present,
+        change_count,
+        mean_change,
+        stdev_change,
+    )
+
+
+def _table_from_rows(data: Sequence[dict[str, Any]]) -> ColumnarTable:
+    columns = list(dict.fromkeys(name for row in data for name in row))
+    table = ColumnarTable(columns)
+    for row in data:
+        table.append_values([row.get(name) for name in columns])
+    table.freeze()
+    return table
+
+
+def _numeric_values(column: NumericColumn | CategoricalColumn) -> tuple[Sequence[float], bytes]:
+    if isinstance(column, NumericColumn):
+        return column.values, bytes([state == PRESENT for state in column.states])
+    parsed = [_to_float(value) for value in column.dictionary]
+    values = [0.0 if number is None else number for number in parsed]
+    flags = bytes([number is not None for number in parsed])
+    codes = column.codes
+    return array("d", map(values.__getitem__, codes)), bytes(map(flags.__getitem__, codes))
+
+
+def _exceeds_flags(
+    rules: bytes,
+    thresholds: Sequence[float],
+    change_amount: Sequence[float],
+    change_percent: Sequence[float],
+    has_percent: Sequence[int],
+    default_threshold_percent: float,
+) -> bytearray:
+    return bytearray(
+        [
+            abs_change >= threshold
+            if rule == _ABSOLUTE_RULE
+            else has and abs_percent >= threshold
+            if rule == _PERCENTAGE_RULE
+            else has and abs_percent >= default_threshold_percent
+            if rule == _DEFAULT_RULE
+            else False
+            for rule, threshold, abs_change, abs_percent, has in zip(
+                rules,
+                thresholds,
+                map(abs, change_amount),
+                map(abs, change_percent),
+                has_percent,
+            )
+        ]
+    )
+
+
+def _threshold_rules(table: ColumnarTable, rows: Sequence[int]) -> tuple[bytes, Sequence[float]]:
+    type_column = table.columns.get("threshold_type")
+    value_column = table.columns.get("threshold_value")
+    if type_column is None or not isinstance(value_column, NumericColumn):
+        return bytes(len(rows)), bytes(len(rows))
+
+    threshold_types = type_column.take(rows)
+    explicit_rules = {
+        threshold_type: _explicit_rule(threshold_type) for threshold_type in set(threshold_types)
+    }
+    states = value_column.states
+    values = value_column.values
+    rules = bytes(
+        [
+            _DEFAULT_RULE
+            if not threshold_type or state == MISSING
+            else explicit_rules[threshold_type]
+            if state == PRESENT
+            else _NEVER_RULE
+            for threshold_type, state in zip(threshold_types, map(states.__getitem__, rows))
+        ]
+    )
+    return rules, list(map(values.__getitem__, rows))
+
+
+def _explicit_rule(threshold_type: Any) -> int:
+    threshold_type_normalized = str(threshold_type).strip().lower()
+    if threshold_type_normalized == "percentage":
+        return _PERCENTAGE_RULE
+    if threshold_type_normalized == "absolute":
+        return _ABSOLUTE_RULE
+    return _NEVER_RULE
 
 
 def _exceeds_threshold(
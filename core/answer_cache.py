@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from flux_analysis_agent import config
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.;:,]+$")
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        if path is None:
+            path = config.ANSWER_CACHE_PATH
+        if ttl_seconds is None:
+            ttl_seconds = config.ANSWER_CACHE_TTL_SECONDS
+        if max_entries is None:
+            max_entries = config.ANSWER_CACHE_MAX_ENTRIES
+        self._path = path or None
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._save_pending = False
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._load()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry["answer"])
+
+    def put(self, key: str, answer: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = {"answer": dict(answer), "stored_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            if not self._path or self._save_pending:
+                return
+            self._save_pending = True
+        threading.Thread(target=self._save, name="answer-cache-writer", daemon=True).start()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[dict[str, Any]]],
+        on_wait: Callable[[], Awaitable[None]] | None = None,
+    ) -> tuple[dict[str, Any], str]:
+        answer = self.get(key)
+        if answer is not None:
+            self.hits += 1
+            return answer, "hit"
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            if on_wait is not None:
+                await on_wait()
+            return dict(await asyncio.shield(in_flight)), "coalesced"
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._compute(key, compute))
+        self._in_flight[key] = task
+        return dict(await asyncio.shield(task)), "miss"
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": entries,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[dict[str, Any]]]) -> dict[str, Any]:
+        try:
+            answer = await compute()
+            if "error" not in answer:
+                self.put(key, answer)
+            return answer
+        finally:
+            self._in_flight.pop(key, None)
+
+    def _expired(self, entry: dict[str, Any]) -> bool:
+        if self._ttl_seconds <= 0:
+            return False
+        return time.time() - entry.get("stored_at", 0) > self._ttl_seconds
+
+    def _load(self) -> None:
+        if not self._path:
+            return
+        try:
+            with open(self._path, "r", encoding="utf-8") as handle:
+                stored = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if not isinstance(stored, dict):
+            return
+        entries = sorted(stored.items(), key=lambda item: item[1].get("stored_at", 0))
+        for key, entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get("answer"), dict) and not self._expired(entry):
+                self._entries[key] = entry
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                self._save_pending = False
+                entries = dict(self._entries)
+            try:
+                directory = os.path.dirname(os.path.abspath(self._path))
+                os.makedirs(directory, exist_ok=True)
+                temp_path = f"{self._path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as handle:
+                    json.dump(entries, handle)
+                os.replace(temp_path, self._path)
+            except Exception:
+                logger.exception("Failed to save the answer cache to %s", self._path)
+
+
+def normalize_query(query: str) -> str:
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def answer_key(content: str, query: str, threshold_percent: float, model: str) -> str:
+    payload = json.dumps(
+        {
+            "content": content,
+            "query": normalize_query(query),
+            "threshold_percent": float(threshold_percent),
+            "model": model,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,31 @@
+from typing import Any
+
+from flux_analysis_agent.core.analysis_engine import compute_flux_columns
+from flux_analysis_agent.core.disk_store import DiskStore
+
+
+def analyze_dataset(job: dict[str, Any]) -> dict[str, Any]:
+    table = job["table"]
+    if table is None:
+        table = DiskStore(job["disk_root"]).open(job["storage_id"])
+        if table is None:
+            raise ValueError("No dataset found for the given data_id.")
+
+    flux = compute_flux_columns(table, job["default_threshold_percent"])
+    if job["sort_by"]:
+        positions: list[int] = list(flux.sorted_positions(job["sort_by"]))
+    else:
+        positions = list(range(len(flux)))
+    if job["only_significant"]:
+        exceeds = flux.exceeds
+        positions = [position for position in positions if exceeds[position]]
+
+    top_k = job["top_k"]
+    return {
+        "data_id": job["data_id"],
+        "row_count": len(table),
+        "total_accounts": len(flux),
+        "significant_accounts": flux.exceeds.count(1),
+        "matching_count": len(positions),
+        "variances": flux.to_records(positions if top_k is None else positions[:top_k]),
+    }
@@ -0,0 +1,123 @@
+import math
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from itertools import compress
+from typing import Any
+
+from flux_analysis_agent.core.columnar import (
+    EMPTY,
+    MISSING,
+    PRESENT,
+    CategoricalColumn,
+    ColumnarTable,
+    NumericColumn,
+    parse_float,
+)
+
+_DISTINCT_SAMPLE_SIZE = 65536
+_PRESENT_MASK = bytes(int(state == PRESENT) for state in range(256))
+_NUMBER_BYTES = b"0123456789.,_+-()eE \t\r\f\v"
+_LOWERCASE = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
+_NUMBER_WORDS = frozenset({b"", b"inf", b"infinity", b"nan"})
+
+
+def profile_table(table: ColumnarTable) -> dict[str, dict[str, Any]]:
+    return {name: profile_column(column, len(table)) for name, column in table.columns.items()}
+
+
+def profile_column(column: NumericColumn | CategoricalColumn, row_count: int) -> dict[str, Any]:
+    if isinstance(column, NumericColumn):
+        return _profile_numeric(column, row_count)
+    return _profile_categorical(column, row_count)
+
+
+def _profile_numeric(column: NumericColumn, row_count: int) -> dict[str, Any]:
+    values = column.values
+    states = column.states if isinstance(column.states, bytearray) else bytearray(column.states)
+    present = states.count(PRESENT)
+    nulls = states.count(EMPTY) + states.count(MISSING)
+    profile = _summary(row_count, nulls, present, _estimate_distinct(values, states, present))
+    if present:
+        bounds = _bounds(values)
+        if present != len(values) and 0.0 in bounds.values():
+            bounds = _bounds(array("d", compress(values, states.translate(_PRESENT_MASK))))
+        profile.update(bounds)
+    return profile
+
+
+def _profile_categorical(column: CategoricalColumn, row_count: int) -> dict[str, Any]:
+    dictionary = column.dictionary
+    codes = column.codes if hasattr(column.codes, "count") else column.codes.tolist()
+    null_codes = [code for code in (_find(dictionary, None), _find(dictionary, "")) if code is not None]
+    parsed = {code: parse_float(dictionary[code]) for code in _numeric_candidates(dictionary, null_codes)}
+    numeric_codes = [code for code, number in parsed.items() if number is not None]
+    text_codes = len(dictionary) - len(null_codes) - len(numeric_codes)
+
+    nulls = sum(map(codes.count, null_codes))
+    if not text_codes:
+        numeric_rows = row_count - nulls
+    elif not numeric_codes:
+        numeric_rows = 0
+    elif len(numeric_codes) <= 16:
+        numeric_rows = sum(map(codes.count, numeric_codes))
+    else:
+        counts = Counter(codes)
+        numeric_rows = sum(map(counts.__getitem__, numeric_codes))
+
+    profile = _summary(row_count, nulls, numeric_rows, len(dictionary) - len(null_codes))
+    profile.update(_bounds([number for number in parsed.values() if number is not None]))
+    return profile
+
+
+def _numeric_candidates(dictionary: list[Any], null_codes: list[int]) -> range | list[int]:
+    values = list(dictionary) if null_codes else dictionary
+    for code in null_codes:
+        values[code] = "null"
+    text = "\n".join(values)
+    encoded = text.encode("utf-8", "surrogatepass")
+    if not encoded.isascii() or text.count("\n") != len(values) - 1:
+        return range(len(values))
+    residues = b"\n" + encoded.translate(_LOWERCASE, _NUMBER_BYTES) + b"\n"
+    if not any(b"\n" + word + b"\n" in residues for word in _NUMBER_WORDS):
+        return []
+    return list(compress(range(len(values)), map(_NUMBER_WORDS.__contains__, residues[1:-1].split(b"\n"))))
+
+
+def _find(dictionary: list[Any], value: Any) -> int | None:
+    try:
+        return dictionary.index(value)
+    except ValueError:
+        return None
+
+
+def _summary(row_count: int, nulls: int, numeric_rows: int, distinct: int) -> dict[str, Any]:
+    values = row_count - nulls
+    return {
+        "numeric_rate": round(numeric_rows / values, 4) if values else 0.0,
+        "null_ratio": round(nulls / row_count, 4) if row_count else 0.0,
+        "distinct": distinct,
+    }
+
+
+def _bounds(numbers: Sequence[float]) -> dict[str, float]:
+    if not numbers:
+        return {}
+    low, high = min(numbers), max(numbers)
+    if math.isnan(low) or math.isnan(high):
+        numbers = [number for number in numbers if not math.isnan(number)]
+        if not numbers:
+            return {}
+        low, high = min(numbers), max(numbers)
+    return {"min": low, "max": high}
+
+
+def _estimate_distinct(values: Sequence[float], states: bytearray, present: int) -> int:
+    if present <= _DISTINCT_SAMPLE_SIZE:
+        return len(set(compress(values, states.translate(_PRESENT_MASK))))
+    step = len(values) // _DISTINCT_SAMPLE_SIZE
+    sample = list(compress(values[::step], states[::step].translate(_PRESENT_MASK)))
+    frequencies = Counter(Counter(sample).values())
+    singletons = frequencies.pop(1, 0)
+    estimate = math.sqrt(present / max(1, len(sample))) * singletons + sum(frequencies.values())
+    return min(present, round(estimate))
@@ -0,0 +1,319 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from typing import Any, overload
+
+NUMERIC_COLUMNS = frozenset({"current_period_amount", "prior_period_amount", "threshold_value"})
+
+PRESENT = 0
+EMPTY = 1
+MISSING = 2
+INVALID = 3
+
+
+def parse_float(value: Any) -> float | None:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        cleaned = value.strip()
+        if not cleaned:
+            return None
+        cleaned = cleaned.replace(",", "")
+        if cleaned.startswith("(") and cleaned.endswith(")"):
+            cleaned = f"-{cleaned[1:-1]}"
+        try:
+            return float(cleaned)
+        except ValueError:
+            return None
+    return None
+
+
+class NumericColumn:
+    def __init__(
+        self,
+        values: Sequence[float] | None = None,
+        states: Sequence[int] | None = None,
+        texts: dict[int, str] | None = None,
+    ) -> None:
+        self.values = values if values is not None else array("d")
+        self.states = states if states is not None else bytearray()
+        self._texts: dict[int, str] = texts if texts is not None else {}
+
+    @property
+    def texts(self) -> dict[int, str]:
+        return self._texts
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, value: Any) -> None:
+        number, state = self._encode(len(self.values), value)
+        self.values.append(number)
+        self.states.append(state)
+
+    def set(self, index: int, value: Any) -> None:
+        self._texts.pop(index, None)
+        self.values[index], self.states[index] = self._encode(index, value)
+
+    def delete_rows(self, rows: Sequence[int]) -> None:
+        for index in sorted(rows, reverse=True):
+            del self.values[index]
+            del self.states[index]
+        if self._texts:
+            deleted = sorted(rows)
+            self._texts = {
+                index - bisect_left(deleted, index): text
+                for index, text in self._texts.items()
+                if not _contains(deleted, index)
+            }
+
+    def make_writable(self) -> None:
+        if isinstance(self.values, memoryview):
+            values = array("d")
+            values.frombytes(self.values.cast("B"))
+            self.values = values
+        if isinstance(self.states, memoryview):
+            self.states = bytearray(self.states)
+
+    def copy(self) -> "NumericColumn":
+        return NumericColumn(_copy_buffer(self.values, "d"), bytearray(self.states), dict(self._texts))
+
+    def _encode(self, index: int, value: Any) -> tuple[float, int]:
+        if value is None:
+            return 0.0, MISSING
+        if value == "":
+            return 0.0, EMPTY
+        number = parse_float(value)
+        if number is None:
+            self._texts[index] = str(value)
+            return 0.0, INVALID
+        if isinstance(value, str) and value != _number_text(number):
+            self._texts[index] = value
+        return number, PRESENT
+
+    def get(self, index: int) -> Any:
+        state = self.states[index]
+        if state == PRESENT:
+            text = self._texts.get(index)
+            return _number_text(self.values[index]) if text is None else text
+        if state == EMPTY:
+            return ""
+        if state == INVALID:
+            return self._texts[index]
+        return None
+
+    def take(self, rows: Sequence[int]) -> list[Any]:
+        return list(map(self.get, rows))
+
+    def parsed(self) -> list[float | None]:
+        return [
+            value if state == PRESENT else None
+            for value, state in zip(self.values, self.states)
+        ]
+
+    def nbytes(self) -> int:
+        texts = sum(len(text) + 50 for text in self._texts.values())
+        return _heap_bytes(self.values) + _heap_bytes(self.states) + texts
+
+    def mapped_nbytes(self) -> int:
+        return _mapped_bytes(self.values) + _mapped_bytes(self.states)
+
+
+class CategoricalColumn:
+    def __init__(self, codes: Sequence[int] | None = None, dictionary: list[Any] | None = None) -> None:
+        self.codes = codes if codes is not None else array("I")
+        self.dictionary: list[Any] = dictionary if dictionary is not None else []
+        self._lookup: dict[Any, int] | None = None if codes is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def append(self, value: Any) -> None:
+        self.codes.append(self._code(value))
+
+    def _code(self, value: Any) -> int:
+        lookup = self._lookup
+        if lookup is None:
+            lookup = self._lookup = {item: code for code, item in enumerate(self.dictionary)}
+        code = lookup.get(value)
+        if code is None:
+            code = len(self.dictionary)
+            lookup[value] = code
+            self.dictionary.append(value)
+        return code
+
+    def get(self, index: int) -> Any:
+        return self.dictionary[self.codes[index]]
+
+    def set(self, index: int, value: Any) -> None:
+        self.codes[index] = self._code(value)
+
+    def delete_rows(self, rows: Sequence[int]) -> None:
+        for index in sorted(rows, reverse=True):
+            del self.codes[index]
+
+    def make_writable(self) -> None:
+        if isinstance(self.codes, memoryview):
+            codes = array("I")
+            codes.frombytes(self.codes.cast("B"))
+            self.codes = codes
+
+    def copy(self) -> "CategoricalColumn":
+        return CategoricalColumn(_copy_buffer(self.codes, "I"), list(self.dictionary))
+
+    def take(self, rows: Sequence[int]) -> list[Any]:
+        return list(map(self.dictionary.__getitem__, map(self.codes.__getitem__, rows)))
+
+    def freeze(self) -> None:
+        self._lookup = None
+
+    def nbytes(self) -> int:
+        strings = sum(len(item) + 50 for item in self.dictionary if isinstance(item, str))
+        return _heap_bytes(self.codes) + 8 * len(self.dictionary) + strings
+
+    def mapped_nbytes(self) -> int:
+        return _mapped_bytes(self.codes)
+
+
+Column = NumericColumn | CategoricalColumn
+
+
+class ColumnarTable:
+    def __init__(self, column_names: list[str]) -> None:
+        self.column_names = list(dict.fromkeys(column_names))
+        self.columns: dict[str, Column] = {
+            name: NumericColumn() if name in NUMERIC_COLUMNS else CategoricalColumn()
+            for name in self.column_names
+        }
+        positions = {name: index for index, name in enumerate(column_names)}
+        self._slots = [(self.columns[name], positions[name]) for name in self.column_names]
+        self._row_count = 0
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, Column], row_count: int) -> "ColumnarTable":
+        table = cls([])
+        table.column_names = list(columns)
+        table.columns = dict(columns)
+        table._slots = [(column, index) for index, column in enumerate(columns.values())]
+        table._row_count = row_count
+        return table
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def append_values(self, values: Sequence[Any]) -> None:
+        width = len(values)
+        for column, position in self._slots:
+            column.append(values[position] if position < width else None)
+        self._row_count += 1
+
+    def append_row(self, values: dict[str, Any]) -> int:
+        for name, column in self.columns.items():
+            column.append(values.get(name))
+        self._row_count += 1
+        return self._row_count - 1
+
+    def update_row(self, index: int, values: dict[str, Any]) -> None:
+        for name, value in values.items():
+            self.columns[name].set(index, value)
+
+    def delete_rows(self, rows: Sequence[int]) -> None:
+        rows = sorted(set(rows))
+        for column in self.columns.values():
+            column.delete_rows(rows)
+        self._row_count -= len(rows)
+
+    def make_writable(self) -> None:
+        for column in self.columns.values():
+            column.make_writable()
+
+    def copy(self) -> "ColumnarTable":
+        return ColumnarTable.from_columns(
+            {name: column.copy() for name, column in self.columns.items()}, self._row_count
+        )
+
+    def row(self, index: int) -> dict[str, Any]:
+        return {name: column.get(index) for name, column in self.columns.items()}
+
+    def take(self, name: str, rows: Sequence[int]) -> list[Any]:
+        column = self.columns.get(name)
+        if column is None:
+            return [None] * len(rows)
+        return column.take(rows)
+
+    def freeze(self) -> None:
+        for column in self.columns.values():
+            if isinstance(column, CategoricalColumn):
+                column.freeze()
+
+    def nbytes(self) -> int:
+        return sum(column.nbytes() for column in self.columns.values())
+
+    def mapped_nbytes(self) -> int:
+        return sum(column.mapped_nbytes() for column in self.columns.values())
+
+
+def _number_text(number: float) -> str:
+    text = repr(number)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _contains(ordered: Sequence[int], value: int) -> bool:
+    index = bisect_left(ordered, value)
+    return index < len(ordered) and ordered[index] == value
+
+
+def _copy_buffer(buffer: Any, typecode: str) -> array:
+    copied = array(typecode)
+    copied.frombytes(memoryview(buffer).cast("B"))
+    return copied
+
+
+def _heap_bytes(buffer: Any) -> int:
+    if isinstance(buffer, memoryview):
+        return 0
+    return len(buffer) * getattr(buffer, "itemsize", 1)
+
+
+def _mapped_bytes(buffer: Any) -> int:
+    if isinstance(buffer, memoryview):
+        return buffer.nbytes
+    return 0
+
+
+class RowView(Sequence[dict[str, Any]]):
+    def __init__(self, table: ColumnarTable) -> None:
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(self, index: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        if isinstance(index, slice):
+            return [self.table.row(i) for i in range(*index.indices(len(self.table)))]
+        if index < 0:
+            index += len(self.table)
+        if not 0 <= index < len(self.table):
+            raise IndexError("row index out of range")
+        return self.table.row(index)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        row = self.table.row
+        for index in range(len(self.table)):
+            yield row(index)
+
+    def __bool__(self) -> bool:
+        return len(self.table) > 0
+
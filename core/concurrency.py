@@ -0,0 +1,125 @@
+import asyncio
+import functools
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractContextManager
+from typing import Any, TypeVar
+
+from flux_analysis_agent import config
+
+T = TypeVar("T")
+
+
+async def run_locked(lock: AbstractContextManager[Any], func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    def call() -> T:
+        with lock:
+            return func(*args, **kwargs)
+
+    return await asyncio.to_thread(call)
+
+
+class _ClientSlots:
+    def __init__(self, limit: int) -> None:
+        self.semaphore = asyncio.Semaphore(limit)
+        self.calls = 0
+
+
+class ToolLimiter:
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_per_client: int | None = None,
+        queue_timeout_seconds: float | None = None,
+        client_id: Callable[[], str] | None = None,
+    ) -> None:
+        if max_concurrency is None:
+            max_concurrency = config.MAX_CONCURRENT_TOOL_CALLS
+        if max_per_client is None:
+            max_per_client = config.MAX_CONCURRENT_CALLS_PER_CLIENT
+        if queue_timeout_seconds is None:
+            queue_timeout_seconds = config.TOOL_QUEUE_TIMEOUT_SECONDS
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_client = max(1, min(max_per_client, self.max_concurrency))
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._client_id = client_id or (lambda: "local")
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._clients: dict[str, _ClientSlots] = {}
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def limit(self, tool: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        def decorate(handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(handler)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                client_id = self._client_id()
+                client = self._clients.get(client_id)
+                if client is None:
+                    client = self._clients[client_id] = _ClientSlots(self.max_per_client)
+                client.calls += 1
+                try:
+                    if not await self._enter(client, time.monotonic() + self.queue_timeout_seconds):
+                        return self._reject(tool)
+                    try:
+                        return await handler(*args, **kwargs)
+                    finally:
+                        self.active -= 1
+                        self._slots.release()
+                        client.semaphore.release()
+                finally:
+                    client.calls -= 1
+                    if not client.calls:
+                        self._clients.pop(client_id, None)
+
+            return wrapper
+
+        return decorate
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_per_client": self.max_per_client,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "clients": len(self._clients),
+        }
+
+    async def _enter(self, client: _ClientSlots, deadline: float) -> bool:
+        self.waiting += 1
+        try:
+            if not await self._acquire(client.semaphore, deadline):
+                return False
+            try:
+                acquired = await self._acquire(self._slots, deadline)
+            except BaseException:
+                client.semaphore.release()
+                raise
+            if not acquired:
+                client.semaphore.release()
+                return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+
+    async def _acquire(self, semaphore: asyncio.Semaphore, deadline: float) -> bool:
+        if self.queue_timeout_seconds <= 0:
+            await semaphore.acquire()
+            return True
+        try:
+            await asyncio.wait_for(semaphore.acquire(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _reject(self, tool: str) -> dict[str, Any]:
+        self.rejected += 1
+        return {
+            "error": {
+                "message": (
+                    f"Server is busy: {tool} could not start within {self.queue_timeout_seconds:g} seconds. "
+                    "Retry later."
+                )
+            }
+        }
@@ -1,54 +1,753 @@
 import csv
-import io
+import functools
+import hashlib
+from bisect import bisect_left
+import os
+import tempfile
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from typing import Any
 
+from flux_analysis_agent import config
+from flux_analysis_agent.core.analysis_engine import compute_flux_for_rows
+from flux_analysis_agent.core.column_profile import profile_table
+from flux_analysis_agent.core.columnar import ColumnarTable, RowView
+from flux_analysis_agent.core.disk_store import DiskStore
+from flux_analysis_agent.core.profiling import stage
+from flux_analysis_agent.core.query_engine import get_index
+from flux_analysis_agent.core.rollups import Rollups, get_rollups
+
+
+_RECORD_FIELD = "\x1f"
+_RECORD_END = "\x1e"
+_UNQUOTED, _QUOTED, _QUOTE_IN_QUOTED = range(3)
+_FIELD_START = ",\r\n"
+_SLICE_CHARS = 1 << 20
+
+
+def _synchronized(method: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(method)
+    def wrapper(self: "DataStore", *args: Any, **kwargs: Any) -> Any:
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class _UploadSession:
+    def __init__(self, data_name: str | None) -> None:
+        self.data_name = data_name
+        self.parser = CsvStreamParser()
+        self.rollups = Rollups()
+        self.raw_digest = hashlib.sha256()
+        self.next_chunk_index = 0
+        self.lock = threading.Lock()
+        self.touched_at = time.monotonic()
+
+
+class TableUpdate:
+    def __init__(
+        self,
+        data_id: str,
+        previous_revision: int,
+        revision: int,
+        deleted_rows: list[int],
+        updated_rows: list[int],
+        inserted_rows: list[int],
+    ) -> None:
+        self.data_id = data_id
+        self.previous_revision = previous_revision
+        self.revision = revision
+        self.deleted_rows = deleted_rows
+        self.updated_rows = updated_rows
+        self.inserted_rows = inserted_rows
+
 
 class DataStore:
-    def __init__(self) -> None:
-        self._datasets: dict[str, dict[str, Any]] = {}
+    def __init__(
+        self,
+        data_dir: str | None = None,
+        max_memory_bytes: int | None = None,
+        spill_dir: str | None = None,
+    ) -> None:
+        self._datasets: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._uploads: dict[str, _UploadSession] = {}
+        self._listeners: list[Callable[[str], None]] = []
+        self.lock = threading.RLock()
+        self._dataset_locks: dict[str, threading.RLock] = {}
+        if data_dir is None:
+            data_dir = config.DATA_STORE_DIR
+        self._disk = DiskStore(data_dir) if data_dir else None
+        if max_memory_bytes is None:
+            max_memory_bytes = int(config.STORE_MAX_MEMORY_MB * 1024 * 1024)
+        self._max_memory_bytes = max_memory_bytes
+        self._spill_parent = spill_dir if spill_dir is not None else config.STORE_SPILL_DIR
+        self._spill_tempdir: tempfile.TemporaryDirectory | None = None
+        self._spill: DiskStore | None = None
+        self._aliases: dict[str, dict[str, Any]] = self._disk.aliases() if self._disk is not None else {}
+        self._refcounts: dict[str, int] = {}
+        for record in self._aliases.values():
+            self._refcounts[record["target"]] = self._refcounts.get(record["target"], 1) + 1
+        self._content: dict[str, str] = {}
+        if self._disk is not None:
+            for data_id in self._disk.data_ids():
+                self._register_content(data_id, self._disk.entry(data_id)["meta"].get("content_hashes"))
 
     def add_data(self, csv_text: str, data_name: str | None = None) -> str:
-        data = _parse_csv(csv_text)
+        with stage("hash"):
+            raw_hash = _raw_hash(csv_text)
+        with self.lock:
+            existing = self._find_content({"raw": raw_hash})
+            if existing is not None:
+                return self._add_alias(existing, data_name)
+        with stage("parse"):
+            parser = CsvStreamParser()
+            for start in range(0, len(csv_text), _SLICE_CHARS):
+                parser.feed(csv_text[start : start + _SLICE_CHARS])
+            table = parser.close()
+        hashes = {"raw": raw_hash, "rows": parser.content_hash}
+        with stage("profile"):
+            profile = profile_table(table)
+        with stage("rollups"):
+            rollups = Rollups.from_table(table)
+        with self.lock:
+            return self._add_table(table, data_name, hashes, profile, rollups)
+
+    @_synchronized
+    def begin_upload(self, data_name: str | None = None) -> str:
+        self._expire_uploads()
+        upload_id = f"upload-{uuid.uuid4().hex}"
+        self._uploads[upload_id] = _UploadSession(data_name)
+        return upload_id
+
+    def append_upload(self, upload_id: str, chunk: str, chunk_index: int | None = None) -> dict[str, Any]:
+        with self.lock:
+            session = self._get_upload(upload_id)
+        with session.lock:
+            if chunk_index is None or chunk_index == session.next_chunk_index:
+                try:
+                    session.parser.feed(chunk)
+                    session.raw_digest.update(chunk.encode("utf-8", "surrogatepass"))
+                    if session.parser.table is not None:
+                        session.rollups.extend(session.parser.table)
+                except Exception:
+                    with self.lock:
+                        self._uploads.pop(upload_id, None)
+                    raise
+                session.next_chunk_index += 1
+            elif chunk_index > session.next_chunk_index:
+                raise ValueError(f"Expected chunk_index {session.next_chunk_index}, got {chunk_index}.")
+
+            session.touched_at = time.monotonic()
+            return {
+                "upload_id": upload_id,
+                "next_chunk_index": session.next_chunk_index,
+                "rows_received": session.parser.row_count,
+            }
+
+    def commit_upload(self, upload_id: str) -> str:
+        with self.lock:
+            session = self._get_upload(upload_id)
+            del self._uploads[upload_id]
+        with session.lock:
+            with stage("parse"):
+                table = session.parser.close()
+            with stage("rollups"):
+                session.rollups.extend(table)
+        hashes = {"raw": session.raw_digest.hexdigest(), "rows": session.parser.content_hash}
+        with stage("profile"):
+            profile = profile_table(table)
+        with self.lock:
+            return self._add_table(table, session.data_name, hashes, profile, session.rollups)
+
+    @_synchronized
+    def abort_upload(self, upload_id: str) -> bool:
+        return self._uploads.pop(upload_id, None) is not None
+
+    @_synchronized
+    def resolve(self, data_id: str) -> str:
+        record = self._aliases.get(data_id)
+        return record["target"] if record is not None else data_id
+
+    @contextmanager
+    def locked(self, data_id: str) -> Iterator[None]:
+        while True:
+            lock = self._dataset_lock(data_id)
+            with lock:
+                if self._dataset_lock(data_id) is lock:
+                    yield
+                    return
+
+    @_synchronized
+    def get_data(self, data_id: str) -> dict[str, Any] | None:
+        data_id = self.resolve(data_id)
+        dataset = self._datasets.get(data_id)
+        if dataset is not None:
+            self._datasets.move_to_end(data_id)
+            return dataset
+        return self._load(data_id)
+
+    @_synchronized
+    def set_schema(self, data_id: str, schema_info: dict[str, Any]) -> None:
+        data_id = self.resolve(data_id)
+        dataset = self.get_data(data_id)
+        if not dataset:
+            return
+        dataset["meta"].update(schema_info)
+        for disk in (self._disk, self._spill):
+            if disk is not None and data_id in disk:
+                disk.save_meta(data_id, dataset["meta"])
+
+    def update_rows(
+        self,
+        data_id: str,
+        upserts: list[dict[str, Any]] | None = None,
+        delete_account_ids: list[str] | None = None,
+    ) -> TableUpdate:
+        with self.locked(data_id), self.lock:
+            return self._update_rows(data_id, upserts, delete_account_ids)
+
+    def _update_rows(
+        self,
+        data_id: str,
+        upserts: list[dict[str, Any]] | None,
+        delete_account_ids: list[str] | None,
+    ) -> TableUpdate:
+        dataset = self._detach(data_id)
+        if not dataset:
+            raise ValueError("No dataset found for the given data_id.")
+        table = dataset["table"]
+        account_column = table.columns.get("account_id")
+        if account_column is None:
+            raise ValueError("Dataset has no account_id column.")
+
+        changes: dict[str, dict[str, Any]] = {}
+        for values in upserts or []:
+            unknown = [name for name in values if name not in table.columns]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(map(str, unknown))}.")
+            cleaned = {name: None if value is None else _clean_value(str(value)) for name, value in values.items()}
+            account_id = cleaned.get("account_id")
+            if not account_id:
+                raise ValueError("Every upserted row needs an account_id.")
+            changes.setdefault(account_id, {}).update(cleaned)
+        deletes = {_clean_value(str(account_id)) for account_id in delete_account_ids or []}
+        both = deletes.intersection(changes)
+        if both:
+            raise ValueError(f"Accounts both upserted and deleted: {', '.join(sorted(both))}.")
+
+        index = get_index(dataset)
+        rollups = get_rollups(dataset)
+
+        def matching_rows(account_id: str) -> list[int]:
+            return [row for row in index.rows_for("account_id", account_id) if account_column.get(row) == account_id]
+
+        deleted_rows = sorted(row for account_id in deletes for row in matching_rows(account_id))
+        updates = {row: values for account_id, values in changes.items() for row in matching_rows(account_id)}
+        matched = {account_column.get(row) for row in updates}
+        inserts = [values for account_id, values in changes.items() if account_id not in matched]
+
+        table.make_writable()
+        self._forget_content(data_id)
+        dataset["meta"].pop("column_profile", None)
+        affected = sorted(set(deleted_rows).union(updates))
+        rollups.add(compute_flux_for_rows(table, affected, rollups.default_threshold_percent), sign=-1)
+
+        previous_values = {}
+        for row, values in updates.items():
+            previous_values[row] = {name: table.columns[name].get(row) for name in values}
+            table.update_row(row, values)
+        inserted_rows = [table.append_row(values) for values in inserts]
+
+        changed_rows = sorted(updates) + inserted_rows
+        rollups.add(compute_flux_for_rows(table, changed_rows, rollups.default_threshold_percent))
+        if deleted_rows:
+            table.delete_rows(deleted_rows)
+            dataset.pop("index", None)
+        else:
+            for row in changed_rows:
+                index.update_row(row, previous_values.get(row))
+
+        previous_revision = dataset["revision"]
+        revision = previous_revision + 1
+        dataset["revision"] = revision
+        dataset["meta"]["row_count"] = len(table)
+        rollups.revision = revision
+        rollups.row_count = len(table)
+        index.revision = revision
+
+        return TableUpdate(
+            data_id,
+            previous_revision,
+            revision,
+            deleted_rows,
+            [row - bisect_left(deleted_rows, row) for row in sorted(updates)],
+            [row - len(deleted_rows) for row in inserted_rows],
+        )
+
+    @_synchronized
+    def delete_data(self, data_id: str) -> bool:
+        if data_id in self._aliases:
+            self._unlink(data_id)
+            return True
+        if not self._exists(data_id):
+            return False
+        if self._refcounts.get(data_id, 1) > 1:
+            self._transfer(data_id)
+            self._unlink(data_id)
+            return True
+
+        self._forget_content(data_id)
+        self._datasets.pop(data_id, None)
+        self._dataset_locks.pop(data_id, None)
+        for disk in (self._disk, self._spill):
+            if disk is not None:
+                disk.delete(data_id)
+        self._notify(data_id)
+        return True
+
+    @_synchronized
+    def flush(self) -> None:
+        if self._disk is None:
+            return
+        for data_id, dataset in self._datasets.items():
+            self._persist(data_id, dataset)
+
+    @_synchronized
+    def disk_location(self, data_id: str) -> str | None:
+        data_id = self.resolve(data_id)
+        dataset = self._datasets.get(data_id)
+        for disk in (self._disk, self._spill):
+            if disk is None:
+                continue
+            entry = disk.entry(data_id)
+            if entry is None:
+                continue
+            if dataset is None or entry.get("revision", 0) == dataset["revision"]:
+                return disk.root
+        return None
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        self._listeners.append(callback)
+
+    @_synchronized
+    def list_datasets(self) -> list[dict[str, Any]]:
+        data_ids = list(self._datasets)
+        for disk in (self._disk, self._spill):
+            if disk is not None:
+                data_ids.extend(data_id for data_id in disk.data_ids() if data_id not in self._datasets)
+        data_ids.extend(self._aliases)
+        return [self.describe(data_id) for data_id in dict.fromkeys(data_ids)]
+
+    @_synchronized
+    def describe(self, data_id: str) -> dict[str, Any]:
+        record = self._aliases.get(data_id)
+        if record is not None:
+            info = self.describe(record["target"])
+            info.pop("data_name", None)
+            info.update({"data_id": data_id, "alias_of": record["target"], "memory_bytes": 0, "mapped_bytes": 0})
+            if record.get("data_name"):
+                info["data_name"] = record["data_name"]
+            return info
+
+        dataset = self._datasets.get(data_id)
+        if dataset is not None:
+            table = dataset["table"]
+            meta = dataset["meta"]
+            info = {
+                "data_id": data_id,
+                "state": "loaded",
+                "row_count": len(table),
+                "memory_bytes": table.nbytes(),
+                "mapped_bytes": table.mapped_nbytes(),
+            }
+        else:
+            disk = self._disk if self._disk is not None and data_id in self._disk else self._spill
+            entry = disk.entry(data_id) if disk is not None else None
+            if entry is None:
+                return {"data_id": data_id, "state": "missing"}
+            meta = entry["meta"]
+            info = {
+                "data_id": data_id,
+                "state": "on_disk" if disk is self._disk else "spilled",
+                "row_count": entry["row_count"],
+                "memory_bytes": 0,
+                "mapped_bytes": 0,
+            }
+        if meta.get("data_name"):
+            info["data_name"] = meta["data_name"]
+        if self._refcounts.get(data_id, 1) > 1:
+            info["references"] = self._refcounts[data_id]
+        if meta.get("schema_status"):
+            info["schema_status"] = meta["schema_status"]
+        if meta.get("schema_status") == "failed" and meta.get("schema_error"):
+            info["schema_error"] = meta["schema_error"]
+        if meta.get("schema_description"):
+            info["schema_summary"] = meta["schema_description"]
+        return info
+
+    @_synchronized
+    def memory_usage(self) -> dict[str, Any]:
+        datasets = list(self._datasets.values())
+        return {
+            "memory_bytes": sum(dataset["table"].nbytes() for dataset in datasets),
+            "max_memory_bytes": self._max_memory_bytes,
+            "loaded_datasets": len(datasets),
+        }
+
+    def _add_table(
+        self,
+        table: ColumnarTable,
+        data_name: str | None,
+        hashes: dict[str, str],
+        profile: dict[str, dict[str, Any]],
+        rollups: Rollups,
+    ) -> str:
+        existing = self._find_content(hashes)
+        if existing is not None:
+            return self._add_alias(existing, data_name)
+
         data_id = f"data-{uuid.uuid4().hex}"
-        columns = list(data[0].keys()) if data else []
-        meta: dict[str, Any] = {"columns": columns}
+        meta: dict[str, Any] = {
+            "columns": list(table.column_names),
+            "row_count": len(table),
+            "content_hashes": hashes,
+            "column_profile": profile,
+        }
         if data_name:
             meta["data_name"] = data_name
-        self._datasets[data_id] = {"data": data, "meta": meta}
+        with stage("store"):
+            dataset = self._store_table(data_id, table, meta, 0)
+        dataset["rollups"] = rollups
+        self._register_content(data_id, hashes)
         return data_id
 
-    def get_data(self, data_id: str) -> dict[str, Any] | None:
-        return self._datasets.get(data_id)
+    @_synchronized
+    def _dataset_lock(self, data_id: str) -> threading.RLock:
+        data_id = self.resolve(data_id)
+        lock = self._dataset_locks.get(data_id)
+        if lock is None:
+            lock = self._dataset_locks[data_id] = threading.RLock()
+        return lock
 
-    def set_schema(self, data_id: str, schema_info: dict[str, Any]) -> None:
+    def _store_table(self, data_id: str, table: ColumnarTable, meta: dict[str, Any], revision: int) -> dict[str, Any]:
+        if self._disk is not None:
+            self._disk.save(data_id, table, meta, revision)
+        dataset = _make_dataset(table, meta, revision)
+        self._datasets[data_id] = dataset
+        self._enforce_budget(keep=data_id)
+        return dataset
+
+    def _add_alias(self, data_id: str, data_name: str | None) -> str:
+        alias = f"data-{uuid.uuid4().hex}"
+        record: dict[str, Any] = {"target": data_id}
+        if data_name:
+            record["data_name"] = data_name
+        self._aliases[alias] = record
+        self._refcounts[data_id] = self._refcounts.get(data_id, 1) + 1
+        self._save_aliases()
+        return alias
+
+    def _unlink(self, alias: str) -> dict[str, Any]:
+        record = self._aliases.pop(alias)
+        target = record["target"]
+        self._refcounts[target] -= 1
+        if self._refcounts[target] <= 1:
+            del self._refcounts[target]
+        self._save_aliases()
+        return record
+
+    def _transfer(self, data_id: str) -> str:
+        heir = next(alias for alias, record in self._aliases.items() if record["target"] == data_id)
+        heir_record = self._aliases.pop(heir)
+        for record in self._aliases.values():
+            if record["target"] == data_id:
+                record["target"] = heir
+
+        dataset = self._datasets.pop(data_id, None)
+        for disk in (self._disk, self._spill):
+            if disk is not None:
+                disk.rename(data_id, heir)
+        if dataset is not None:
+            self._datasets[heir] = dataset
+        dataset = self.get_data(heir)
+        meta = dataset["meta"]
+        record = {"target": heir}
+        if meta.get("data_name"):
+            record["data_name"] = meta["data_name"]
+        meta.pop("data_name", None)
+        if heir_record.get("data_name"):
+            meta["data_name"] = heir_record["data_name"]
+        self._aliases[data_id] = record
+        self._refcounts[heir] = self._refcounts.pop(data_id)
+        for key, target in self._content.items():
+            if target == data_id:
+                self._content[key] = heir
+
+        self.set_schema(heir, {})
+        self._save_aliases()
+        self._notify(data_id)
+        return heir
+
+    def _detach(self, data_id: str) -> dict[str, Any] | None:
+        if self._refcounts.get(self.resolve(data_id), 1) <= 1:
+            return self.get_data(data_id)
+        if data_id not in self._aliases:
+            self._transfer(data_id)
+        source = self.get_data(data_id)
+        record = self._unlink(data_id)
+        meta = {key: value for key, value in source["meta"].items() if key != "data_name"}
+        if record.get("data_name"):
+            meta["data_name"] = record["data_name"]
+        return self._store_table(data_id, source["table"].copy(), meta, source["revision"])
+
+    def _find_content(self, hashes: dict[str, str]) -> str | None:
+        for kind, digest in hashes.items():
+            data_id = self._content.get(f"{kind}:{digest}")
+            if data_id is not None and self._exists(data_id):
+                return data_id
+        return None
+
+    def _register_content(self, data_id: str, hashes: dict[str, str] | None) -> None:
+        for kind, digest in (hashes or {}).items():
+            self._content.setdefault(f"{kind}:{digest}", data_id)
+
+    def _forget_content(self, data_id: str) -> None:
         dataset = self._datasets.get(data_id)
-        if not dataset:
+        if dataset is not None:
+            dataset["meta"].pop("content_hashes", None)
+        for key in [key for key, target in self._content.items() if target == data_id]:
+            del self._content[key]
+
+    def _exists(self, data_id: str) -> bool:
+        if data_id in self._datasets:
+            return True
+        return any(disk is not None and data_id in disk for disk in (self._disk, self._spill))
+
+    def _save_aliases(self) -> None:
+        if self._disk is not None:
+            self._disk.save_aliases(
+                {alias: record for alias, record in self._aliases.items() if record["target"] in self._disk}
+            )
+
+    def _load(self, data_id: str) -> dict[str, Any] | None:
+        for disk in (self._disk, self._spill):
+            if disk is None:
+                continue
+            entry = disk.entry(data_id)
+            if entry is None:
+                continue
+            table = disk.open(data_id)
+            dataset = _make_dataset(table, dict(entry["meta"]), entry.get("revision", 0))
+            self._datasets[data_id] = dataset
+            self._enforce_budget(keep=data_id)
+            return dataset
+        return None
+
+    def _enforce_budget(self, keep: str) -> None:
+        if self._max_memory_bytes <= 0:
             return
-        dataset["meta"].update(schema_info)
+        used = sum(dataset["table"].nbytes() for dataset in self._datasets.values())
+        for data_id in list(self._datasets):
+            if used <= self._max_memory_bytes:
+                break
+            if data_id == keep:
+                continue
+            used -= self._evict(data_id)
 
+    def _evict(self, data_id: str) -> int:
+        dataset = self._datasets[data_id]
+        table = dataset["table"]
+        freed = table.nbytes()
+        persisted = self._disk is not None and data_id in self._disk
+        if persisted:
+            self._persist(data_id, dataset)
+        else:
+            spill = self._spill_store()
+            entry = spill.entry(data_id)
+            if entry is None or entry.get("revision") != dataset["revision"]:
+                spill.save(data_id, table, dataset["meta"], dataset["revision"])
+        del self._datasets[data_id]
+        self._notify(data_id)
+        return freed
 
-def _parse_csv(csv_text: str) -> list[dict[str, Any]]:
-    if not csv_text or not csv_text.strip():
-        raise ValueError("No CSV data provided.")
+    def _persist(self, data_id: str, dataset: dict[str, Any]) -> None:
+        entry = self._disk.entry(data_id) if self._disk is not None else None
+        if entry is not None and entry.get("revision", 0) != dataset["revision"]:
+            self._disk.save(data_id, dataset["table"], dataset["meta"], dataset["revision"])
 
-    csv_text = csv_text.strip()
-    reader = csv.DictReader(io.StringIO(csv_text))
-    if not reader.fieldnames:
-        raise ValueError("CSV header row is missing or invalid.")
+    def _spill_store(self) -> DiskStore:
+        if self._spill is None:
+            if self._spill_parent:
+                os.makedirs(self._spill_parent, exist_ok=True)
+            self._spill_tempdir = tempfile.TemporaryDirectory(prefix="flux-spill-", dir=self._spill_parent)
+            self._spill = DiskStore(self._spill_tempdir.name)
+        return self._spill
 
-    fieldnames = [_clean_header(name) for name in reader.fieldnames]
-    reader.fieldnames = fieldnames
+    def _notify(self, data_id: str) -> None:
+        for callback in self._listeners:
+            callback(data_id)
 
-    rows: list[dict[str, Any]] = []
-    for row in reader:
-        cleaned = {key: _clean_value(value) for key, value in row.items()}
-        rows.append(cleaned)
+    def _get_upload(self, upload_id: str) -> _UploadSession:
+        self._expire_uploads()
+        session = self._uploads.get(upload_id)
+        if session is None:
+            raise ValueError("No upload session found for the given upload_id.")
+        return session
 
-    if not rows:
-        raise ValueError("CSV data has no rows.")
+    def _expire_uploads(self) -> None:
+        cutoff = time.monotonic() - config.UPLOAD_SESSION_TTL_SECONDS
+        for upload_id in [key for key, session in self._uploads.items() if session.touched_at < cutoff]:
+            del self._uploads[upload_id]
 
-    return rows
+
+def _make_dataset(table: ColumnarTable, meta: dict[str, Any], revision: int) -> dict[str, Any]:
+    return {
+        "data": RowView(table),
+        "table": table,
+        "meta": meta,
+        "revision": revision,
+    }
+
+
+def _raw_hash(text: str) -> str:
+    digest = hashlib.sha256()
+    for start in range(0, len(text), _SLICE_CHARS):
+        digest.update(text[start : start + _SLICE_CHARS].encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class CsvStreamParser:
+    def __init__(self) -> None:
+        self._carry: list[str] = []
+        self._quote_state = _UNQUOTED
+        self._previous = "\n"
+        self._table: ColumnarTable | None = None
+        self._pending_blank = 0
+        self._received = False
+        self._digest = hashlib.sha256()
+
+    @property
+    def content_hash(self) -> str:
+        return self._digest.hexdigest()
+
+    @property
+    def table(self) -> ColumnarTable | None:
+        return self._table
+
+    @property
+    def row_count(self) -> int:
+        return len(self._table) if self._table is not None else 0
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        end, self._quote_state = _complete_records_end(chunk, self._quote_state, self._previous)
+        self._previous = chunk[-1]
+        if end == 0:
+            self._carry.append(chunk)
+            return
+        if self._carry:
+            text = "".join(self._carry) + chunk[:end]
+            self._consume(_iter_lines(text, 0, len(text)))
+        else:
+            self._consume(_iter_lines(chunk, 0, end))
+        rest = chunk[end:]
+        self._carry = [rest] if rest else []
+
+    def close(self) -> ColumnarTable:
+        if self._carry:
+            text = "".join(self._carry)
+            self._consume(_iter_lines(text, 0, len(text)))
+            self._carry = []
+            self._quote_state = _UNQUOTED
+            self._previous = "\n"
+
+        if not self._received:
+            raise ValueError("No CSV data provided.")
+        if self._table is None:
+            raise ValueError("CSV header row is missing or invalid.")
+        if not len(self._table):
+            raise ValueError("CSV data has no rows.")
+
+        self._table.freeze()
+        return self._table
+
+    def _consume(self, lines: Iterator[str]) -> None:
+        records: list[str] = []
+        for values in csv.reader(lines):
+            if not values:
+                continue
+            if len(values) == 1 and not values[0].strip():
+                self._pending_blank += 1
+                continue
+
+            self._received = True
+            table = self._table
+            if table is None:
+                header = [_clean_header(name) for name in values]
+                self._table = ColumnarTable(header)
+                records.append(_RECORD_FIELD.join(header))
+                self._pending_blank = 0
+                continue
+
+            while self._pending_blank:
+                table.append_values([""])
+                records.append("")
+                self._pending_blank -= 1
+            cleaned = [_clean_value(value) for value in values]
+            table.append_values(cleaned)
+            records.append(_RECORD_FIELD.join(cleaned))
+        if records:
+            records.append("")
+            self._digest.update(_RECORD_END.join(records).encode("utf-8", "surrogatepass"))
+
+
+def _complete_records_end(text: str, state: int = _UNQUOTED, previous: str = "\n") -> tuple[int, int]:
+    end = 0
+    position = 0
+    size = len(text)
+    if state == _QUOTE_IN_QUOTED:
+        if text.startswith('"'):
+            state, position = _QUOTED, 1
+        else:
+            state = _UNQUOTED
+    while position < size:
+        quote = text.find('"', position)
+        if state == _QUOTED:
+            if quote == -1:
+                break
+            if quote + 1 == size:
+                state = _QUOTE_IN_QUOTED
+                break
+            if text[quote + 1] == '"':
+                position = quote + 2
+            else:
+                state, position = _UNQUOTED, quote + 1
+            continue
+        newline = text.rfind("\n", position, size if quote == -1 else quote)
+        if newline != -1:
+            end = newline + 1
+        if quote == -1:
+            break
+        if (text[quote - 1] if quote else previous) in _FIELD_START:
+            state = _QUOTED
+        position = quote + 1
+    return end, state
+
+
+def _iter_lines(text: str, start: int, end: int) -> Iterator[str]:
+    while start < end:
+        newline = text.find("\n", start, end)
+        if newline == -1:
+            yield text[start:end]
+            return
+        yield text[start : newline + 1]
+        start = newline + 1
 
 
 def _clean_header(name: str | None) -> str:
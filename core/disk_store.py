@@ -0,0 +1,178 @@
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from array import array
+from typing import Any
+
+from flux_analysis_agent.core.columnar import CategoricalColumn, Column, ColumnarTable, NumericColumn
+
+_INDEX_FILE = "index.json"
+_ALIAS_FILE = "aliases.json"
+_FORMAT_VERSION = 1
+
+
+class DiskStore:
+    def __init__(self, root: str) -> None:
+        self._root = os.path.abspath(root)
+        os.makedirs(self._root, exist_ok=True)
+        self._index_path = os.path.join(self._root, _INDEX_FILE)
+        self._index: dict[str, dict[str, Any]] = self._read_index()
+        self._alias_path = os.path.join(self._root, _ALIAS_FILE)
+
+    @property
+    def root(self) -> str:
+        return self._root
+
+    def data_ids(self) -> list[str]:
+        return list(self._index)
+
+    def entry(self, data_id: str) -> dict[str, Any] | None:
+        return self._index.get(data_id)
+
+    def __contains__(self, data_id: str) -> bool:
+        return data_id in self._index
+
+    def save(self, data_id: str, table: ColumnarTable, meta: dict[str, Any], revision: int = 0) -> None:
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self._root)
+        try:
+            specs = []
+            for position, (name, column) in enumerate(table.columns.items()):
+                specs.append(_write_column(staging, position, name, column))
+            target = self._dataset_dir(data_id)
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._index[data_id] = {
+            "format": _FORMAT_VERSION,
+            "row_count": len(table),
+            "columns": specs,
+            "meta": meta,
+            "revision": revision,
+        }
+        self._write_index()
+
+    def save_meta(self, data_id: str, meta: dict[str, Any], revision: int | None = None) -> None:
+        entry = self._index.get(data_id)
+        if entry is None:
+            return
+        entry["meta"] = meta
+        if revision is not None:
+            entry["revision"] = revision
+        self._write_index()
+
+    def open(self, data_id: str) -> ColumnarTable | None:
+        entry = self._index.get(data_id)
+        if entry is None:
+            return None
+        directory = self._dataset_dir(data_id)
+        row_count = entry["row_count"]
+        columns: dict[str, Column] = {}
+        for spec in entry["columns"]:
+            columns[spec["name"]] = _open_column(directory, spec, row_count)
+        return ColumnarTable.from_columns(columns, row_count)
+
+    def delete(self, data_id: str) -> None:
+        if self._index.pop(data_id, None) is None:
+            return
+        self._write_index()
+        shutil.rmtree(self._dataset_dir(data_id), ignore_errors=True)
+
+    def rename(self, data_id: str, new_data_id: str) -> None:
+        entry = self._index.pop(data_id, None)
+        if entry is None:
+            return
+        os.replace(self._dataset_dir(data_id), self._dataset_dir(new_data_id))
+        self._index[new_data_id] = entry
+        self._write_index()
+
+    def aliases(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self._alias_path, "r", encoding="utf-8") as handle:
+                aliases = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(aliases, dict):
+            return {}
+        return {
+            alias: record
+            for alias, record in aliases.items()
+            if isinstance(record, dict) and record.get("target") in self._index
+        }
+
+    def save_aliases(self, aliases: dict[str, dict[str, Any]]) -> None:
+        _write_json(self._alias_path, aliases)
+
+    def _dataset_dir(self, data_id: str) -> str:
+        return os.path.join(self._root, data_id)
+
+    def _read_index(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as handle:
+                index = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        return {
+            data_id: entry
+            for data_id, entry in index.items()
+            if entry.get("format") == _FORMAT_VERSION and os.path.isdir(self._dataset_dir(data_id))
+        }
+
+    def _write_index(self) -> None:
+        _write_json(self._index_path, self._index)
+
+
+def _write_json(path: str, value: Any) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(value, handle)
+    os.replace(temp_path, path)
+
+
+def _write_column(directory: str, position: int, name: str, column: Column) -> dict[str, Any]:
+    prefix = os.path.join(directory, str(position))
+    if isinstance(column, NumericColumn):
+        _write_buffer(f"{prefix}.values", column.values)
+        _write_buffer(f"{prefix}.states", column.states)
+        with open(f"{prefix}.invalid.json", "w", encoding="utf-8") as handle:
+            json.dump(column.texts, handle)
+        return {"name": name, "position": position, "kind": "numeric"}
+
+    _write_buffer(f"{prefix}.codes", column.codes)
+    with open(f"{prefix}.dictionary.json", "w", encoding="utf-8") as handle:
+        json.dump(column.dictionary, handle)
+    return {"name": name, "position": position, "kind": "categorical"}
+
+
+def _write_buffer(path: str, buffer: Any) -> None:
+    with open(path, "wb") as handle:
+        handle.write(memoryview(buffer).cast("B"))
+
+
+def _open_column(directory: str, spec: dict[str, Any], row_count: int) -> Column:
+    prefix = os.path.join(directory, str(spec["position"]))
+    if spec["kind"] == "numeric":
+        with open(f"{prefix}.invalid.json", "r", encoding="utf-8") as handle:
+            texts = {int(index): text for index, text in json.load(handle).items()}
+        return NumericColumn(
+            values=_map_buffer(f"{prefix}.values", "d", row_count),
+            states=_map_buffer(f"{prefix}.states", "B", row_count),
+            texts=texts,
+        )
+
+    with open(f"{prefix}.dictionary.json", "r", encoding="utf-8") as handle:
+        dictionary = json.load(handle)
+    return CategoricalColumn(codes=_map_buffer(f"{prefix}.codes", "I", row_count), dictionary=dictionary)
+
+
+def _map_buffer(path: str, typecode: str, length: int) -> Any:
+    if length == 0:
+        return array(typecode)
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode)
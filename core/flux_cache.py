@@ -0,0 +1,307 @@
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import compress
+from typing import Any
+
+from flux_analysis_agent import config
+from flux_analysis_agent.core.analysis_engine import FluxColumns, compute_flux_for_rows
+from flux_analysis_agent.core.data_store import DataStore, TableUpdate
+from flux_analysis_agent.core.profiling import stage
+from flux_analysis_agent.core.sharded_flux import compute_flux_sharded
+from flux_analysis_agent.core.worker_pool import WorkerPool
+
+_RECORD_BYTES = 400
+_COLUMN_BYTES_PER_ROW = 4 + 8 * 4 + 2
+_MAX_SELECTIONS = 8
+
+
+class _Entry:
+    def __init__(self, revision: int, flux: FluxColumns) -> None:
+        self.revision = revision
+        self.flux = flux
+        self.views: dict[bool, list[dict[str, Any]]] = {}
+        self.orderings: dict[str, array] = {}
+        self.selections: OrderedDict[tuple[Any, ...], array] = OrderedDict()
+        self.nbytes = len(flux) * _COLUMN_BYTES_PER_ROW
+
+
+class FluxCache:
+    def __init__(
+        self,
+        store: DataStore,
+        max_bytes: int | None = None,
+        worker_pool: WorkerPool | None = None,
+    ) -> None:
+        self._store = store
+        self._worker_pool = worker_pool
+        if max_bytes is None:
+            max_bytes = int(config.FLUX_CACHE_MAX_MB * 1024 * 1024)
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, float], _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        store.add_listener(self.invalidate)
+
+    def get_flux(self, data_id: str, default_threshold_percent: float | None = None) -> FluxColumns | None:
+        with self._store.locked(data_id):
+            _, entry = self._get_entry(data_id, default_threshold_percent)
+            return entry.flux if entry else None
+
+    def get_variances(
+        self,
+        data_id: str,
+        only_significant: bool = False,
+        default_threshold_percent: float | None = None,
+    ) -> list[dict[str, Any]] | None:
+        with self._store.locked(data_id):
+            key, entry = self._get_entry(data_id, default_threshold_percent)
+            if entry is None:
+                return None
+            only_significant = bool(only_significant)
+            records = entry.views.get(only_significant)
+            if records is not None:
+                with self._lock:
+                    self.hits += 1
+                return [dict(record) for record in records]
+
+            flux = entry.flux
+            if only_significant:
+                records = flux.to_records(flux.significant_positions())
+            else:
+                records = flux.to_records()
+            with self._lock:
+                self.misses += 1
+                entry.views[only_significant] = records
+                self._grow(key, entry, len(records) * _RECORD_BYTES)
+            return [dict(record) for record in records]
+
+    def select(
+        self,
+        data_id: str,
+        only_significant: bool = False,
+        default_threshold_percent: float | None = None,
+        sort_by: str | None = None,
+        categories: list[str] | None = None,
+    ) -> tuple[FluxColumns, array, int] | None:
+        category_key = tuple(sorted(set(categories))) if categories else None
+        selection_key = (bool(only_significant), sort_by, category_key)
+        with self._store.locked(data_id):
+            key, entry = self._get_entry(data_id, default_threshold_percent)
+            if entry is None:
+                return None
+
+            with self._lock:
+                positions = entry.selections.get(selection_key)
+                if positions is not None:
+                    entry.selections.move_to_end(selection_key)
+                    self.hits += 1
+                    return entry.flux, positions, entry.revision
+
+            flux = entry.flux
+            new_ordering = None
+            if sort_by:
+                ordering = entry.orderings.get(sort_by)
+                if ordering is None:
+                    ordering = new_ordering = flux.sorted_positions(sort_by)
+            else:
+                ordering = array("I", range(len(flux)))
+
+            exceeds = flux.exceeds if only_significant else None
+            mask = flux.category_mask(set(category_key)) if category_key else None
+            if exceeds is None and mask is None:
+                positions = ordering
+            else:
+                positions = array(
+                    "I",
+                    [
+                        position
+                        for position in ordering
+                        if (exceeds is None or exceeds[position]) and (mask is None or mask[position])
+                    ],
+                )
+
+            with self._lock:
+                self.misses += 1
+                added_bytes = 0
+                if new_ordering is not None:
+                    entry.orderings[sort_by] = new_ordering
+                    added_bytes += new_ordering.itemsize * len(new_ordering)
+                entry.selections[selection_key] = positions
+                added_bytes += _selection_bytes(entry, sort_by, positions)
+                while len(entry.selections) > _MAX_SELECTIONS:
+                    (_, dropped_sort_by, _), dropped = entry.selections.popitem(last=False)
+                    added_bytes -= _selection_bytes(entry, dropped_sort_by, dropped)
+                self._grow(key, entry, added_bytes)
+            return flux, positions, entry.revision
+
+    def apply_update(self, update: TableUpdate) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == update.data_id]:
+                entry = self._entries[key]
+                if entry.revision != update.previous_revision or not _apply_update(entry, update, key[1]):
+                    self._bytes -= self._entries.pop(key).nbytes
+                    continue
+                entry.revision = update.revision
+                entry.views.clear()
+                entry.selections.clear()
+                nbytes = len(entry.flux) * _COLUMN_BYTES_PER_ROW + sum(
+                    ordering.itemsize * len(ordering) for ordering in entry.orderings.values()
+                )
+                self._bytes += nbytes - entry.nbytes
+                entry.nbytes = nbytes
+
+    def invalidate(self, data_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == data_id]:
+                self._bytes -= self._entries.pop(key).nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _get_entry(
+        self, data_id: str, default_threshold_percent: float | None
+    ) -> tuple[tuple[str, float], _Entry | None]:
+        key = _cache_key(self._store.resolve(data_id), default_threshold_percent)
+        dataset = self._store.get_data(data_id)
+        if not dataset:
+            self.invalidate(key[0])
+            return key, None
+
+        revision = dataset.get("revision", 0)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.revision == revision:
+                self._entries.move_to_end(key)
+                return key, entry
+            if entry is not None:
+                self._bytes -= self._entries.pop(key).nbytes
+
+        with stage("compute"):
+            flux = compute_flux_sharded(dataset["table"], key[1], self._worker_pool)
+        entry = _Entry(revision, flux)
+        with self._lock:
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            self._evict(keep=key)
+        return key, entry
+
+    def _grow(self, key: tuple[str, float], entry: _Entry, added_bytes: int) -> None:
+        entry.nbytes += added_bytes
+        if self._entries.get(key) is entry:
+            self._bytes += added_bytes
+            self._evict(keep=key)
+
+    def _evict(self, keep: tuple[str, float]) -> None:
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key = next(iter(self._entries))
+            self._bytes -= self._entries.pop(key).nbytes
+
+
+def _cache_key(data_id: str, default_threshold_percent: float | None) -> tuple[str, float]:
+    if default_threshold_percent is None:
+        default_threshold_percent = config.DEFAULT_THRESHOLD_PERCENT
+    return data_id, float(default_threshold_percent)
+
+
+def _selection_bytes(entry: _Entry, sort_by: str | None, positions: array) -> int:
+    if sort_by and entry.orderings.get(sort_by) is positions:
+        return 0
+    return positions.itemsize * len(positions)
+
+
+def _apply_update(entry: _Entry, update: TableUpdate, default_threshold_percent: float) -> bool:
+    flux = entry.flux
+    if update.deleted_rows:
+        _delete_rows(entry, update.deleted_rows)
+
+    changed = compute_flux_for_rows(
+        flux.table, update.updated_rows + update.inserted_rows, default_threshold_percent
+    )
+    changed_positions = dict(zip(changed.rows, range(len(changed))))
+    keys = {sort_by: flux.sort_key(sort_by) for sort_by in entry.orderings}
+    columns = ("current", "prior", "change_amount", "change_percent", "has_percent", "exceeds")
+
+    updated = update.updated_rows
+    positions = flux.positions_for_rows(updated)
+    if len(positions) != len(updated) or any(row not in changed_positions for row in updated):
+        return False
+
+    for row, position in zip(updated, positions):
+        source = changed_positions[row]
+        for sort_by, ordering in entry.orderings.items():
+            del ordering[bisect_left(ordering, keys[sort_by](position), key=keys[sort_by])]
+        for name in columns:
+            getattr(flux, name)[position] = getattr(changed, name)[source]
+        for sort_by, ordering in entry.orderings.items():
+            ordering.insert(bisect_left(ordering, keys[sort_by](position), key=keys[sort_by]), position)
+
+    for row in update.inserted_rows:
+        source = changed_positions.get(row)
+        if source is None:
+            continue
+        position = len(flux.rows)
+        flux.rows.append(row)
+        for name in columns:
+            getattr(flux, name).append(getattr(changed, name)[source])
+        for sort_by, ordering in entry.orderings.items():
+            ordering.insert(bisect_left(ordering, keys[sort_by](position), key=keys[sort_by]), position)
+    return True
+
+
+def _delete_rows(entry: _Entry, deleted_rows: list[int]) -> None:
+    flux = entry.flux
+    identity = not flux.rows or flux.rows[-1] == len(flux.rows) - 1
+    removed = flux.positions_for_rows(deleted_rows)
+    for position in reversed(removed):
+        for values in (
+            flux.rows,
+            flux.current,
+            flux.prior,
+            flux.change_amount,
+            flux.change_percent,
+            flux.has_percent,
+            flux.exceeds,
+        ):
+            del values[position]
+    if identity:
+        flux.rows = array("I", range(len(flux.rows)))
+    elif deleted_rows:
+        shift = _shifted_indexes(deleted_rows, flux.rows[-1] + 1 if flux.rows else 0)
+        flux.rows = array("I", map(shift.__getitem__, flux.rows))
+
+    if removed:
+        kept = bytearray(b"\x01") * (len(flux.rows) + len(removed))
+        for position in removed:
+            kept[position] = 0
+        shift = _shifted_indexes(removed, len(kept))
+        for sort_by, ordering in entry.orderings.items():
+            remaining = compress(ordering, map(kept.__getitem__, ordering))
+            entry.orderings[sort_by] = array("I", map(shift.__getitem__, remaining))
+
+
+def _shifted_indexes(removed: list[int], size: int) -> array:
+    shift = array("I", range(removed[0]))
+    for offset, start in enumerate(removed, 1):
+        end = removed[offset] if offset < len(removed) else size
+        shift.append(0)
+        shift.extend(range(start + 1 - offset, end - offset))
+    return shift
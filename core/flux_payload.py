@@ -0,0 +1,78 @@
+import json
+from collections.abc import Sequence
+from typing import Any
+
+from flux_analysis_agent import config
+from flux_analysis_agent.core.analysis_engine import FluxColumns
+
+_BYTES_PER_TOKEN = 4
+_RECORD_BATCH = 64
+
+
+def build_flux_payload(
+    flux: FluxColumns,
+    ranked_positions: Sequence[int],
+    category_totals: list[dict[str, Any]],
+    only_significant: bool = False,
+    max_tokens: int | None = None,
+) -> str:
+    if max_tokens is None:
+        max_tokens = config.FLUX_TOOL_PAYLOAD_MAX_TOKENS
+    budget = max(256, max_tokens * _BYTES_PER_TOKEN)
+
+    payload: dict[str, Any] = {
+        "total_accounts": len(flux),
+        "significant_accounts": flux.exceeds.count(1),
+        "matching_accounts": len(ranked_positions),
+        "only_significant": only_significant,
+        "ranking": "absolute change_amount, largest first",
+        "categories": [],
+        "variances": [],
+        "truncated": False,
+    }
+    used = len(_dumps(payload))
+
+    for item in category_totals:
+        compact = compact_record(item)
+        size = len(_dumps(compact)) + 1
+        if used + size > budget // 3:
+            payload["truncated"] = True
+            payload["omitted_categories"] = len(category_totals) - len(payload["categories"])
+            break
+        payload["categories"].append(compact)
+        used += size
+
+    included = 0
+    for start in range(0, len(ranked_positions), _RECORD_BATCH):
+        batch = flux.to_records(ranked_positions[start : start + _RECORD_BATCH])
+        for record in batch:
+            compact = compact_record(record)
+            size = len(_dumps(compact)) + 1
+            if used + size > budget:
+                break
+            payload["variances"].append(compact)
+            used += size
+            included += 1
+        else:
+            continue
+        break
+
+    if included < len(ranked_positions):
+        payload["truncated"] = True
+        payload["omitted_variances"] = len(ranked_positions) - included
+    return _dumps(payload)
+
+
+def compact_record(record: dict[str, Any]) -> dict[str, Any]:
+    compact: dict[str, Any] = {}
+    for key, value in record.items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, float):
+            value = round(value, 2)
+        compact[key] = value
+    return compact
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
@@ -1,6 +1,14 @@
+import asyncio
 import json
+import random
+import time
+from collections.abc import Awaitable, Callable
+from types import SimpleNamespace
 from typing import Any
 
+from flux_analysis_agent import config
+from flux_analysis_agent.core.metrics import MetricsRegistry
+
 
 class LLMManager:
     def __init__(
@@ -10,26 +18,157 @@ class LLMManager:
         api_base: str | None = None,
         temperature: float = 0.2,
         timeout: float | None = None,
+        max_concurrency: int | None = None,
+        max_retries: int | None = None,
+        retry_backoff: float | None = None,
+        metrics: MetricsRegistry | None = None,
     ) -> None:
         try:
-            from openai import OpenAI
+            import httpx
+            import openai
+            from openai import AsyncOpenAI, OpenAI
         except ImportError as exc:
             raise RuntimeError(
                 "The openai package is required to use the internal LLM. "
                 "Install it with: python -m pip install openai"
             ) from exc
 
+        if timeout is None:
+            timeout = config.LLM_TIMEOUT_SECONDS
+        if max_concurrency is None:
+            max_concurrency = config.LLM_MAX_CONCURRENCY
+        if max_retries is None:
+            max_retries = config.LLM_MAX_RETRIES
+        if retry_backoff is None:
+            retry_backoff = config.LLM_RETRY_BACKOFF_SECONDS
+
         client_kwargs: dict[str, Any] = {"api_key": api_key}
         if api_base:
             client_kwargs["base_url"] = api_base
-        if timeout is not None:
+        if timeout:
             client_kwargs["timeout"] = timeout
 
         self._client = OpenAI(**client_kwargs)
+        connections = max(1, max_concurrency)
+        self._async_client = AsyncOpenAI(
+            **client_kwargs,
+            max_retries=0,
+            http_client=openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(connections)
+        self._max_retries = max(0, max_retries)
+        self._retry_backoff = retry_backoff
+        self._retryable = (
+            openai.APIConnectionError,
+            openai.RateLimitError,
+            openai.InternalServerError,
+        )
         self._model = model
         self._temperature = temperature
+        self._metrics = metrics
+
+    @property
+    def model(self) -> str:
+        return self._model
 
     def chat(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None = None) -> Any:
+        started = time.perf_counter()
+        try:
+            response = self._client.chat.completions.create(**self._request(messages, tools))
+        except Exception as exc:
+            self._record(started, error=exc)
+            raise
+        self._record(started, response)
+        return response
+
+    async def achat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        on_token: Callable[[str], Awaitable[None]] | None = None,
+    ) -> Any:
+        request = self._request(messages, tools)
+        if on_token is not None:
+            request["stream"] = True
+            request["stream_options"] = {"include_usage": True}
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                started = time.perf_counter()
+                forwarded = [0]
+                try:
+                    response = await self._async_client.chat.completions.create(**request)
+                    if on_token is not None:
+                        response = await self._collect_stream(response, on_token, forwarded)
+                except Exception as exc:
+                    self._record(started, error=exc)
+                    if not isinstance(exc, self._retryable) or attempt >= self._max_retries or forwarded[0]:
+                        raise
+                    delay = self._retry_backoff * (2**attempt)
+                    await asyncio.sleep(delay + random.uniform(0, delay / 2))
+                    attempt += 1
+                    continue
+                self._record(started, response)
+                return response
+
+    async def _collect_stream(
+        self,
+        stream: Any,
+        on_token: Callable[[str], Awaitable[None]],
+        forwarded: list[int],
+    ) -> Any:
+        content: list[str] = []
+        tool_calls: dict[int, dict[str, str]] = {}
+        finish_reason = None
+        usage = None
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            for choice in chunk.choices or []:
+                if choice.index:
+                    continue
+                delta = choice.delta
+                if delta is not None and delta.content:
+                    content.append(delta.content)
+                    forwarded[0] += 1
+                    await on_token(delta.content)
+                for call in getattr(delta, "tool_calls", None) or []:
+                    entry = tool_calls.setdefault(call.index, {"id": "", "name": "", "arguments": ""})
+                    entry["id"] = call.id or entry["id"]
+                    if call.function is not None:
+                        entry["name"] += call.function.name or ""
+                        entry["arguments"] += call.function.arguments or ""
+                finish_reason = choice.finish_reason or finish_reason
+
+        message = SimpleNamespace(
+            role="assistant",
+            content="".join(content) or None,
+            tool_calls=[
+                SimpleNamespace(
+                    id=entry["id"],
+                    type="function",
+                    function=SimpleNamespace(name=entry["name"], arguments=entry["arguments"]),
+                )
+                for _, entry in sorted(tool_calls.items())
+            ]
+            or None,
+        )
+        return SimpleNamespace(
+            model=self._model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)],
+            usage=usage,
+        )
+
+    def _record(self, started: float, response: Any = None, error: BaseException | None = None) -> None:
+        if self._metrics is not None:
+            self._metrics.record_llm_call(self._model, time.perf_counter() - started, response, error)
+
+    async def aclose(self) -> None:
+        await self._async_client.close()
+
+    def _request(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None) -> dict[str, Any]:
         request: dict[str, Any] = {
             "model": self._model,
             "messages": messages,
@@ -37,7 +176,7 @@ class LLMManager:
         }
         if tools is not None:
             request["tools"] = tools
-        return self._client.chat.completions.create(**request)
+        return request
 
     def extract_message(self, response: Any) -> Any:
         return response.choices[0].message
@@ -0,0 +1,281 @@
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+from flux_analysis_agent import config
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = tuple(256 * 4**power for power in range(11))
+ROWS_BUCKETS = tuple(10**power for power in range(8))
+
+_RESULT_LISTS = ("variances", "accounts", "results", "groups", "datasets")
+
+Labels = tuple[tuple[str, str], ...]
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= target and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (target - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    def __init__(
+        self,
+        prometheus_path: str | None = None,
+        prometheus_interval_seconds: float | None = None,
+        response_sample_rate: float | None = None,
+    ) -> None:
+        if prometheus_path is None:
+            prometheus_path = config.METRICS_PROMETHEUS_PATH
+        if prometheus_interval_seconds is None:
+            prometheus_interval_seconds = config.METRICS_PROMETHEUS_INTERVAL_SECONDS
+        if response_sample_rate is None:
+            response_sample_rate = config.METRICS_RESPONSE_SAMPLE_RATE
+        self.prometheus_path = prometheus_path or None
+        self.prometheus_interval_seconds = prometheus_interval_seconds
+        self.response_sample_rate = min(1.0, max(0.0, response_sample_rate))
+        self.started_at = time.time()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._buckets: dict[str, Sequence[float]] = {}
+        self._collectors: list[tuple[str, Callable[[], dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._next_write = 0.0
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets.setdefault(name, buckets))
+            histogram.observe(value)
+
+    def add_collector(self, name: str, collect: Callable[[], dict[str, Any]]) -> None:
+        self._collectors.append((name, collect))
+
+    def instrument(self, tool: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        def decorate(handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(handler)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                result = None
+                failed = True
+                try:
+                    result = await handler(*args, **kwargs)
+                    failed = False
+                    return result
+                except Exception:
+                    logger.exception("Tool %s failed", tool)
+                    raise
+                finally:
+                    self.record_tool_call(tool, time.perf_counter() - started, request_bytes(kwargs), result, failed)
+
+            return wrapper
+
+        return decorate
+
+    def record_tool_call(self, tool: str, seconds: float, request_bytes: int, result: Any, failed: bool) -> None:
+        self.increment("tool_calls_total", tool=tool)
+        self.observe("tool_latency_seconds", seconds, tool=tool)
+        self.observe("tool_request_bytes", request_bytes, BYTES_BUCKETS, tool=tool)
+        if failed or (isinstance(result, dict) and "error" in result):
+            self.increment("tool_errors_total", tool=tool)
+        if isinstance(result, dict):
+            rows = _result_rows(result)
+            if rows is not None:
+                self.observe("tool_result_rows", rows, ROWS_BUCKETS, tool=tool)
+            if self.response_sample_rate and random.random() < self.response_sample_rate:
+                size = len(json.dumps(result, separators=(",", ":"), default=str))
+                self.observe("tool_response_bytes", size, BYTES_BUCKETS, tool=tool)
+        self.maybe_write_prometheus()
+
+    def record_llm_call(self, model: str, seconds: float, response: Any = None, error: BaseException | None = None) -> None:
+        self.observe("llm_latency_seconds", seconds, model=model)
+        if error is not None:
+            self.increment("llm_errors_total", model=model, error=type(error).__name__)
+            return
+        self.increment("llm_requests_total", model=model)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.increment("llm_prompt_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, model=model)
+            self.increment("llm_completion_tokens_total", getattr(usage, "completion_tokens", 0) or 0, model=model)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{"labels": dict(key), **histogram.summary()} for key, histogram in series.items()]
+                for name, series in self._histograms.items()
+            }
+        snapshot: dict[str, Any] = {
+            "uptime_seconds": time.time() - self.started_at,
+            "counters": counters,
+            "histograms": histograms,
+        }
+        for name, collect in self._collectors:
+            snapshot[name] = collect()
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = _metric_name(name)
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                metric = _metric_name(name)
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, bucket_count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                        cumulative += bucket_count
+                        bucket_labels = _format_labels((*key, ("le", _format_value(bound))))
+                        lines.append(f"{metric}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+        for name, collect in self._collectors:
+            for field, value in _flatten(collect()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = _metric_name(f"{name}_{field}")
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {_format_value(value)}")
+        lines.append("# TYPE flux_uptime_seconds gauge")
+        lines.append(f"flux_uptime_seconds {_format_value(time.time() - self.started_at)}")
+        return "\n".join(lines) + "\n"
+
+    def maybe_write_prometheus(self) -> None:
+        if not self.prometheus_path:
+            return
+        now = time.monotonic()
+        if now < self._next_write:
+            return
+        self._next_write = now + self.prometheus_interval_seconds
+        threading.Thread(target=self.write_prometheus, name="prometheus-writer", daemon=True).start()
+
+    def write_prometheus(self) -> None:
+        if not self.prometheus_path:
+            return
+        with self._write_lock:
+            try:
+                directory = os.path.dirname(os.path.abspath(self.prometheus_path))
+                os.makedirs(directory, exist_ok=True)
+                temp_path = f"{self.prometheus_path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as handle:
+                    handle.write(self.to_prometheus())
+                os.replace(temp_path, self.prometheus_path)
+            except Exception:
+                logger.exception("Failed to write Prometheus metrics to %s", self.prometheus_path)
+
+
+def request_bytes(arguments: dict[str, Any]) -> int:
+    total = 0
+    for value in arguments.values():
+        if isinstance(value, str):
+            total += len(value)
+        elif isinstance(value, (list, dict)):
+            total += len(json.dumps(value, separators=(",", ":"), default=str))
+    return total
+
+
+def _result_rows(result: dict[str, Any]) -> int | None:
+    row_count = result.get("row_count")
+    if isinstance(row_count, int):
+        return row_count
+    for key in _RESULT_LISTS:
+        value = result.get(key)
+        if isinstance(value, list):
+            return len(value)
+    return None
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _metric_name(name: str) -> str:
+    cleaned = "".join(character if character.isalnum() else "_" for character in name)
+    return f"flux_{cleaned}"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _flatten(values: dict[str, Any], prefix: str = "") -> list[tuple[str, Any]]:
+    items: list[tuple[str, Any]] = []
+    for key, value in values.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            items.extend(_flatten(value, f"{name}_"))
+        else:
+            items.append((name, value))
+    return items
@@ -0,0 +1,250 @@
+import asyncio
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from flux_analysis_agent import config
+
+_STATS_LIMIT = 40
+_PROFILE_ID = re.compile(r"^[\w.-]+$")
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar["_Capture | None"] = contextvars.ContextVar("flux_profile_capture", default=None)
+
+
+class _Capture:
+    def __init__(self, tool: str, data_id: str | None) -> None:
+        self.tool = tool
+        self.data_id = data_id
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.stages: list[dict[str, Any]] = []
+        self.cprofile = False
+        self.thread_id = threading.get_ident()
+        self.thread_profiles: list[cProfile.Profile] = []
+        self._profiled_threads: set[int] = set()
+
+    def add_stage(self, name: str, started: float, seconds: float) -> None:
+        self.stages.append(
+            {"stage": name, "start_seconds": started - self.started, "seconds": seconds}
+        )
+
+    def start_thread_profile(self) -> cProfile.Profile | None:
+        thread_id = threading.get_ident()
+        if not self.cprofile or thread_id == self.thread_id or thread_id in self._profiled_threads:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        self._profiled_threads.add(thread_id)
+        return profile
+
+    def stop_thread_profile(self, profile: cProfile.Profile) -> None:
+        profile.disable()
+        self._profiled_threads.discard(threading.get_ident())
+        self.thread_profiles.append(profile)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    capture = _current.get()
+    if capture is None:
+        yield
+        return
+    profile = capture.start_thread_profile()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        capture.add_stage(name, started, time.perf_counter() - started)
+        if profile is not None:
+            capture.stop_thread_profile(profile)
+
+
+class Profiler:
+    def __init__(
+        self,
+        directory: str | None = None,
+        sample_rate: float | None = None,
+        max_profiles: int | None = None,
+    ) -> None:
+        if directory is None:
+            directory = config.PROFILE_DIR
+        if sample_rate is None:
+            sample_rate = config.PROFILE_SAMPLE_RATE
+        if max_profiles is None:
+            max_profiles = config.PROFILE_MAX_FILES
+        self.directory = directory
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.max_profiles = max(1, max_profiles)
+        self._cprofile_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def instrument(self, tool: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        def decorate(handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(handler)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                requested = bool(kwargs.get("profile"))
+                if not requested and not (self.sample_rate and random.random() < self.sample_rate):
+                    return await handler(*args, **kwargs)
+                return await self._run(tool, handler, args, kwargs, requested)
+
+            return wrapper
+
+        return decorate
+
+    async def _run(
+        self,
+        tool: str,
+        handler: Callable[..., Awaitable[Any]],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        requested: bool,
+    ) -> Any:
+        capture = _Capture(tool, kwargs.get("data_id"))
+        token = _current.set(capture)
+        capture.cprofile = self._cprofile_lock.acquire(blocking=False)
+        result = None
+        try:
+            result = await handler(*args, **kwargs)
+            return result
+        finally:
+            if capture.cprofile:
+                self._cprofile_lock.release()
+            _current.reset(token)
+            if capture.data_id is None and isinstance(result, dict):
+                capture.data_id = result.get("data_id")
+            try:
+                profile_id = await asyncio.to_thread(
+                    self._save, capture, time.perf_counter() - capture.started, kwargs, requested, result
+                )
+            except Exception:
+                logger.exception("Failed to save the %s profile to %s", tool, self.directory)
+                profile_id = None
+            if requested and isinstance(result, dict) and profile_id:
+                result["profile_id"] = profile_id
+
+    def list_profiles(self, data_id: str | None = None, tool: str | None = None, limit: int = 20) -> list[dict[str, Any]]:
+        profiles = []
+        for profile_id in self._profile_ids():
+            summary = self._read_summary(profile_id)
+            if summary is None:
+                continue
+            if data_id is not None and summary.get("data_id") != data_id:
+                continue
+            if tool is not None and summary.get("tool") != tool:
+                continue
+            summary.pop("stats", None)
+            profiles.append(summary)
+            if len(profiles) >= limit:
+                break
+        return profiles
+
+    def get_profile(self, profile_id: str, sort_by: str = "cumulative", limit: int = _STATS_LIMIT) -> dict[str, Any] | None:
+        if not self.directory or not _PROFILE_ID.match(profile_id):
+            return None
+        summary = self._read_summary(profile_id)
+        if summary is None:
+            return None
+        prof_path = os.path.join(self.directory, f"{profile_id}.prof")
+        if os.path.exists(prof_path):
+            summary["profile_path"] = prof_path
+            summary["stats"] = _format_stats(pstats.Stats(prof_path), sort_by, limit)
+        return summary
+
+    def _save(
+        self,
+        capture: _Capture,
+        seconds: float,
+        kwargs: dict[str, Any],
+        requested: bool,
+        result: Any,
+    ) -> str | None:
+        if not self.directory:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(capture.started_at))
+        stamp = f"{stamp}{int(capture.started_at % 1 * 1000):03d}"
+        data_part = _safe_name(capture.data_id) if capture.data_id else "none"
+        profile_id = f"{stamp}-{capture.tool}-{data_part}-{uuid.uuid4().hex[:8]}"
+        summary: dict[str, Any] = {
+            "profile_id": profile_id,
+            "tool": capture.tool,
+            "data_id": capture.data_id,
+            "started_at": capture.started_at,
+            "seconds": seconds,
+            "trigger": "requested" if requested else "sampled",
+            "arguments": _argument_sizes(kwargs),
+            "failed": result is None or (isinstance(result, dict) and "error" in result),
+            "stages": capture.stages,
+            "cprofile": capture.cprofile,
+        }
+        with self._write_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if capture.thread_profiles:
+                stats = pstats.Stats(capture.thread_profiles[0])
+                for profile in capture.thread_profiles[1:]:
+                    stats.add(profile)
+                stats.dump_stats(os.path.join(self.directory, f"{profile_id}.prof"))
+            with open(os.path.join(self.directory, f"{profile_id}.json"), "w", encoding="utf-8") as handle:
+                json.dump(summary, handle)
+            self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        for profile_id in self._profile_ids()[self.max_profiles :]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.remove(os.path.join(self.directory, f"{profile_id}{suffix}"))
+                except OSError:
+                    pass
+
+    def _profile_ids(self) -> list[str]:
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        return sorted((name[:-5] for name in os.listdir(self.directory) if name.endswith(".json")), reverse=True)
+
+    def _read_summary(self, profile_id: str) -> dict[str, Any] | None:
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.json"), "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+
+def _format_stats(stats: pstats.Stats, sort_by: str, limit: int) -> str:
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.strip_dirs().sort_stats(sort_by).print_stats(limit)
+    return stream.getvalue()
+
+
+def _argument_sizes(kwargs: dict[str, Any]) -> dict[str, Any]:
+    sizes: dict[str, Any] = {}
+    for name, value in kwargs.items():
+        if isinstance(value, str):
+            sizes[name] = value if name.endswith("_id") else f"<{len(value)} chars>"
+        elif isinstance(value, (list, dict)):
+            sizes[name] = f"<{type(value).__name__} of {len(value)}>"
+        elif value is None or isinstance(value, (bool, int, float)):
+            sizes[name] = value
+    return sizes
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^\w.-]", "_", value)[:64]
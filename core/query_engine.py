@@ -0,0 +1,237 @@
+import fnmatch
+import heapq
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Any
+
+from flux_analysis_agent.core.analysis_engine import FluxColumns, group_totals
+from flux_analysis_agent.core.columnar import CategoricalColumn, ColumnarTable
+from flux_analysis_agent.core.flux_payload import compact_record
+
+ACCOUNT_PREFIX = "account_prefix"
+PATTERN_COLUMNS = ("account_id", "account_name")
+
+_NO_ROWS = array("I")
+_WILDCARDS = frozenset("*?[")
+
+
+class DatasetIndex:
+    def __init__(self, table: ColumnarTable, revision: int = 0) -> None:
+        self.table = table
+        self.revision = revision
+        self._columns: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def rows_for(self, column: str, value: Any) -> array | None:
+        index = self._column_index(column)
+        if index is None:
+            return None
+        return _as_rows(index.get(_index_key(value), _NO_ROWS))
+
+    def match_rows(self, columns: Sequence[str], pattern: str) -> list[int]:
+        matcher = _compile_pattern(pattern)
+        rows: set[int] = set()
+        for column in columns:
+            index = self._column_index(column)
+            if index is None:
+                continue
+            for key, entry in index.items():
+                if matcher(key):
+                    if isinstance(entry, int):
+                        rows.add(entry)
+                    else:
+                        rows.update(entry)
+        return sorted(rows)
+
+    def update_row(self, row: int, previous: dict[str, Any] | None) -> None:
+        with self._lock:
+            for column, index in self._columns.items():
+                if previous is not None and column not in previous:
+                    continue
+                key = _index_key(self.table.columns[column].get(row))
+                if previous is not None:
+                    previous_key = _index_key(previous[column])
+                    if previous_key == key:
+                        continue
+                    _remove_row(index, previous_key, row)
+                _insert_row(index, key, row)
+
+    def _column_index(self, column: str) -> dict[str, Any] | None:
+        index = self._columns.get(column)
+        if index is not None:
+            return index
+        source = self.table.columns.get(column)
+        if source is None:
+            return None
+        with self._lock:
+            index = self._columns.get(column)
+            if index is None:
+                index = self._columns[column] = _build_index(source, len(self.table))
+            return index
+
+
+def get_index(dataset: dict[str, Any]) -> DatasetIndex:
+    revision = dataset.get("revision", 0)
+    index = dataset.get("index")
+    if index is None or index.revision != revision:
+        index = dataset["index"] = DatasetIndex(dataset["table"], revision)
+    return index
+
+
+def select_positions(
+    flux: FluxColumns,
+    index: DatasetIndex,
+    filters: dict[str, Any] | None = None,
+    account_pattern: str | None = None,
+    only_significant: bool = False,
+) -> list[int]:
+    row_sets: list[Sequence[int]] = []
+    for column, value in (filters or {}).items():
+        rows = index.rows_for(column, value)
+        if rows is None:
+            raise ValueError(f"Unknown column: {column}.")
+        row_sets.append(rows)
+    if account_pattern:
+        row_sets.append(index.match_rows(PATTERN_COLUMNS, account_pattern))
+
+    if row_sets:
+        row_sets.sort(key=len)
+        selected: Sequence[int] = row_sets[0]
+        for other in row_sets[1:]:
+            members = set(other)
+            selected = [row for row in selected if row in members]
+        positions = flux.positions_for_rows(selected)
+    else:
+        positions = list(range(len(flux)))
+
+    if only_significant:
+        exceeds = flux.exceeds
+        positions = [position for position in positions if exceeds[position]]
+    return positions
+
+
+def top_variances(flux: FluxColumns, positions: Sequence[int], limit: int) -> dict[str, Any]:
+    change_amount = flux.change_amount
+    ranked = heapq.nlargest(limit, positions, key=lambda position: abs(change_amount[position]))
+    current = sum(map(flux.current.__getitem__, positions))
+    prior = sum(map(flux.prior.__getitem__, positions))
+    return compact_record(
+        {
+            "matching_accounts": len(positions),
+            "significant_accounts": sum(map(flux.exceeds.__getitem__, positions)),
+            "current_period_amount": current,
+            "prior_period_amount": prior,
+            "change_amount": current - prior,
+            "variances": [compact_record(record) for record in flux.to_records(ranked)],
+            "omitted_variances": len(positions) - len(ranked),
+        }
+    )
+
+
+def group_variances(
+    flux: FluxColumns,
+    positions: Sequence[int],
+    by: str,
+    prefix_length: int,
+    limit: int,
+) -> dict[str, Any]:
+    table = flux.table
+    rows = [flux.rows[position] for position in positions]
+    if by == ACCOUNT_PREFIX:
+        keys = [
+            None if account_id is None else str(account_id)[:prefix_length]
+            for account_id in table.take("account_id", rows)
+        ]
+    elif by in table.columns:
+        keys = table.take(by, rows)
+    else:
+        raise ValueError(f"Unknown column: {by}.")
+
+    groups = group_totals(flux, keys, positions, label=by)
+    return {
+        "group_by": by,
+        "matching_accounts": len(positions),
+        "groups": [compact_record(group) for group in groups[:limit]],
+        "omitted_groups": max(0, len(groups) - limit),
+    }
+
+
+def lookup_account(flux: FluxColumns, index: DatasetIndex, account_id: str) -> dict[str, Any]:
+    rows = index.rows_for("account_id", account_id)
+    if rows is None:
+        raise ValueError("Dataset has no account_id column.")
+    positions = flux.positions_for_rows(rows)
+    return {
+        "account_id": account_id,
+        "found": bool(positions),
+        "rows_without_amounts": len(rows) - len(positions),
+        "variances": [compact_record(record) for record in flux.to_records(positions)],
+    }
+
+
+def _build_index(column: Any, row_count: int) -> dict[str, Any]:
+    if isinstance(column, CategoricalColumn):
+        keys = [_index_key(value) for value in column.dictionary]
+        values = map(keys.__getitem__, column.codes)
+    else:
+        values = map(_index_key, column.take(range(row_count)))
+
+    index: dict[str, Any] = {}
+    for row, key in enumerate(values):
+        entry = index.get(key)
+        if entry is None:
+            index[key] = row
+        elif isinstance(entry, int):
+            index[key] = array("I", (entry, row))
+        else:
+            entry.append(row)
+    return index
+
+
+def _insert_row(index: dict[str, Any], key: str, row: int) -> None:
+    entry = index.get(key)
+    if entry is None:
+        index[key] = row
+    elif isinstance(entry, int):
+        index[key] = array("I", sorted((entry, row)))
+    else:
+        entry.insert(bisect_left(entry, row), row)
+
+
+def _remove_row(index: dict[str, Any], key: str, row: int) -> None:
+    entry = index.get(key)
+    if entry is None:
+        return
+    if isinstance(entry, int):
+        if entry == row:
+            del index[key]
+        return
+    position = bisect_left(entry, row)
+    if position < len(entry) and entry[position] == row:
+        del entry[position]
+    if len(entry) == 1:
+        index[key] = entry[0]
+    elif not entry:
+        del index[key]
+
+
+def _as_rows(entry: Any) -> array:
+    if isinstance(entry, int):
+        return array("I", (entry,))
+    return entry
+
+
+def _index_key(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).strip().casefold()
+
+
+def _compile_pattern(pattern: str) -> Any:
+    pattern = pattern.strip().casefold()
+    if not _WILDCARDS.intersection(pattern):
+        pattern = f"*{pattern}*"
+    return re.compile(fnmatch.translate(pattern)).match
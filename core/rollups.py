@@ -0,0 +1,141 @@
+import threading
+from collections.abc import Sequence
+from typing import Any
+
+from flux_analysis_agent import config
+from flux_analysis_agent.core.analysis_engine import FluxColumns, compute_flux_columns
+from flux_analysis_agent.core.columnar import ColumnarTable
+
+CATEGORY_LEVEL = "category"
+PREFIX_LEVEL = "account_prefix"
+
+
+class Rollups:
+    def __init__(
+        self,
+        prefix_lengths: Sequence[int] | None = None,
+        default_threshold_percent: float | None = None,
+        revision: int = 0,
+    ) -> None:
+        if prefix_lengths is None:
+            prefix_lengths = config.ROLLUP_PREFIX_LENGTHS
+        if default_threshold_percent is None:
+            default_threshold_percent = config.DEFAULT_THRESHOLD_PERCENT
+        self.prefix_lengths = sorted({length for length in prefix_lengths if length > 0})
+        self.default_threshold_percent = float(default_threshold_percent)
+        self.revision = revision
+        self.row_count = 0
+        self._totals: dict[str, dict[Any, list[Any]]] = {CATEGORY_LEVEL: {}}
+        for length in self.prefix_lengths:
+            self._totals[_prefix_level(length)] = {}
+        self._summaries: dict[str, list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_table(cls, table: ColumnarTable, revision: int = 0) -> "Rollups":
+        rollups = cls(revision=revision)
+        rollups.extend(table)
+        return rollups
+
+    @property
+    def levels(self) -> list[str]:
+        return list(self._totals)
+
+    def extend(self, table: ColumnarTable) -> None:
+        if len(table) <= self.row_count:
+            return
+        flux = compute_flux_columns(table, self.default_threshold_percent, start=self.row_count)
+        self.add(flux)
+        self.row_count = len(table)
+
+    def add(self, flux: FluxColumns, positions: Sequence[int] | None = None, sign: int = 1) -> None:
+        if positions is None:
+            positions = range(len(flux))
+        rows = [flux.rows[position] for position in positions]
+        current = [flux.current[position] for position in positions]
+        prior = [flux.prior[position] for position in positions]
+        flags = [flux.exceeds[position] for position in positions]
+        table = flux.table
+
+        with self._lock:
+            self._accumulate(self._totals[CATEGORY_LEVEL], table.take("category", rows), current, prior, flags, sign)
+            if self.prefix_lengths:
+                account_ids = [
+                    "" if account_id is None else str(account_id)
+                    for account_id in table.take("account_id", rows)
+                ]
+                for length in self.prefix_lengths:
+                    keys = [account_id[:length] for account_id in account_ids]
+                    self._accumulate(self._totals[_prefix_level(length)], keys, current, prior, flags, sign)
+            self._summaries.clear()
+
+    def summary(self, level: str = CATEGORY_LEVEL) -> list[dict[str, Any]]:
+        summary = self._summaries.get(level)
+        if summary is not None:
+            return summary
+        totals = self._totals.get(level)
+        if totals is None:
+            raise ValueError(f"Unknown rollup level: {level}. Use one of: {', '.join(self.levels)}.")
+
+        with self._lock:
+            label = CATEGORY_LEVEL if level == CATEGORY_LEVEL else PREFIX_LEVEL
+            parent_length = self._parent_length(level)
+            summary = []
+            for key, (count, significant, current, prior) in totals.items():
+                item = {
+                    label: key,
+                    "count": count,
+                    "significant_count": significant,
+                    "current_period_amount": current,
+                    "prior_period_amount": prior,
+                    "change_amount": current - prior,
+                }
+                if parent_length:
+                    item["parent"] = key[:parent_length]
+                summary.append(item)
+            summary.sort(key=lambda item: abs(item["change_amount"]), reverse=True)
+            self._summaries[level] = summary
+        return summary
+
+    def _parent_length(self, level: str) -> int:
+        if level == CATEGORY_LEVEL:
+            return 0
+        length = int(level.rsplit("_", 1)[1])
+        shorter = [candidate for candidate in self.prefix_lengths if candidate < length]
+        return shorter[-1] if shorter else 0
+
+    @staticmethod
+    def _accumulate(
+        totals: dict[Any, list[Any]],
+        keys: Sequence[Any],
+        current: Sequence[float],
+        prior: Sequence[float],
+        flags: Sequence[int],
+        sign: int,
+    ) -> None:
+        for key, current_amount, prior_amount, flag in zip(keys, current, prior, flags):
+            entry = totals.get(key)
+            if entry is None:
+                entry = totals[key] = [0, 0, 0.0, 0.0]
+            entry[0] += sign
+            entry[1] += sign * flag
+            entry[2] += sign * current_amount
+            entry[3] += sign * prior_amount
+            if entry[0] == 0:
+                del totals[key]
+
+
+def get_rollups(dataset: dict[str, Any]) -> Rollups:
+    revision = dataset.get("revision", 0)
+    rollups = dataset.get("rollups")
+    if (
+        rollups is None
+        or rollups.revision != revision
+        or rollups.default_threshold_percent != config.DEFAULT_THRESHOLD_PERCENT
+    ):
+        rollups = dataset["rollups"] = Rollups.from_table(dataset["table"], revision)
+    return rollups
+
+
+def _prefix_level(length: int) -> str:
+    return f"{PREFIX_LEVEL}_{length}"
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from flux_analysis_agent import config
+from flux_analysis_agent.core.columnar import parse_float
+
+
+class SchemaCache:
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        if path is None:
+            path = config.SCHEMA_CACHE_PATH
+        if ttl_seconds is None:
+            ttl_seconds = config.SCHEMA_CACHE_TTL_SECONDS
+        if max_entries is None:
+            max_entries = config.SCHEMA_CACHE_MAX_ENTRIES
+        self._path = path or None
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def get(self, fingerprint: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None and self._expired(entry):
+                del self._entries[fingerprint]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return entry["schema"]
+
+    def put(self, fingerprint: str, schema: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[fingerprint] = {"schema": schema, "stored_at": time.time()}
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _expired(self, entry: dict[str, Any]) -> bool:
+        if self._ttl_seconds <= 0:
+            return False
+        return time.time() - entry.get("stored_at", 0) > self._ttl_seconds
+
+    def _load(self) -> None:
+        if not self._path:
+            return
+        try:
+            with open(self._path, "r", encoding="utf-8") as handle:
+                stored = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if not isinstance(stored, dict):
+            return
+        entries = sorted(stored.items(), key=lambda item: item[1].get("stored_at", 0))
+        for fingerprint, entry in entries:
+            if isinstance(entry, dict) and "schema" in entry and not self._expired(entry):
+                self._entries[fingerprint] = entry
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self) -> None:
+        if not self._path:
+            return
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self._entries, handle)
+        os.replace(temp_path, self._path)
+
+
+def schema_fingerprint(columns: list[str], sample_rows: list[dict[str, Any]]) -> str:
+    signature = {column: _value_kinds(row.get(column) for row in sample_rows) for column in columns}
+    payload = json.dumps({"columns": columns, "types": signature}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _value_kinds(values: Any) -> str:
+    kinds = set()
+    for value in values:
+        if value is None or value == "":
+            kinds.add("empty")
+        elif parse_float(value) is not None:
+            kinds.add("number")
+        else:
+            kinds.add("text")
+    return "+".join(sorted(kinds))
@@ -1,19 +1,77 @@
 import json
+import re
 from typing import Any
 
 from flux_analysis_agent.core.llm_manager import LLMManager
+from flux_analysis_agent.core.schema_cache import SchemaCache, schema_fingerprint
 
 
 def infer_schema(
     columns: list[str],
     sample_rows: list[dict[str, Any]],
     llm: LLMManager | None,
+    cache: SchemaCache | None = None,
+    profile: dict[str, dict[str, Any]] | None = None,
 ) -> dict[str, Any]:
     if not llm:
-        return _heuristic_schema(columns, sample_rows)
+        return heuristic_schema(columns, sample_rows, profile)
 
-    prompt = _build_prompt(columns, sample_rows)
-    messages = [
+    cached = cached_schema(columns, sample_rows, cache)
+    if cached is not None:
+        return cached
+
+    response = llm.chat(_build_messages(columns, sample_rows, profile))
+    try:
+        return _schema_from_response(response, columns, sample_rows, llm, cache, profile)
+    except ValueError:
+        return heuristic_schema(columns, sample_rows, profile)
+
+
+async def ainfer_schema(
+    columns: list[str],
+    sample_rows: list[dict[str, Any]],
+    llm: LLMManager | None,
+    cache: SchemaCache | None = None,
+    profile: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    if not llm:
+        return heuristic_schema(columns, sample_rows, profile)
+
+    cached = cached_schema(columns, sample_rows, cache)
+    if cached is not None:
+        return cached
+
+    return await arequest_schema(columns, sample_rows, llm, cache, profile)
+
+
+async def arequest_schema(
+    columns: list[str],
+    sample_rows: list[dict[str, Any]],
+    llm: LLMManager,
+    cache: SchemaCache | None = None,
+    profile: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    response = await llm.achat(_build_messages(columns, sample_rows, profile))
+    return _schema_from_response(response, columns, sample_rows, llm, cache, profile)
+
+
+def cached_schema(
+    columns: list[str],
+    sample_rows: list[dict[str, Any]],
+    cache: SchemaCache | None,
+) -> dict[str, Any] | None:
+    if cache is None:
+        return None
+    return cache.get(schema_fingerprint(columns, sample_rows))
+
+
+def _build_messages(
+    columns: list[str],
+    sample_rows: list[dict[str, Any]],
+    profile: dict[str, dict[str, Any]] | None = None,
+) -> list[dict[str, Any]]:
+    prompt = _build_prompt(columns, sample_rows, profile)
+    return [
         {
             "role": "system",
             "content": (
@@ -24,29 +82,57 @@ def infer_schema(
         {"role": "user", "content": prompt},
     ]
 
-    response = llm.chat(messages)
+
+def _schema_from_response(
+    response: Any,
+    columns: list[str],
+    sample_rows: list[dict[str, Any]],
+    llm: LLMManager,
+    cache: SchemaCache | None,
+    profile: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
     message = llm.extract_message(response)
     content = message.content or ""
 
     try:
         parsed = llm.parse_json(content)
-        return _normalize_schema(parsed, columns)
-    except Exception:
-        return _heuristic_schema(columns, sample_rows)
+        schema = _normalize_schema(parsed, columns, profile)
+    except Exception as exc:
+        raise ValueError(f"The model's schema reply could not be parsed: {exc}") from exc
 
+    if cache is not None:
+        cache.put(schema_fingerprint(columns, sample_rows), schema)
+    return schema
 
-def _build_prompt(columns: list[str], sample_rows: list[dict[str, Any]]) -> str:
+
+def _build_prompt(
+    columns: list[str],
+    sample_rows: list[dict[str, Any]],
+    profile: dict[str, dict[str, Any]] | None = None,
+) -> str:
     sample_preview = sample_rows[:3]
+    profile_text = ""
+    if profile:
+        profile_text = (
+            "Profile of every row per column (JSON; numeric_rate is the share of non-empty values "
+            "that parse as numbers, null_ratio the share of empty values, distinct an estimate): "
+            f"{json.dumps(profile, separators=(',', ':'))}. "
+        )
     return (
         "We have a table with columns: "
         f"{', '.join(columns)}. "
         "Here are sample rows (JSON): "
         f"{json.dumps(sample_preview)}. "
+        f"{profile_text}"
         "Explain the schema and identify the role/type of each column."
     )
 
 
-def _normalize_schema(parsed: dict[str, Any], columns: list[str]) -> dict[str, Any]:
+def _normalize_schema(
+    parsed: dict[str, Any],
+    columns: list[str],
+    profile: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
     description = str(parsed.get("description", "")).strip()
     column_types = parsed.get("column_types", {})
     if not isinstance(column_types, dict):
@@ -56,16 +142,88 @@ def _normalize_schema(parsed: dict[str, Any], columns: list[str]) -> dict[str, A
     for column in columns:
         value = column_types.get(column)
         if value is None:
-            value = _guess_type_from_name(column)
+            value = _guess_type_from_profile(column, (profile or {}).get(column))
         normalized["column_types"][column] = str(value)
 
     return normalized
 
 
-def _heuristic_schema(columns: list[str], sample_rows: list[dict[str, Any]]) -> dict[str, Any]:
+def detect_period_columns(
+    columns: list[str],
+    column_types: dict[str, str] | None,
+    profile: dict[str, dict[str, Any]] | None = None,
+) -> list[str]:
+    column_types = column_types or {}
+    profile = profile or {}
+    candidates = []
+    for position, column in enumerate(columns):
+        if column in _FLUX_COLUMNS or not _holds_amounts(column_types.get(column), profile.get(column)):
+            continue
+        key = _period_key(column)
+        if key is not None:
+            candidates.append((key, position, column))
+    if len(candidates) < 2:
+        return []
+    return [column for _, _, column in sorted(candidates)]
+
+
+def _holds_amounts(column_type: Any, profile: dict[str, Any] | None) -> bool:
+    if profile and profile.get("null_ratio", 1) < 1 and profile.get("numeric_rate", 0) >= _NUMERIC_RATE:
+        return True
+    name = str(column_type or "").lower()
+    return any(token in name for token in _NUMERIC_TYPES)
+
+
+def _period_key(column: str) -> tuple[int, int] | None:
+    name = column.strip().lower()
+    match = _YEAR_MONTH.fullmatch(name)
+    if match:
+        month = int(match.group(2))
+        return (int(match.group(1)), month) if 1 <= month <= 12 else None
+    match = _MONTH_YEAR.fullmatch(name)
+    if match:
+        return _full_year(match.group(2)), _MONTHS.index(match.group(1)[:3]) + 1
+    match = _YEAR_QUARTER.fullmatch(name)
+    if match:
+        return int(match.group(1)), int(match.group(2)) * 3
+    match = _QUARTER_YEAR.fullmatch(name)
+    if match:
+        return _full_year(match.group(2)), int(match.group(1)) * 3
+    match = _PERIOD_NUMBER.fullmatch(name)
+    if match:
+        return 0, int(match.group(2))
+    return None
+
+
+def _full_year(text: str) -> int:
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+
+_NUMERIC_RATE = 0.95
+_NUMERIC_TYPES = ("numeric", "number", "amount", "currency", "monetary", "decimal", "float", "integer")
+_FLUX_COLUMNS = frozenset({"current_period_amount", "prior_period_amount", "threshold_value"})
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_MONTH_NAME = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*"
+_SEPARATOR = r"[\s_\-/.']*"
+_YEAR_MONTH = re.compile(rf"(?:[a-z]+{_SEPARATOR})?(\d{{4}}){_SEPARATOR}(\d{{1,2}})")
+_MONTH_YEAR = re.compile(rf"{_MONTH_NAME}{_SEPARATOR}(\d{{2}}|\d{{4}})")
+_YEAR_QUARTER = re.compile(rf"(?:fy)?(\d{{4}}){_SEPARATOR}q([1-4])")
+_QUARTER_YEAR = re.compile(rf"q([1-4]){_SEPARATOR}(?:fy)?(\d{{2}}|\d{{4}})")
+_PERIOD_NUMBER = re.compile(rf"(p|m|period|month){_SEPARATOR}(\d{{1,2}})")
+
+
+def heuristic_schema(
+    columns: list[str],
+    sample_rows: list[dict[str, Any]],
+    profile: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
     column_types: dict[str, str] = {}
     for column in columns:
-        column_types[column] = _guess_type_from_samples(column, sample_rows)
+        if profile and column in profile:
+            column_types[column] = _guess_type_from_profile(column, profile[column])
+        else:
+            column_types[column] = _guess_type_from_samples(column, sample_rows)
 
     description = f"Dataset with {len(columns)} columns: {', '.join(columns)}."
     return {"description": description, "column_types": column_types}
@@ -88,6 +246,12 @@ def _guess_type_from_samples(column: str, sample_rows: list[dict[str, Any]]) ->
     return _guess_type_from_name(column)
 
 
+def _guess_type_from_profile(column: str, profile: dict[str, Any] | None) -> str:
+    if profile and profile.get("null_ratio", 1) < 1 and profile.get("numeric_rate", 0) >= _NUMERIC_RATE:
+        return "numeric"
+    return _guess_type_from_name(column)
+
+
 def _guess_type_from_name(column: str) -> str:
     name = column.lower()
     if "id" in name:
@@ -0,0 +1,146 @@
+from array import array
+from multiprocessing import shared_memory
+from typing import Any
+
+from flux_analysis_agent import config
+from flux_analysis_agent.core.analysis_engine import FluxColumns, compute_flux_columns
+from flux_analysis_agent.core.columnar import CategoricalColumn, ColumnarTable, NumericColumn
+from flux_analysis_agent.core.worker_pool import WorkerPool
+
+_FLUX_INPUTS = ("current_period_amount", "prior_period_amount", "threshold_value", "threshold_type")
+
+
+def compute_flux_sharded(
+    table: ColumnarTable,
+    default_threshold_percent: float,
+    worker_pool: WorkerPool | None,
+    min_rows: int | None = None,
+) -> FluxColumns:
+    if min_rows is None:
+        min_rows = config.SHARD_MIN_ROWS
+    row_count = len(table)
+    shard_count = worker_pool.max_workers if worker_pool is not None else 1
+    if shard_count < 2 or row_count < max(min_rows, shard_count):
+        return compute_flux_columns(table, default_threshold_percent)
+    if not isinstance(table.columns.get("current_period_amount"), NumericColumn) or not isinstance(
+        table.columns.get("prior_period_amount"), NumericColumn
+    ):
+        return compute_flux_columns(table, default_threshold_percent)
+
+    blocks: list[shared_memory.SharedMemory] = []
+    try:
+        specs = {}
+        for name in _FLUX_INPUTS:
+            column = table.columns.get(name)
+            if isinstance(column, NumericColumn):
+                specs[name] = {
+                    "kind": "numeric",
+                    "values": _share(column.values, "d", blocks),
+                    "states": _share(column.states, "B", blocks),
+                }
+            elif isinstance(column, CategoricalColumn):
+                specs[name] = {
+                    "kind": "categorical",
+                    "codes": _share(column.codes, "I", blocks),
+                    "dictionary": column.dictionary,
+                }
+
+        bounds = [row_count * index // shard_count for index in range(shard_count + 1)]
+        jobs = [
+            {
+                "columns": specs,
+                "start": start,
+                "end": end,
+                "default_threshold_percent": default_threshold_percent,
+            }
+            for start, end in zip(bounds, bounds[1:])
+        ]
+        shards = worker_pool.map(compute_flux_shard, jobs)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    rows = array("I")
+    current = array("d")
+    prior = array("d")
+    change_amount = array("d")
+    change_percent = array("d")
+    has_percent = bytearray()
+    exceeds = bytearray()
+    for shard in shards:
+        rows.extend(shard["rows"])
+        current.extend(shard["current"])
+        prior.extend(shard["prior"])
+        change_amount.extend(shard["change_amount"])
+        change_percent.extend(shard["change_percent"])
+        has_percent.extend(shard["has_percent"])
+        exceeds.extend(shard["exceeds"])
+    return FluxColumns(table, rows, current, prior, change_amount, change_percent, has_percent, exceeds)
+
+
+def compute_flux_shard(job: dict[str, Any]) -> dict[str, Any]:
+    start = job["start"]
+    blocks: list[shared_memory.SharedMemory] = []
+    try:
+        flux = _shard_flux(job, start, job["end"], blocks)
+        result = {
+            "rows": array("I", [start + row for row in flux.rows]),
+            "current": flux.current,
+            "prior": flux.prior,
+            "change_amount": flux.change_amount,
+            "change_percent": flux.change_percent,
+            "has_percent": flux.has_percent,
+            "exceeds": flux.exceeds,
+        }
+        del flux
+        return result
+    finally:
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass
+
+
+def _shard_flux(
+    job: dict[str, Any],
+    start: int,
+    end: int,
+    blocks: list[shared_memory.SharedMemory],
+) -> FluxColumns:
+    columns: dict[str, Any] = {}
+    for name, spec in job["columns"].items():
+        if spec["kind"] == "numeric":
+            columns[name] = NumericColumn(
+                _attach(spec["values"], "d", start, end, blocks),
+                _attach(spec["states"], "B", start, end, blocks),
+            )
+        else:
+            columns[name] = CategoricalColumn(
+                _attach(spec["codes"], "I", start, end, blocks),
+                spec["dictionary"],
+            )
+    shard = ColumnarTable.from_columns(columns, end - start)
+    return compute_flux_columns(shard, job["default_threshold_percent"])
+
+
+def _share(buffer: Any, typecode: str, blocks: list[shared_memory.SharedMemory]) -> str:
+    source = memoryview(buffer).cast("B")
+    block = shared_memory.SharedMemory(create=True, size=max(1, source.nbytes))
+    blocks.append(block)
+    block.buf[: source.nbytes] = source
+    return block.name
+
+
+def _attach(
+    name: str,
+    typecode: str,
+    start: int,
+    end: int,
+    blocks: list[shared_memory.SharedMemory],
+) -> memoryview:
+    block = shared_memory.SharedMemory(name=name)
+    blocks.append(block)
+    itemsize = array(typecode).itemsize
+    return block.buf[start * itemsize : end * itemsize].cast(typecode)
@@ -1,29 +1,74 @@
+import json
 import os
 import sys
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 if __package__ in (None, ""):
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from flux_analysis_agent import config
+from flux_analysis_agent.core.answer_cache import AnswerCache
+from flux_analysis_agent.core.concurrency import ToolLimiter
 from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.flux_cache import FluxCache
 from flux_analysis_agent.core.llm_manager import LLMManager
+from flux_analysis_agent.core.metrics import MetricsRegistry
+from flux_analysis_agent.core.profiling import Profiler
+from flux_analysis_agent.core.schema_cache import SchemaCache
+from flux_analysis_agent.core.worker_pool import WorkerPool
+from flux_analysis_agent.tools import append_upload_chunk as append_upload_chunk_tool
+from flux_analysis_agent.tools import batch_analysis as batch_analysis_tool
+from flux_analysis_agent.tools import begin_upload as begin_upload_tool
+from flux_analysis_agent.tools import commit_upload as commit_upload_tool
+from flux_analysis_agent.tools import delete_data as delete_data_tool
 from flux_analysis_agent.tools import flux_agent as flux_agent_tool
+from flux_analysis_agent.tools import get_cache_stats as get_cache_stats_tool
+from flux_analysis_agent.tools import get_metrics as get_metrics_tool
 from flux_analysis_agent.tools import get_analysis_result as get_analysis_result_tool
+from flux_analysis_agent.tools import get_period_analysis as get_period_analysis_tool
+from flux_analysis_agent.tools import get_profiles as get_profiles_tool
+from flux_analysis_agent.tools import get_rollups as get_rollups_tool
+from flux_analysis_agent.tools import list_datasets as list_datasets_tool
+from flux_analysis_agent.tools import update_data as update_data_tool
 from flux_analysis_agent.tools import upload_data as upload_data_tool
 
 
 store = DataStore()
+worker_pool = WorkerPool()
+flux_cache = FluxCache(store, worker_pool=worker_pool)
+schema_cache = SchemaCache()
+answer_cache = AnswerCache()
+metrics = MetricsRegistry()
+metrics.add_collector("store", store.memory_usage)
+metrics.add_collector("flux_cache", flux_cache.stats)
+metrics.add_collector("schema_cache", schema_cache.stats)
+metrics.add_collector("answer_cache", answer_cache.stats)
+profiler = Profiler()
 llm = None
 if config.LLM_ENABLED:
     llm = LLMManager(
         api_key=config.OPENAI_API_KEY,
         model=config.OPENAI_MODEL,
         api_base=config.OPENAI_API_BASE,
+        timeout=config.LLM_TIMEOUT_SECONDS,
+        max_concurrency=config.LLM_MAX_CONCURRENCY,
+        max_retries=config.LLM_MAX_RETRIES,
+        metrics=metrics,
     )
 
-mcp = FastMCP("flux_analysis_agent")
+mcp = FastMCP("flux_analysis_agent", host=config.HOST, port=config.PORT)
+
+
+def _client_id() -> str:
+    try:
+        return str(id(mcp.get_context().session))
+    except ValueError:
+        return "local"
+
+
+limiter = ToolLimiter(client_id=_client_id)
+metrics.add_collector("tool_limiter", limiter.stats)
 
 
 @mcp.tool(
@@ -34,8 +79,79 @@ mcp = FastMCP("flux_analysis_agent")
         "output_schema": upload_data_tool.OUTPUT_SCHEMA,
     },
 )
-async def upload_data(csv_data: str, data_name: str | None = None) -> dict:
-    return await upload_data_tool.handle(csv_data, data_name, store, llm)
+@metrics.instrument("upload_data")
+@limiter.limit("upload_data")
+@profiler.instrument("upload_data")
+async def upload_data(csv_data: str, data_name: str | None = None, profile: bool = False) -> dict:
+    return await upload_data_tool.handle(csv_data, data_name, store, llm, schema_cache)
+
+
+@mcp.tool(
+    name="begin_upload",
+    description="Start a chunked upload session for a large CSV dataset.",
+    meta={
+        "input_schema": begin_upload_tool.INPUT_SCHEMA,
+        "output_schema": begin_upload_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("begin_upload")
+async def begin_upload(data_name: str | None = None) -> dict:
+    return await begin_upload_tool.handle(data_name, store)
+
+
+@mcp.tool(
+    name="append_upload_chunk",
+    description="Append the next chunk of CSV text to an upload session.",
+    meta={
+        "input_schema": append_upload_chunk_tool.INPUT_SCHEMA,
+        "output_schema": append_upload_chunk_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("append_upload_chunk")
+@limiter.limit("append_upload_chunk")
+async def append_upload_chunk(upload_id: str, chunk: str, chunk_index: int | None = None) -> dict:
+    return await append_upload_chunk_tool.handle(upload_id, chunk, chunk_index, store)
+
+
+@mcp.tool(
+    name="commit_upload",
+    description="Finish a chunked upload session and store the dataset for analysis.",
+    meta={
+        "input_schema": commit_upload_tool.INPUT_SCHEMA,
+        "output_schema": commit_upload_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("commit_upload")
+@limiter.limit("commit_upload")
+@profiler.instrument("commit_upload")
+async def commit_upload(upload_id: str, profile: bool = False) -> dict:
+    return await commit_upload_tool.handle(upload_id, store, llm, schema_cache)
+
+
+@mcp.tool(
+    name="update_data",
+    description="Upsert or delete rows by account_id in an existing dataset without re-uploading it.",
+    meta={
+        "input_schema": update_data_tool.INPUT_SCHEMA,
+        "output_schema": update_data_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("update_data")
+@limiter.limit("update_data")
+@profiler.instrument("update_data")
+async def update_data(
+    data_id: str,
+    upserts: list[dict] | None = None,
+    delete_account_ids: list[str] | None = None,
+    profile: bool = False,
+) -> dict:
+    return await update_data_tool.handle(
+        data_id,
+        store,
+        flux_cache,
+        upserts=upserts,
+        delete_account_ids=delete_account_ids,
+    )
 
 
 @mcp.tool(
@@ -46,24 +162,222 @@ async def upload_data(csv_data: str, data_name: str | None = None) -> dict:
         "output_schema": get_analysis_result_tool.OUTPUT_SCHEMA,
     },
 )
-async def get_analysis_result(data_id: str, only_significant: bool = False) -> dict:
-    return await get_analysis_result_tool.handle(data_id, only_significant, store)
+@metrics.instrument("get_analysis_result")
+@limiter.limit("get_analysis_result")
+@profiler.instrument("get_analysis_result")
+async def get_analysis_result(
+    data_id: str,
+    only_significant: bool = False,
+    sort_by: str | None = None,
+    category: str | list[str] | None = None,
+    top_k: int | None = None,
+    page_size: int | None = None,
+    cursor: str | None = None,
+    profile: bool = False,
+) -> dict:
+    return await get_analysis_result_tool.handle(
+        data_id,
+        only_significant,
+        store,
+        flux_cache,
+        sort_by=sort_by,
+        category=category,
+        top_k=top_k,
+        page_size=page_size,
+        cursor=cursor,
+    )
+
+
+@mcp.tool(
+    name="batch_analysis",
+    description=(
+        "Analyze many datasets in parallel worker processes. Each dataset's result is sent as a "
+        "log notification as soon as it finishes."
+    ),
+    meta={
+        "input_schema": batch_analysis_tool.INPUT_SCHEMA,
+        "output_schema": batch_analysis_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("batch_analysis")
+@limiter.limit("batch_analysis")
+async def batch_analysis(
+    data_ids: list[str],
+    ctx: Context,
+    only_significant: bool = False,
+    sort_by: str | None = None,
+    top_k: int | None = 10,
+) -> dict:
+    async def on_result(result: dict, done: int, total: int) -> None:
+        await ctx.report_progress(done, total)
+        await ctx.info(json.dumps(result))
+
+    return await batch_analysis_tool.handle(
+        data_ids,
+        store,
+        worker_pool,
+        only_significant=only_significant,
+        sort_by=sort_by,
+        top_k=top_k,
+        on_result=on_result,
+    )
+
+
+@mcp.tool(
+    name="get_period_analysis",
+    description="Compute changes between consecutive period columns, with rolling statistics, in one pass.",
+    meta={
+        "input_schema": get_period_analysis_tool.INPUT_SCHEMA,
+        "output_schema": get_period_analysis_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("get_period_analysis")
+@limiter.limit("get_period_analysis")
+async def get_period_analysis(
+    data_id: str,
+    period_columns: list[str] | None = None,
+    only_significant: bool = False,
+    rolling_window: int = 3,
+    top_k: int | None = None,
+) -> dict:
+    return await get_period_analysis_tool.handle(
+        data_id,
+        store,
+        period_columns=period_columns,
+        only_significant=only_significant,
+        rolling_window=rolling_window,
+        top_k=top_k,
+    )
+
+
+@mcp.tool(
+    name="get_rollups",
+    description="Return precomputed category (or account-prefix) totals and threshold exceedance counts.",
+    meta={
+        "input_schema": get_rollups_tool.INPUT_SCHEMA,
+        "output_schema": get_rollups_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("get_rollups")
+@limiter.limit("get_rollups")
+async def get_rollups(data_id: str, level: str = "category", limit: int | None = None) -> dict:
+    return await get_rollups_tool.handle(data_id, store, level=level, limit=limit)
 
 
 @mcp.tool(
     name="flux_agent",
-    description="LLM-driven agent that interprets questions and explains analysis.",
+    description=(
+        "LLM-driven agent that interprets questions and explains analysis. Streams stage progress and "
+        "the draft answer as progress notifications when the request carries a progress token."
+    ),
     meta={
         "input_schema": flux_agent_tool.INPUT_SCHEMA,
         "output_schema": flux_agent_tool.OUTPUT_SCHEMA,
     },
 )
-async def flux_agent(data_id: str, query: str) -> dict:
-    return await flux_agent_tool.handle(data_id, query, store, llm)
+@metrics.instrument("flux_agent")
+@limiter.limit("flux_agent")
+@profiler.instrument("flux_agent")
+async def flux_agent(data_id: str, query: str, ctx: Context, profile: bool = False) -> dict:
+    meta = ctx.request_context.meta
+    if meta is None or meta.progressToken is None:
+        return await flux_agent_tool.handle(data_id, query, store, llm, flux_cache, answer_cache=answer_cache)
+
+    step = 0
+
+    async def on_progress(kind: str, message: str) -> None:
+        nonlocal step
+        step += 1
+        await ctx.report_progress(step, None, message=message)
+
+    return await flux_agent_tool.handle(
+        data_id, query, store, llm, flux_cache, on_progress=on_progress, answer_cache=answer_cache
+    )
+
+
+@mcp.tool(
+    name="list_datasets",
+    description="List stored datasets with their row counts and memory footprint.",
+    meta={
+        "input_schema": list_datasets_tool.INPUT_SCHEMA,
+        "output_schema": list_datasets_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("list_datasets")
+async def list_datasets() -> dict:
+    return await list_datasets_tool.handle(store)
+
+
+@mcp.tool(
+    name="delete_data",
+    description="Delete a stored dataset; storage shared with duplicate uploads is kept until its last data_id is deleted.",
+    meta={
+        "input_schema": delete_data_tool.INPUT_SCHEMA,
+        "output_schema": delete_data_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("delete_data")
+async def delete_data(data_id: str) -> dict:
+    return await delete_data_tool.handle(data_id, store)
+
+
+@mcp.tool(
+    name="get_cache_stats",
+    description="Report hit rates and sizes of the flux result, schema inference and agent answer caches.",
+    meta={
+        "input_schema": get_cache_stats_tool.INPUT_SCHEMA,
+        "output_schema": get_cache_stats_tool.OUTPUT_SCHEMA,
+    },
+)
+@metrics.instrument("get_cache_stats")
+async def get_cache_stats() -> dict:
+    return await get_cache_stats_tool.handle(flux_cache, schema_cache, answer_cache)
+
+
+@mcp.tool(
+    name="get_metrics",
+    description="Report per-tool latency, payload and row histograms, LLM token counts, errors and store memory.",
+    meta={
+        "input_schema": get_metrics_tool.INPUT_SCHEMA,
+        "output_schema": get_metrics_tool.OUTPUT_SCHEMA,
+    },
+)
+async def get_metrics() -> dict:
+    return await get_metrics_tool.handle(metrics)
+
+
+@mcp.tool(
+    name="get_profiles",
+    description="List captured tool profiles or fetch one with its stage timeline and hottest functions.",
+    meta={
+        "input_schema": get_profiles_tool.INPUT_SCHEMA,
+        "output_schema": get_profiles_tool.OUTPUT_SCHEMA,
+    },
+)
+async def get_profiles(
+    profile_id: str | None = None,
+    data_id: str | None = None,
+    tool: str | None = None,
+    limit: int | None = None,
+    sort_by: str = "cumulative",
+) -> dict:
+    return await get_profiles_tool.handle(
+        profiler,
+        profile_id=profile_id,
+        data_id=data_id,
+        tool=tool,
+        limit=limit,
+        sort_by=sort_by,
+    )
 
 
 def main() -> None:
-    mcp.run(transport="stdio")
+    try:
+        mcp.run(transport=config.MCP_TRANSPORT)
+    finally:
+        store.flush()
+        worker_pool.shutdown()
+        metrics.write_prometheus()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+import random
+import unittest
+
+from flux_analysis_agent.core.analysis_engine import compute_flux
+from flux_analysis_agent.core.data_store import DataStore
+
+
+def _ledger(rows: int, seed: int) -> str:
+    rng = random.Random(seed)
+    amounts = ["", "n/a", "0", "(1,250.50)", "2,000", "-17.25", "1e3", "999999"]
+    types = ["", "percentage", "absolute", "PERCENT", "abs", "other"]
+    thresholds = ["", "x", "0", "5", "12.5", "(3)", "1,000"]
+    lines = [
+        "account_id,account_name,category,current_period_amount,prior_period_amount,"
+        "threshold_type,threshold_value,je_details,operational_drivers"
+    ]
+    for index in range(rows):
+        current = rng.choice(amounts) if rng.random() < 0.3 else str(rng.randint(-50000, 50000))
+        prior = rng.choice(amounts) if rng.random() < 0.3 else str(rng.randint(-50000, 50000))
+        lines.append(
+            f'A{index},Account {index},C{index % 4},"{current}","{prior}",'
+            f'{rng.choice(types)},"{rng.choice(thresholds)}",JE{index % 3},'
+        )
+    return "\n".join(lines)
+
+
+class ComputeFluxTest(unittest.TestCase):
+    def test_column_pass_matches_the_row_loop(self) -> None:
+        store = DataStore(data_dir="")
+        rows = store.get_data(store.add_data(_ledger(3000, 7)))["data"]
+        for options in (None, {"only_significant": True}, {"default_threshold_percent": 2.5}):
+            expected = compute_flux(list(rows), options)
+            self.assertEqual(compute_flux(rows, options), expected, options)
+            self.assertTrue(expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+
+from flux_analysis_agent.core.data_store import DataStore
+
+_CSV = (
+    "account_id,current_period_amount,prior_period_amount,threshold_value\n"
+    'A1,"1,234.50",(12),5\n'
+    "A2,100,1e3,\n"
+    "A3,-0.25,abc,10.0\n"
+)
+_EXPECTED = [
+    {"account_id": "A1", "current_period_amount": "1,234.50", "prior_period_amount": "(12)", "threshold_value": "5"},
+    {"account_id": "A2", "current_period_amount": "100", "prior_period_amount": "1e3", "threshold_value": ""},
+    {"account_id": "A3", "current_period_amount": "-0.25", "prior_period_amount": "abc", "threshold_value": "10.0"},
+]
+
+
+class RowViewTest(unittest.TestCase):
+    def test_rows_return_the_original_cell_text(self) -> None:
+        store = DataStore(data_dir="")
+        data_id = store.add_data(_CSV)
+        self.assertEqual(list(store.get_data(data_id)["data"]), _EXPECTED)
+
+    def test_text_survives_updates_deletes_and_reload(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = DataStore(data_dir=directory)
+            data_id = store.add_data(_CSV)
+            store.update_rows(
+                data_id,
+                upserts=[{"account_id": "A3", "current_period_amount": "2,000"}],
+                delete_account_ids=["A1"],
+            )
+            store.flush()
+            expected = [_EXPECTED[1], {**_EXPECTED[2], "current_period_amount": "2,000"}]
+            self.assertEqual(list(store.get_data(data_id)["data"]), expected)
+            self.assertEqual(list(DataStore(data_dir=directory).get_data(data_id)["data"]), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
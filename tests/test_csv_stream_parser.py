@@ -0,0 +1,68 @@
+import csv
+import io
+import unittest
+
+from flux_analysis_agent.core.data_store import CsvStreamParser
+
+_STRAY_QUOTE = 'h1,h2\nA1,12" pipe\nA2,"multi\nline"\nA3,x\n'
+_QUOTED = 'h1,h2\nA1,"say ""hi"",\nthere"\nA2,"",\n"A3","x""\n""y"\nA4,a"b"c\n'
+
+
+def _parse(text: str, chunk_size: int) -> CsvStreamParser:
+    parser = CsvStreamParser()
+    for start in range(0, len(text), chunk_size):
+        parser.feed(text[start : start + chunk_size])
+    parser.close()
+    return parser
+
+
+def _rows(parser: CsvStreamParser) -> list[dict]:
+    table = parser.table
+    return [table.row(index) for index in range(len(table))]
+
+
+def _reader_rows(text: str) -> list[dict]:
+    header, *rows = csv.reader(io.StringIO(text, newline=""))
+    return [
+        {name: value.strip() for name, value in zip(header, row + [None] * (len(header) - len(row)))}
+        for row in rows
+    ]
+
+
+class CsvStreamParserTest(unittest.TestCase):
+    def test_matches_csv_reader_for_every_chunk_size(self) -> None:
+        for text in (_STRAY_QUOTE, _QUOTED):
+            expected = _reader_rows(text)
+            for chunk_size in range(1, len(text) + 1):
+                self.assertEqual(_rows(_parse(text, chunk_size)), expected, (text, chunk_size))
+
+    def test_stray_quote_in_unquoted_field(self) -> None:
+        rows = _rows(_parse(_STRAY_QUOTE, len(_STRAY_QUOTE)))
+        self.assertEqual(rows[1], {"h1": "A2", "h2": "multi\nline"})
+        self.assertEqual(len(rows), 3)
+
+    def test_rows_keep_coming_after_a_stray_quote(self) -> None:
+        rows = "".join(f"A{index},Account {index}\n" for index in range(2000))
+        text = 'h1,h2\nA-1,12" pipe\n' + rows
+        parser = CsvStreamParser()
+        fed = 0
+        for start in range(0, len(text), 256):
+            parser.feed(text[start : start + 256])
+            fed += 1
+            if fed == 8:
+                self.assertGreater(parser.row_count, 50)
+        parser.close()
+        self.assertEqual(_rows(parser), _reader_rows(text))
+
+    def test_chunking_does_not_change_the_hash(self) -> None:
+        rows = "".join(f'A{index},"Account\n""{index}"", x"\n' for index in range(50))
+        text = "h1,h2\n" + rows
+        expected = _parse(text, len(text))
+        for chunk_size in (1, 3, 17, 64):
+            parser = _parse(text, chunk_size)
+            self.assertEqual(parser.row_count, 50)
+            self.assertEqual(parser.content_hash, expected.content_hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+
+from flux_analysis_agent.core.data_store import DataStore
+
+_LEDGER = (
+    "account_id,account_name,current_period_amount,prior_period_amount\n"
+    'A1,Cash,"(1,250.50)",1000\n'
+    "A2,Revenue,2500,n/a\n"
+    "A3,Payroll,,300\n"
+)
+
+
+def _rows(store: DataStore, data_id: str) -> list[dict]:
+    return [dict(row) for row in store.get_data(data_id)["data"]]
+
+
+class RestartTest(unittest.TestCase):
+    def test_datasets_reload_from_the_data_dir(self) -> None:
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = DataStore(data_dir=data_dir)
+            data_id = store.add_data(_LEDGER, "ledger")
+            store.set_schema(data_id, {"schema_status": "ready", "schema_description": "A ledger"})
+            store.update_rows(
+                data_id,
+                upserts=[{"account_id": "A2", "prior_period_amount": "(7)"}, {"account_id": "A4"}],
+                delete_account_ids=["A1"],
+            )
+            store.flush()
+            expected = store.get_data(data_id)
+
+            reopened = DataStore(data_dir=data_dir)
+            self.assertEqual(
+                [(info["data_id"], info["state"], info["row_count"]) for info in reopened.list_datasets()],
+                [(data_id, "on_disk", 3)],
+            )
+            dataset = reopened.get_data(data_id)
+            self.assertEqual(dataset["revision"], expected["revision"])
+            self.assertEqual(dataset["meta"], expected["meta"])
+            self.assertEqual(_rows(reopened, data_id), _rows(store, data_id))
+            self.assertEqual(_rows(reopened, data_id)[0]["prior_period_amount"], "(7)")
+            self.assertEqual(reopened.describe(data_id)["schema_summary"], "A ledger")
+
+
+class DedupTest(unittest.TestCase):
+    def test_references_follow_aliases_through_deletes(self) -> None:
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = DataStore(data_dir=data_dir)
+            original = store.add_data(_LEDGER, "first")
+            alias = store.add_data(_LEDGER, "second")
+            other = store.add_data(_LEDGER)
+            expected = _rows(store, original)
+
+            self.assertEqual(store.describe(alias)["alias_of"], original)
+            self.assertEqual(store.describe(alias)["data_name"], "second")
+            self.assertEqual(store.describe(original)["references"], 3)
+            self.assertEqual(_rows(store, alias), expected)
+
+            self.assertTrue(store.delete_data(original))
+            self.assertEqual(store.describe(original)["state"], "missing")
+            info = store.describe(alias)
+            self.assertNotIn("alias_of", info)
+            self.assertEqual((info["data_name"], info["references"]), ("second", 2))
+            self.assertEqual(store.describe(other)["alias_of"], alias)
+            self.assertEqual(_rows(store, alias), expected)
+            self.assertEqual(_rows(DataStore(data_dir=data_dir), other), expected)
+
+            self.assertTrue(store.delete_data(other))
+            self.assertNotIn("references", store.describe(alias))
+            self.assertTrue(store.delete_data(alias))
+            self.assertEqual(store.list_datasets(), [])
+            self.assertNotIn("alias_of", store.describe(store.add_data(_LEDGER)))
+
+
+if __name__ == "__main__":
+    unittest.main()
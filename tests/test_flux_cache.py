@@ -0,0 +1,121 @@
+import threading
+import unittest
+
+from flux_analysis_agent.core.analysis_engine import SORT_KEYS
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.flux_cache import FluxCache
+
+
+def _ledger(rows: int) -> str:
+    lines = ["account_id,account_name,category,current_period_amount,prior_period_amount"]
+    for index in range(rows):
+        account_id = f"A{(index * 37) % rows:03d}-{index}"
+        lines.append(f"{account_id},Account {index},Cat{index % 3},{(index * 53) % 997},{(index * 31) % 883}")
+    return "\n".join(lines)
+
+
+class DeleteRowsTest(unittest.TestCase):
+    def _assert_delete_matches_fresh(self, position: int) -> None:
+        store = DataStore(data_dir="")
+        data_id = store.add_data(_ledger(40))
+        cache = FluxCache(store)
+        for sort_by in SORT_KEYS:
+            cache.select(data_id, sort_by=sort_by)
+
+        account_id = store.get_data(data_id)["data"][position]["account_id"]
+        cache.apply_update(store.update_rows(data_id, delete_account_ids=[account_id]))
+
+        fresh = FluxCache(store)
+        for sort_by in SORT_KEYS:
+            flux, positions, _ = cache.select(data_id, sort_by=sort_by)
+            expected_flux, expected, _ = fresh.select(data_id, sort_by=sort_by)
+            self.assertEqual(flux.to_records(positions), expected_flux.to_records(expected), sort_by)
+            self.assertNotIn(account_id, [record["account_id"] for record in flux.to_records(positions)])
+
+    def test_delete_first_row(self) -> None:
+        self._assert_delete_matches_fresh(0)
+
+    def test_delete_last_row(self) -> None:
+        self._assert_delete_matches_fresh(-1)
+
+
+class IncrementalUpdateTest(unittest.TestCase):
+    def test_updates_match_a_full_recompute(self) -> None:
+        store = DataStore(data_dir="")
+        data_id = store.add_data(_ledger(60))
+        cache = FluxCache(store)
+        cached = [cache.select(data_id, sort_by=sort_by)[0] for sort_by in SORT_KEYS][0]
+        rows = store.get_data(data_id)["data"]
+        ids = [rows[index]["account_id"] for index in (0, 7, 21, 33, 59)]
+        batches = [
+            {"upserts": [{"account_id": ids[0], "current_period_amount": "(1,250)"}]},
+            {"upserts": [{"account_id": "NEW-1", "current_period_amount": "500", "prior_period_amount": "0"}]},
+            {
+                "upserts": [
+                    {"account_id": ids[1], "prior_period_amount": "999", "current_period_amount": "1"},
+                    {"account_id": "NEW-2", "category": "Cat9", "current_period_amount": "12"},
+                ],
+                "delete_account_ids": [ids[2]],
+            },
+            {"delete_account_ids": [ids[3], "NEW-1"]},
+            {"upserts": [{"account_id": ids[4], "current_period_amount": "42", "prior_period_amount": "42"}]},
+        ]
+        for batch in batches:
+            cache.apply_update(store.update_rows(data_id, **batch))
+            fresh = FluxCache(store)
+            for sort_by in SORT_KEYS:
+                flux, positions, _ = cache.select(data_id, sort_by=sort_by)
+                expected_flux, expected, _ = fresh.select(data_id, sort_by=sort_by)
+                self.assertIs(flux, cached)
+                self.assertEqual(flux.to_records(positions), expected_flux.to_records(expected), (batch, sort_by))
+            self.assertEqual(cache.get_variances(data_id), fresh.get_variances(data_id), batch)
+
+
+class VariancesTest(unittest.TestCase):
+    def test_callers_cannot_mutate_the_cached_view(self) -> None:
+        store = DataStore(data_dir="")
+        data_id = store.add_data(_ledger(10))
+        cache = FluxCache(store)
+        expected = cache.get_variances(data_id)
+        first = cache.get_variances(data_id)
+        first[0]["account_id"] = "changed"
+        first.clear()
+        self.assertEqual(cache.get_variances(data_id), expected)
+
+
+class DatasetLockTest(unittest.TestCase):
+    def test_busy_dataset_does_not_block_others(self) -> None:
+        store = DataStore(data_dir="")
+        busy = store.add_data(_ledger(40), "busy")
+        other = store.add_data(_ledger(41), "other")
+        cache = FluxCache(store)
+        held = threading.Event()
+        release = threading.Event()
+
+        def hold() -> None:
+            with store.locked(busy):
+                held.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        try:
+            held.wait(5)
+            results = []
+            reader = threading.Thread(
+                target=lambda: results.append((cache.get_variances(other), store.list_datasets(), cache.stats()))
+            )
+            reader.start()
+            reader.join(5)
+            self.assertFalse(reader.is_alive())
+            records, datasets, stats = results[0]
+            self.assertEqual(len(records), 41)
+            self.assertEqual(len(datasets), 2)
+            self.assertEqual(stats["entries"], 1)
+        finally:
+            release.set()
+            thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
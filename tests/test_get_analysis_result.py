@@ -0,0 +1,34 @@
+import asyncio
+import unittest
+
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.flux_cache import FluxCache
+from flux_analysis_agent.tools import get_analysis_result
+
+
+def _ledger(rows: int, scale: int) -> str:
+    lines = ["account_id,account_name,category,current_period_amount,prior_period_amount"]
+    for index in range(rows):
+        lines.append(f"A{index:03d},Account {index},Cat{index % 3},{index * scale + 100},{index + 50}")
+    return "\n".join(lines)
+
+
+class CursorTest(unittest.TestCase):
+    def test_cursor_is_bound_to_its_dataset(self) -> None:
+        store = DataStore(data_dir="")
+        cache = FluxCache(store)
+        first = store.add_data(_ledger(10, 2))
+        second = store.add_data(_ledger(10, 3))
+
+        async def page(data_id: str, cursor: str | None = None) -> dict:
+            return await get_analysis_result.handle(
+                data_id, False, store, cache, sort_by="abs_change_amount", page_size=4, cursor=cursor
+            )
+
+        cursor = asyncio.run(page(first))["next_cursor"]
+        self.assertEqual(len(asyncio.run(page(first, cursor))["variances"]), 4)
+        self.assertIn("error", asyncio.run(page(second, cursor)))
+
+
+if __name__ == "__main__":
+    unittest.main()
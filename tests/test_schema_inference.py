@@ -0,0 +1,29 @@
+import unittest
+
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.schema_inference import detect_period_columns, heuristic_schema
+
+
+class DetectPeriodColumnsTest(unittest.TestCase):
+    def test_text_column_with_a_period_name_is_skipped(self) -> None:
+        store = DataStore(data_dir="")
+        data_id = store.add_data(
+            "account_id,2024-02,2024-01,2024-03,Q1 2024\n"
+            "A1,200,100,note,closed\n"
+            "A2,250,(150),see memo,open\n"
+        )
+        meta = store.get_data(data_id)["meta"]
+        columns = meta["columns"]
+        profile = meta["column_profile"]
+        column_types = heuristic_schema(columns, [], profile)["column_types"]
+        self.assertEqual(detect_period_columns(columns, column_types, profile), ["2024-01", "2024-02"])
+
+    def test_column_types_alone_decide_without_a_profile(self) -> None:
+        columns = ["Jan-24", "Feb-24", "Mar-24"]
+        column_types = {"Jan-24": "amount", "Feb-24": "numeric", "Mar-24": "date"}
+        self.assertEqual(detect_period_columns(columns, column_types), ["Jan-24", "Feb-24"])
+        self.assertEqual(detect_period_columns(columns, {}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from flux_analysis_agent.core.analysis_engine import compute_flux_columns
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.sharded_flux import compute_flux_sharded
+from flux_analysis_agent.core.worker_pool import WorkerPool
+
+_FIELDS = ("rows", "current", "prior", "change_amount", "change_percent", "has_percent", "exceeds")
+
+
+def _ledger(rows: int, seed: int) -> str:
+    rng = random.Random(seed)
+    amounts = ["", "n/a", "0", "(1,250.50)", "2,000", "-17.25"]
+    lines = ["account_id,current_period_amount,prior_period_amount,threshold_type,threshold_value"]
+    for index in range(rows):
+        current = rng.choice(amounts) if rng.random() < 0.3 else str(rng.randint(-50000, 50000))
+        prior = rng.choice(amounts) if rng.random() < 0.3 else str(rng.randint(-50000, 50000))
+        lines.append(
+            f'A{index},"{current}","{prior}",{rng.choice(["", "percentage", "absolute"])},'
+            f"{rng.choice(['', 'x', '0', '5', '12.5'])}"
+        )
+    return "\n".join(lines)
+
+
+class ShardedFluxTest(unittest.TestCase):
+    def test_sharded_output_matches_serial(self) -> None:
+        store = DataStore(data_dir="")
+        table = store.get_data(store.add_data(_ledger(1001, 3)))["data"].table
+        expected = compute_flux_columns(table, 7.5)
+        for workers in (2, 3):
+            pool = WorkerPool(workers)
+            try:
+                sharded = compute_flux_sharded(table, 7.5, pool, min_rows=1)
+            finally:
+                pool.shutdown()
+            for field in _FIELDS:
+                self.assertEqual(bytes(getattr(sharded, field)), bytes(getattr(expected, field)), (workers, field))
+            self.assertEqual(sharded.to_records(), expected.to_records())
+
+
+if __name__ == "__main__":
+    unittest.main()
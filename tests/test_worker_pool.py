@@ -0,0 +1,20 @@
+import asyncio
+import unittest
+
+from flux_analysis_agent.core.worker_pool import WorkerPool
+
+
+class WorkerPoolMapTest(unittest.TestCase):
+    def test_map_refuses_to_block_the_event_loop(self) -> None:
+        pool = WorkerPool(2)
+
+        async def call_map() -> None:
+            pool.map(abs, [-1, -2])
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(call_map())
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any
+
+from flux_analysis_agent.core.data_store import DataStore
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "upload_id": {
+            "type": "string",
+            "description": "Identifier of the upload session (from begin_upload).",
+        },
+        "chunk": {
+            "type": "string",
+            "description": (
+                "Next piece of the CSV text. The first chunk must start with the header row. "
+                "Chunks may split lines anywhere; partial lines are carried over to the next chunk."
+            ),
+        },
+        "chunk_index": {
+            "type": "integer",
+            "description": (
+                "Optional zero-based position of this chunk. Re-sending an already received "
+                "index is ignored, so failed sends can be retried safely."
+            ),
+        },
+    },
+    "required": ["upload_id", "chunk"],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "upload_id": {"type": "string"},
+        "next_chunk_index": {
+            "type": "integer",
+            "description": "Index expected for the next chunk; use it to resume an interrupted upload.",
+        },
+        "rows_received": {
+            "type": "integer",
+            "description": "Number of complete data rows parsed so far.",
+        },
+    },
+    "required": ["upload_id", "next_chunk_index", "rows_received"],
+}
+
+
+async def handle(
+    upload_id: str,
+    chunk: str,
+    chunk_index: int | None,
+    store: DataStore,
+) -> dict[str, Any]:
+    try:
+        return await asyncio.to_thread(store.append_upload, upload_id, chunk, chunk_index=chunk_index)
+    except Exception as exc:
+        return {"error": {"message": f"Failed to append upload chunk: {exc}"}}
@@ -0,0 +1,163 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from flux_analysis_agent import config
+from flux_analysis_agent.core.analysis_engine import SORT_KEYS
+from flux_analysis_agent.core.batch_analysis import analyze_dataset
+from flux_analysis_agent.core.concurrency import run_locked
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.worker_pool import WorkerPool
+
+_DEFAULT_TOP_K = 10
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "data_ids": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Datasets to analyze (as returned by upload_data).",
+        },
+        "only_significant": {
+            "type": "boolean",
+            "description": "If true, only include variances that exceed the defined threshold.",
+            "default": False,
+        },
+        "sort_by": {
+            "type": "string",
+            "enum": list(SORT_KEYS),
+            "description": "Optional ordering of each dataset's variances, as in get_analysis_result.",
+        },
+        "top_k": {
+            "type": "integer",
+            "minimum": 0,
+            "description": f"Variances to return per dataset (default {_DEFAULT_TOP_K}).",
+            "default": _DEFAULT_TOP_K,
+        },
+    },
+    "required": ["data_ids"],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "description": "One entry per analyzed dataset, in request order.",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "data_id": {"type": "string"},
+                    "row_count": {"type": "integer"},
+                    "total_accounts": {"type": "integer"},
+                    "significant_accounts": {"type": "integer"},
+                    "matching_count": {
+                        "type": "integer",
+                        "description": "Variances matching only_significant, before top_k.",
+                    },
+                    "variances": {"type": "array", "items": {"type": "object"}},
+                },
+            },
+        },
+        "errors": {
+            "type": "array",
+            "description": "Datasets that could not be analyzed.",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "data_id": {"type": "string"},
+                    "message": {"type": "string"},
+                },
+            },
+        },
+    },
+    "required": ["results", "errors"],
+}
+
+ResultCallback = Callable[[dict[str, Any], int, int], Awaitable[None]]
+
+
+async def handle(
+    data_ids: list[str],
+    store: DataStore,
+    worker_pool: WorkerPool,
+    only_significant: bool = False,
+    sort_by: str | None = None,
+    top_k: int | None = _DEFAULT_TOP_K,
+    on_result: ResultCallback | None = None,
+) -> dict[str, Any]:
+    try:
+        if sort_by and sort_by not in SORT_KEYS:
+            return {"error": {"message": f"sort_by must be one of: {', '.join(SORT_KEYS)}."}}
+        if top_k is not None and top_k < 0:
+            return {"error": {"message": "top_k must not be negative."}}
+
+        data_ids = list(dict.fromkeys(data_ids))
+        jobs = await run_locked(
+            store.lock,
+            lambda: [_build_job(data_id, store, bool(only_significant), sort_by, top_k) for data_id in data_ids],
+        )
+        errors: list[dict[str, Any]] = []
+        tasks = []
+        for data_id, job in zip(data_ids, jobs):
+            if job is None:
+                errors.append({"data_id": data_id, "message": "No dataset found for the given data_id."})
+                continue
+            tasks.append(asyncio.ensure_future(_run_job(data_id, job, worker_pool)))
+
+        results: dict[str, dict[str, Any]] = {}
+        total = len(tasks)
+        for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+            data_id, result, error = await task
+            if error is not None:
+                errors.append({"data_id": data_id, "message": error})
+                item = {"data_id": data_id, "error": error}
+            else:
+                results[data_id] = item = result
+            if on_result is not None:
+                await on_result(item, done, total)
+
+        return {
+            "results": [results[data_id] for data_id in data_ids if data_id in results],
+            "errors": errors,
+        }
+    except Exception as exc:
+        return {"error": {"message": f"Failed to run batch analysis: {exc}"}}
+
+
+def _build_job(
+    data_id: str,
+    store: DataStore,
+    only_significant: bool,
+    sort_by: str | None,
+    top_k: int | None,
+) -> dict[str, Any] | None:
+    disk_root = store.disk_location(data_id)
+    table = None
+    if disk_root is None:
+        dataset = store.get_data(data_id)
+        if not dataset:
+            return None
+        table = dataset["table"]
+    return {
+        "data_id": data_id,
+        "storage_id": store.resolve(data_id),
+        "table": table,
+        "disk_root": disk_root,
+        "default_threshold_percent": config.DEFAULT_THRESHOLD_PERCENT,
+        "only_significant": only_significant,
+        "sort_by": sort_by,
+        "top_k": top_k,
+    }
+
+
+async def _run_job(
+    data_id: str,
+    job: dict[str, Any],
+    worker_pool: WorkerPool,
+) -> tuple[str, dict[str, Any] | None, str | None]:
+    try:
+        return data_id, await worker_pool.run(analyze_dataset, job), None
+    except Exception as exc:
+        return data_id, None, str(exc) or type(exc).__name__
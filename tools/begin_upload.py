@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any
+
+from flux_analysis_agent.core.data_store import DataStore
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "data_name": {
+            "type": "string",
+            "description": "Optional name/label for the dataset for reference.",
+            "examples": ["Q1 Financials", "GL Extract 2025-03"],
+        },
+    },
+    "required": [],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "upload_id": {
+            "type": "string",
+            "description": "Identifier of the upload session to pass to append_upload_chunk and commit_upload.",
+        },
+        "next_chunk_index": {
+            "type": "integer",
+            "description": "Index expected for the next chunk (always 0 for a new session).",
+        },
+    },
+    "required": ["upload_id", "next_chunk_index"],
+}
+
+
+async def handle(
+    data_name: str | None,
+    store: DataStore,
+) -> dict[str, Any]:
+    try:
+        upload_id = await asyncio.to_thread(store.begin_upload, data_name=data_name)
+        return {"upload_id": upload_id, "next_chunk_index": 0}
+    except Exception as exc:
+        return {"error": {"message": f"Failed to start upload: {exc}"}}
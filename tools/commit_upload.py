@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any
+
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.llm_manager import LLMManager
+from flux_analysis_agent.core.schema_cache import SchemaCache
+from flux_analysis_agent.tools import upload_data
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "upload_id": {
+            "type": "string",
+            "description": "Identifier of the upload session (from begin_upload).",
+        },
+        "profile": {
+            "type": "boolean",
+            "description": "Capture a cProfile and stage timeline for this call; its profile_id is returned for get_profiles.",
+            "default": False,
+        },
+    },
+    "required": ["upload_id"],
+}
+
+OUTPUT_SCHEMA = upload_data.OUTPUT_SCHEMA
+
+
+async def handle(
+    upload_id: str,
+    store: DataStore,
+    llm: LLMManager | None,
+    schema_cache: SchemaCache | None = None,
+) -> dict[str, Any]:
+    try:
+        data_id = await asyncio.to_thread(store.commit_upload, upload_id)
+        return await upload_data.describe_upload(data_id, store, llm, schema_cache)
+    except Exception as exc:
+        return {"error": {"message": f"Failed to commit upload: {exc}"}}
@@ -0,0 +1,42 @@
+from typing import Any
+
+from flux_analysis_agent.core.concurrency import run_locked
+from flux_analysis_agent.core.data_store import DataStore
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "data_id": {
+            "type": "string",
+            "description": "The identifier of the dataset to delete (as returned by upload_data).",
+        },
+    },
+    "required": ["data_id"],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "data_id": {"type": "string"},
+        "deleted": {"type": "boolean"},
+        "storage_released": {
+            "type": "boolean",
+            "description": "False when other data_ids still share the stored dataset, so only this id was removed.",
+        },
+    },
+    "required": ["data_id", "deleted", "storage_released"],
+}
+
+
+async def handle(data_id: str, store: DataStore) -> dict[str, Any]:
+    try:
+        return await run_locked(store.lock, _delete, data_id, store)
+    except Exception as exc:
+        return {"error": {"message": f"Failed to delete data: {exc}"}}
+
+
+def _delete(data_id: str, store: DataStore) -> dict[str, Any]:
+    shared = store.describe(data_id).get("references", 1) > 1
+    if not store.delete_data(data_id):
+        return {"error": {"message": "No dataset found for the given data_id."}}
+    return {"data_id": data_id, "deleted": True, "storage_released": not shared}
@@ -1,10 +1,29 @@
+import asyncio
 import json
+import time
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from flux_analysis_agent import config
-from flux_analysis_agent.core import analysis_engine
+from flux_analysis_agent.core import query_engine
+from flux_analysis_agent.core.analysis_engine import FluxColumns
+from flux_analysis_agent.core.answer_cache import AnswerCache, answer_key
+from flux_analysis_agent.core.concurrency import run_locked
 from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.flux_cache import FluxCache
+from flux_analysis_agent.core.flux_payload import build_flux_payload, compact_record
 from flux_analysis_agent.core.llm_manager import LLMManager
+from flux_analysis_agent.core.profiling import stage
+from flux_analysis_agent.core.query_engine import DatasetIndex
+from flux_analysis_agent.core.rollups import get_rollups
+
+_DEFAULT_LIMIT = 10
+_MAX_LIMIT = 50
+_MAX_GROUPS = 50
+_DEFAULT_PREFIX_LENGTH = 4
+_PROMPT_CATEGORIES = 10
+
+ProgressCallback = Callable[[str, str], Awaitable[None]]
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -17,6 +36,11 @@ INPUT_SCHEMA = {
             "type": "string",
             "description": "The user's question or request regarding the data.",
         },
+        "profile": {
+            "type": "boolean",
+            "description": "Capture a cProfile and stage timeline for this call; its profile_id is returned for get_profiles.",
+            "default": False,
+        },
     },
     "required": ["data_id", "query"],
 }
@@ -27,7 +51,18 @@ OUTPUT_SCHEMA = {
         "explanation": {
             "type": "string",
             "description": "A detailed answer or explanation addressing the query.",
-        }
+        },
+        "cached": {
+            "type": "boolean",
+            "description": (
+                "True when the answer was served from the answer cache or shared with an identical "
+                "question already in progress."
+            ),
+        },
+        "profile_id": {
+            "type": "string",
+            "description": "Identifier of the captured profile, present when profile was requested.",
+        },
     },
     "required": ["explanation"],
 }
@@ -38,38 +73,69 @@ async def handle(
     query: str,
     store: DataStore,
     llm: LLMManager | None,
+    flux_cache: FluxCache,
+    on_progress: ProgressCallback | None = None,
+    answer_cache: AnswerCache | None = None,
 ) -> dict[str, Any]:
     if not llm:
         return {"error": {"message": "LLM is not configured on the server."}}
+    if answer_cache is None:
+        return await _answer(data_id, query, store, llm, flux_cache, on_progress)
 
     try:
-        dataset = store.get_data(data_id)
-        if not dataset:
+        key = await run_locked(store.locked(data_id), _answer_key, data_id, query, store, llm.model)
+        if key is None:
             return {"error": {"message": "No dataset found for the given data_id."}}
 
-        data = dataset["data"]
-        meta = dataset.get("meta", {})
-        variances = analysis_engine.compute_flux(
-            data,
-            {
-                "only_significant": False,
-                "default_threshold_percent": config.DEFAULT_THRESHOLD_PERCENT,
-            },
-        )
+        async def on_wait() -> None:
+            if on_progress is not None:
+                await on_progress("stage", "Waiting for the same question already in progress")
 
-        summary = _summarize_variances(variances)
-        schema_summary = meta.get("schema_description") or meta.get("schema_summary")
+        with stage("answer_cache"):
+            result, outcome = await answer_cache.get_or_compute(
+                key,
+                lambda: _answer(data_id, query, store, llm, flux_cache, on_progress),
+                on_wait,
+            )
+    except Exception as exc:
+        return {"error": {"message": f"Analysis agent is currently unavailable. {exc}"}}
+    if "error" not in result:
+        result["cached"] = outcome != "miss"
+    return result
 
-        messages = _build_messages(query, schema_summary, meta.get("columns", []), summary)
-        tools = [_compute_flux_tool_schema()]
 
-        response = llm.chat(messages, tools=tools)
+async def _answer(
+    data_id: str,
+    query: str,
+    store: DataStore,
+    llm: LLMManager,
+    flux_cache: FluxCache,
+    on_progress: ProgressCallback | None,
+) -> dict[str, Any]:
+    try:
+        if on_progress is not None:
+            await on_progress("stage", "Computing variances")
+        messages = await run_locked(store.locked(data_id), _prepare_messages, data_id, query, store, flux_cache)
+        if messages is None:
+            return {"error": {"message": "No dataset found for the given data_id."}}
+        tools = [_compute_flux_tool_schema(), *_query_tool_schemas()]
+
+        with stage("llm_round_0"):
+            response = await _chat(llm, messages, tools, on_progress)
         message = llm.extract_message(response)
 
-        if getattr(message, "tool_calls", None):
-            tool_messages = _handle_tool_calls(message.tool_calls, data)
+        rounds = 0
+        while getattr(message, "tool_calls", None) and rounds < config.AGENT_MAX_TOOL_ROUNDS:
+            rounds += 1
+            if on_progress is not None:
+                names = ", ".join(dict.fromkeys(call.function.name for call in message.tool_calls))
+                await on_progress("stage", f"Calling {names}")
+            with stage(f"tools_round_{rounds}"):
+                tool_messages = await _handle_tool_calls(message.tool_calls, data_id, store, flux_cache)
             messages.extend(tool_messages)
-            response = llm.chat(messages, tools=tools)
+            final_round = rounds >= config.AGENT_MAX_TOOL_ROUNDS
+            with stage(f"llm_round_{rounds}"):
+                response = await _chat(llm, messages, None if final_round else tools, on_progress)
             message = llm.extract_message(response)
 
         explanation = (message.content or "").strip()
@@ -81,11 +147,88 @@ async def handle(
         return {"error": {"message": f"Analysis agent is currently unavailable. {exc}"}}
 
 
+async def _chat(
+    llm: LLMManager,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    on_progress: ProgressCallback | None,
+) -> Any:
+    if on_progress is None:
+        return await llm.achat(messages, tools=tools)
+    draft = _Draft(on_progress, config.AGENT_PROGRESS_INTERVAL_SECONDS)
+    response = await llm.achat(messages, tools=tools, on_token=draft.add)
+    await draft.flush()
+    return response
+
+
+class _Draft:
+    def __init__(self, on_progress: ProgressCallback, interval_seconds: float) -> None:
+        self._on_progress = on_progress
+        self._interval_seconds = interval_seconds
+        self._parts: list[str] = []
+        self._sent = 0
+        self._next_send = 0.0
+
+    async def add(self, text: str) -> None:
+        if not self._parts:
+            await self._on_progress("stage", "Drafting the answer")
+        self._parts.append(text)
+        if time.monotonic() >= self._next_send:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._sent == len(self._parts):
+            return
+        self._sent = len(self._parts)
+        self._next_send = time.monotonic() + self._interval_seconds
+        await self._on_progress("draft", "".join(self._parts))
+
+
+def _answer_key(data_id: str, query: str, store: DataStore, model: str) -> str | None:
+    dataset = store.get_data(data_id)
+    if not dataset:
+        return None
+    meta = dataset.get("meta", {})
+    content = (meta.get("content_hashes") or {}).get("rows")
+    if content is None:
+        content = f"{store.resolve(data_id)}@{dataset.get('revision', 0)}"
+    if meta.get("schema_description"):
+        content = f"{content}+described"
+    return answer_key(content, query, config.DEFAULT_THRESHOLD_PERCENT, model)
+
+
+def _prepare_messages(
+    data_id: str,
+    query: str,
+    store: DataStore,
+    flux_cache: FluxCache,
+) -> list[dict[str, Any]] | None:
+    dataset = store.get_data(data_id)
+    if not dataset:
+        return None
+
+    meta = dataset.get("meta", {})
+    selection = flux_cache.select(
+        data_id,
+        default_threshold_percent=config.DEFAULT_THRESHOLD_PERCENT,
+        sort_by="abs_change_amount",
+    )
+    with stage("summarize"):
+        variances = selection[0].to_records(selection[1][:5]) if selection else []
+
+        summary = _summarize_variances(variances)
+        categories = [compact_record(item) for item in get_rollups(dataset).summary()[:_PROMPT_CATEGORIES]]
+        schema_summary = meta.get("schema_description") or meta.get("schema_summary")
+
+        return _build_messages(query, schema_summary, meta.get("columns", []), summary, categories)
+
+
 def _build_messages(
     query: str,
     schema_summary: str | None,
     columns: list[str],
     variance_summary: list[dict[str, Any]],
+    category_summary: list[dict[str, Any]] | None = None,
 ) -> list[dict[str, Any]]:
     system_prompt = (
         "You are an AI financial analyst. Use only the data provided. "
@@ -100,6 +243,8 @@ def _build_messages(
         user_parts.append(f"Columns: {', '.join(columns)}")
     if variance_summary:
         user_parts.append(f"Top variances (JSON): {json.dumps(variance_summary)}")
+    if category_summary:
+        user_parts.append(f"Largest category changes (JSON): {json.dumps(category_summary)}")
 
     user_prompt = "\n".join(user_parts)
 
@@ -141,7 +286,11 @@ def _compute_flux_tool_schema() -> dict[str, Any]:
         "type": "function",
         "function": {
             "name": "compute_flux",
-            "description": "Compute period-over-period changes for the dataset.",
+            "description": (
+                "Compute period-over-period changes for the dataset. Returns per-category totals "
+                "and the largest variances ranked by absolute change, trimmed to fit the context; "
+                "truncated is true when some entries were left out."
+            ),
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -156,50 +305,247 @@ def _compute_flux_tool_schema() -> dict[str, Any]:
     }
 
 
-def _handle_tool_calls(tool_calls: list[Any], data: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    messages: list[dict[str, Any]] = []
-    tool_call_entries: list[dict[str, Any]] = []
-    tool_messages: list[dict[str, Any]] = []
+def _query_tool_schemas() -> list[dict[str, Any]]:
+    selection_properties = {
+        "category": {
+            "type": "string",
+            "description": "Keep only accounts in this category (case-insensitive).",
+        },
+        "account_pattern": {
+            "type": "string",
+            "description": (
+                "Match account_id or account_name. Supports * and ? wildcards; "
+                "without wildcards it matches a substring."
+            ),
+        },
+        "filters": {
+            "type": "object",
+            "description": "Other column equality filters, e.g. {\"region\": \"EMEA\"}.",
+            "additionalProperties": {"type": "string"},
+        },
+        "only_significant": {
+            "type": "boolean",
+            "description": "Keep only entries exceeding thresholds.",
+        },
+    }
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": "filter_accounts",
+                "description": (
+                    "Filter accounts and return their totals plus the largest variances ranked by "
+                    "absolute change."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        **selection_properties,
+                        "limit": {
+                            "type": "integer",
+                            "description": f"Maximum variances to return (default {_DEFAULT_LIMIT}).",
+                        },
+                    },
+                    "required": [],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "group_by_sum",
+                "description": (
+                    "Sum current, prior and change amounts per group, largest absolute change first. "
+                    "Accepts the same filters as filter_accounts."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "by": {
+                            "type": "string",
+                            "description": (
+                                "Column to group by (e.g. category), or account_prefix to group by "
+                                "the leading characters of account_id."
+                            ),
+                        },
+                        "prefix_length": {
+                            "type": "integer",
+                            "description": (
+                                "Characters of account_id to keep for account_prefix "
+                                f"(default {_DEFAULT_PREFIX_LENGTH})."
+                            ),
+                        },
+                        **selection_properties,
+                        "limit": {
+                            "type": "integer",
+                            "description": f"Maximum groups to return (default {_MAX_GROUPS}).",
+                        },
+                    },
+                    "required": ["by"],
+                },
+            },
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "lookup_account",
+                "description": "Return the variance entries for one account_id.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "account_id": {"type": "string", "description": "Account identifier."},
+                    },
+                    "required": ["account_id"],
+                },
+            },
+        },
+    ]
+
 
-    for call in tool_calls:
-        name = call.function.name
-        if name != "compute_flux":
-            continue
-        try:
-            args = json.loads(call.function.arguments or "{}")
-        except json.JSONDecodeError:
-            args = {}
+async def _handle_tool_calls(
+    tool_calls: list[Any],
+    data_id: str,
+    store: DataStore,
+    flux_cache: FluxCache,
+) -> list[dict[str, Any]]:
+    results = await asyncio.gather(
+        *(_run_tool_call(call, data_id, store, flux_cache) for call in tool_calls)
+    )
 
-        only_significant = bool(args.get("only_significant", False))
-        variances = analysis_engine.compute_flux(
-            data,
-            {
-                "only_significant": only_significant,
-                "default_threshold_percent": config.DEFAULT_THRESHOLD_PERCENT,
+    tool_call_entries = [
+        {
+            "id": call.id,
+            "type": "function",
+            "function": {
+                "name": call.function.name,
+                "arguments": call.function.arguments,
             },
-        )
-        result_payload = json.dumps({"variances": variances})
-
-        tool_call_entries.append(
-            {
-                "id": call.id,
-                "type": "function",
-                "function": {
-                    "name": name,
-                    "arguments": call.function.arguments,
-                },
-            }
-        )
-        tool_messages.append(
+        }
+        for call in tool_calls
+    ]
+    messages: list[dict[str, Any]] = [{"role": "assistant", "tool_calls": tool_call_entries}]
+    for call, result_payload in zip(tool_calls, results):
+        messages.append(
             {
                 "role": "tool",
                 "tool_call_id": call.id,
                 "content": result_payload,
             }
         )
+    return messages
 
-    if tool_call_entries:
-        messages.append({"role": "assistant", "tool_calls": tool_call_entries})
-        messages.extend(tool_messages)
 
-    return messages
+async def _run_tool_call(call: Any, data_id: str, store: DataStore, flux_cache: FluxCache) -> str:
+    name = call.function.name
+    try:
+        args = json.loads(call.function.arguments or "{}")
+    except json.JSONDecodeError:
+        args = {}
+    if not isinstance(args, dict):
+        args = {}
+
+    try:
+        if name == "compute_flux":
+            only_significant = bool(args.get("only_significant", False))
+            return await run_locked(
+                store.locked(data_id), _compute_flux_payload, data_id, only_significant, store, flux_cache
+            )
+
+        query = _QUERY_TOOLS.get(name)
+        if query is None:
+            return json.dumps({"error": f"Unknown tool: {name}."})
+        return await run_locked(store.locked(data_id), _run_query, query, data_id, store, flux_cache, args)
+    except Exception as exc:
+        return json.dumps({"error": f"{name} failed: {exc}"})
+
+
+def _run_query(
+    query: Callable[[FluxColumns, DatasetIndex, dict[str, Any]], dict[str, Any]],
+    data_id: str,
+    store: DataStore,
+    flux_cache: FluxCache,
+    args: dict[str, Any],
+) -> str:
+    dataset = store.get_data(data_id)
+    flux = flux_cache.get_flux(data_id, default_threshold_percent=config.DEFAULT_THRESHOLD_PERCENT)
+    if not dataset or flux is None:
+        return json.dumps({"error": "No dataset found for the given data_id."})
+    index = query_engine.get_index(dataset)
+
+    try:
+        result = query(flux, index, args)
+    except (TypeError, ValueError) as exc:
+        result = {"error": str(exc)}
+    return json.dumps(result, separators=(",", ":"))
+
+
+def _filter_accounts(flux: FluxColumns, index: DatasetIndex, args: dict[str, Any]) -> dict[str, Any]:
+    positions = _select(flux, index, args)
+    limit = _bounded_int(args.get("limit"), _DEFAULT_LIMIT, _MAX_LIMIT)
+    return query_engine.top_variances(flux, positions, limit)
+
+
+def _group_by_sum(flux: FluxColumns, index: DatasetIndex, args: dict[str, Any]) -> dict[str, Any]:
+    by = str(args.get("by") or "category")
+    positions = _select(flux, index, args)
+    prefix_length = _bounded_int(args.get("prefix_length"), _DEFAULT_PREFIX_LENGTH, 64)
+    limit = _bounded_int(args.get("limit"), _MAX_GROUPS, _MAX_GROUPS)
+    return query_engine.group_variances(flux, positions, by, prefix_length, limit)
+
+
+def _lookup_account(flux: FluxColumns, index: DatasetIndex, args: dict[str, Any]) -> dict[str, Any]:
+    account_id = str(args.get("account_id") or "").strip()
+    if not account_id:
+        raise ValueError("account_id is required.")
+    return query_engine.lookup_account(flux, index, account_id)
+
+
+def _select(flux: FluxColumns, index: DatasetIndex, args: dict[str, Any]) -> list[int]:
+    filters = args.get("filters") or {}
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object mapping column names to values.")
+    filters = dict(filters)
+    if args.get("category"):
+        filters["category"] = args["category"]
+    return query_engine.select_positions(
+        flux,
+        index,
+        filters=filters,
+        account_pattern=args.get("account_pattern") or None,
+        only_significant=bool(args.get("only_significant", False)),
+    )
+
+
+def _bounded_int(value: Any, default: int, maximum: int) -> int:
+    if value is None:
+        return default
+    return max(1, min(int(value), maximum))
+
+
+def _compute_flux_payload(
+    data_id: str,
+    only_significant: bool,
+    store: DataStore,
+    flux_cache: FluxCache,
+) -> str:
+    dataset = store.get_data(data_id)
+    selection = flux_cache.select(
+        data_id,
+        only_significant=only_significant,
+        default_threshold_percent=config.DEFAULT_THRESHOLD_PERCENT,
+        sort_by="abs_change_amount",
+    )
+    if not dataset or selection is None:
+        return json.dumps({"error": "No dataset found for the given data_id."})
+
+    flux, positions, _ = selection
+    category_totals = get_rollups(dataset).summary()
+    with stage("serialize"):
+        return build_flux_payload(flux, positions, category_totals, only_significant=only_significant)
+
+
+_QUERY_TOOLS: dict[str, Callable[[FluxColumns, DatasetIndex, dict[str, Any]], dict[str, Any]]] = {
+    "filter_accounts": _filter_accounts,
+    "group_by_sum": _group_by_sum,
+    "lookup_account": _lookup_account,
+}
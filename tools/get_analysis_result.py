@@ -1,7 +1,13 @@
+import base64
+import hashlib
+import json
 from typing import Any
 
-from flux_analysis_agent.core import analysis_engine
+from flux_analysis_agent.core.analysis_engine import SORT_KEYS
+from flux_analysis_agent.core.concurrency import run_locked
 from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.flux_cache import FluxCache
+from flux_analysis_agent.core.profiling import stage
 from flux_analysis_agent import config
 
 INPUT_SCHEMA = {
@@ -16,6 +22,40 @@ INPUT_SCHEMA = {
             "description": "If true, only include variances that exceed the defined threshold in the results.",
             "default": False,
         },
+        "sort_by": {
+            "type": "string",
+            "enum": list(SORT_KEYS),
+            "description": (
+                "Optional server-side ordering: largest absolute change amount or percent first, "
+                "or ascending account_id. Defaults to dataset order."
+            ),
+        },
+        "category": {
+            "anyOf": [
+                {"type": "string"},
+                {"type": "array", "items": {"type": "string"}},
+            ],
+            "description": "Only include accounts in this category (or any of these categories).",
+        },
+        "top_k": {
+            "type": "integer",
+            "minimum": 0,
+            "description": "Limit the result to the first k entries after filtering and sorting.",
+        },
+        "page_size": {
+            "type": "integer",
+            "minimum": 1,
+            "description": "Return at most this many entries per call, with a next_cursor for the rest.",
+        },
+        "cursor": {
+            "type": "string",
+            "description": "next_cursor from a previous call with the same options, to fetch the next page.",
+        },
+        "profile": {
+            "type": "boolean",
+            "description": "Capture a cProfile and stage timeline for this call; its profile_id is returned for get_profiles.",
+            "default": False,
+        },
     },
     "required": ["data_id"],
 }
@@ -66,7 +106,20 @@ OUTPUT_SCHEMA = {
                     "exceeds_threshold",
                 ],
             },
-        }
+        },
+        "total_count": {
+            "type": "integer",
+            "description": "Number of entries matching the filters (after top_k), when sorting, filtering or paging is used.",
+        },
+        "next_cursor": {
+            "type": "string",
+            "description": "Cursor for the next page, or null when there are no more entries.",
+            "nullable": True,
+        },
+        "profile_id": {
+            "type": "string",
+            "description": "Identifier of the captured profile, present when profile was requested.",
+        },
     },
     "required": ["variances"],
 }
@@ -76,19 +129,122 @@ async def handle(
     data_id: str,
     only_significant: bool,
     store: DataStore,
+    flux_cache: FluxCache,
+    sort_by: str | None = None,
+    category: str | list[str] | None = None,
+    top_k: int | None = None,
+    page_size: int | None = None,
+    cursor: str | None = None,
 ) -> dict[str, Any]:
     try:
-        dataset = store.get_data(data_id)
-        if not dataset:
+        return await run_locked(
+            store.locked(data_id),
+            _analyze,
+            data_id,
+            only_significant,
+            store,
+            flux_cache,
+            sort_by,
+            category,
+            top_k,
+            page_size,
+            cursor,
+        )
+    except Exception as exc:
+        return {"error": {"message": f"Failed to compute analysis: {exc}"}}
+
+
+def _analyze(
+    data_id: str,
+    only_significant: bool,
+    store: DataStore,
+    flux_cache: FluxCache,
+    sort_by: str | None,
+    category: str | list[str] | None,
+    top_k: int | None,
+    page_size: int | None,
+    cursor: str | None,
+) -> dict[str, Any]:
+    dataset = store.get_data(data_id)
+    if not dataset:
+        return {"error": {"message": "No dataset found for the given data_id."}}
+
+    categories = [category] if isinstance(category, str) else list(category or [])
+    if not (sort_by or categories or top_k is not None or page_size or cursor):
+        with stage("serialize"):
+            variances = flux_cache.get_variances(
+                data_id,
+                only_significant=only_significant,
+                default_threshold_percent=config.DEFAULT_THRESHOLD_PERCENT,
+            )
+        if variances is None:
             return {"error": {"message": "No dataset found for the given data_id."}}
+        return {"variances": variances}
 
-        variances = analysis_engine.compute_flux(
-            dataset["data"],
-            {
-                "only_significant": only_significant,
-                "default_threshold_percent": config.DEFAULT_THRESHOLD_PERCENT,
-            },
+    if sort_by and sort_by not in SORT_KEYS:
+        return {"error": {"message": f"sort_by must be one of: {', '.join(SORT_KEYS)}."}}
+    if top_k is not None and top_k < 0:
+        return {"error": {"message": "top_k must not be negative."}}
+    if page_size is not None and page_size < 1:
+        return {"error": {"message": "page_size must be at least 1."}}
+
+    with stage("select"):
+        selection = flux_cache.select(
+            data_id,
+            only_significant=only_significant,
+            default_threshold_percent=config.DEFAULT_THRESHOLD_PERCENT,
+            sort_by=sort_by,
+            categories=categories,
         )
-        return {"variances": variances}
-    except Exception as exc:
-        return {"error": {"message": f"Failed to compute analysis: {exc}"}}
\ No newline at end of file
+    if selection is None:
+        return {"error": {"message": "No dataset found for the given data_id."}}
+
+    flux, positions, revision = selection
+    total = len(positions) if top_k is None else min(top_k, len(positions))
+    signature = _query_signature(store.resolve(data_id), revision, only_significant, sort_by, categories, top_k)
+    offset = _decode_cursor(cursor, signature) if cursor else 0
+    end = total if page_size is None else min(total, offset + page_size)
+
+    with stage("serialize"):
+        variances = flux.to_records(positions[offset:end])
+    return {
+        "variances": variances,
+        "total_count": total,
+        "next_cursor": _encode_cursor(signature, end) if end < total else None,
+    }
+
+
+def _query_signature(
+    storage_id: str,
+    revision: int,
+    only_significant: bool,
+    sort_by: str | None,
+    categories: list[str],
+    top_k: int | None,
+) -> str:
+    payload = json.dumps(
+        [
+            storage_id,
+            revision,
+            bool(only_significant),
+            sort_by,
+            sorted(set(categories)),
+            top_k,
+            config.DEFAULT_THRESHOLD_PERCENT,
+        ]
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_cursor(signature: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{signature}:{offset}".encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, signature: str) -> int:
+    try:
+        cursor_signature, offset = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split(":")
+        if cursor_signature == signature and int(offset) >= 0:
+            return int(offset)
+    except (ValueError, UnicodeError):
+        pass
+    raise ValueError("Invalid or expired cursor; repeat the request without a cursor.")
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any
+
+from flux_analysis_agent.core.answer_cache import AnswerCache
+from flux_analysis_agent.core.flux_cache import FluxCache
+from flux_analysis_agent.core.schema_cache import SchemaCache
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {},
+    "required": [],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "flux_cache": {
+            "type": "object",
+            "description": "Cached flux results: entries, bytes, max_bytes, hits and misses.",
+        },
+        "schema_cache": {
+            "type": "object",
+            "description": "Schema inference cache: entries, hits, misses and hit_rate (0-1).",
+        },
+        "answer_cache": {
+            "type": "object",
+            "description": (
+                "flux_agent answer cache: entries, in_flight, hits, misses, coalesced and hit_rate (0-1, "
+                "counting coalesced calls as hits)."
+            ),
+        },
+    },
+    "required": ["flux_cache", "schema_cache", "answer_cache"],
+}
+
+
+async def handle(
+    flux_cache: FluxCache,
+    schema_cache: SchemaCache,
+    answer_cache: AnswerCache,
+) -> dict[str, Any]:
+    try:
+        return await asyncio.to_thread(_read_stats, flux_cache, schema_cache, answer_cache)
+    except Exception as exc:
+        return {"error": {"message": f"Failed to read cache statistics: {exc}"}}
+
+
+def _read_stats(flux_cache: FluxCache, schema_cache: SchemaCache, answer_cache: AnswerCache) -> dict[str, Any]:
+    return {
+        "flux_cache": flux_cache.stats(),
+        "schema_cache": schema_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+    }
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any
+
+from flux_analysis_agent.core.metrics import MetricsRegistry
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {},
+    "required": [],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "uptime_seconds": {"type": "number"},
+        "counters": {
+            "type": "object",
+            "description": (
+                "Counters by name (tool_calls_total, tool_errors_total, llm_requests_total, llm_errors_total, "
+                "llm_prompt_tokens_total, llm_completion_tokens_total), each a list of {labels, value}."
+            ),
+        },
+        "histograms": {
+            "type": "object",
+            "description": (
+                "Histograms by name (tool_latency_seconds, tool_request_bytes, tool_response_bytes, "
+                "tool_result_rows, llm_latency_seconds), each a list of {labels, count, sum, mean, p50, p90, p99}. "
+                "Quantiles are estimated from the bucket counts."
+            ),
+        },
+        "store": {"type": "object", "description": "Data store memory usage and budget."},
+        "flux_cache": {"type": "object", "description": "Flux result cache entries, bytes, hits and misses."},
+        "schema_cache": {"type": "object", "description": "Schema inference cache entries, hits and misses."},
+        "answer_cache": {
+            "type": "object",
+            "description": "flux_agent answer cache entries, in-flight answers, hits, misses and coalesced calls.",
+        },
+        "tool_limiter": {
+            "type": "object",
+            "description": "Active, waiting and rejected CPU-bound tool calls under the concurrency cap.",
+        },
+    },
+    "required": ["uptime_seconds", "counters", "histograms"],
+}
+
+
+async def handle(metrics: MetricsRegistry) -> dict[str, Any]:
+    try:
+        return await asyncio.to_thread(metrics.snapshot)
+    except Exception as exc:
+        return {"error": {"message": f"Failed to collect metrics: {exc}"}}
@@ -0,0 +1,154 @@
+from typing import Any
+
+from flux_analysis_agent import config
+from flux_analysis_agent.core.analysis_engine import compute_period_flux
+from flux_analysis_agent.core.concurrency import run_locked
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.schema_inference import detect_period_columns
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "data_id": {
+            "type": "string",
+            "description": "The identifier of the dataset to analyze (as returned by upload_data).",
+        },
+        "period_columns": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": (
+                "Period amount columns, oldest first. Defaults to the columns detected as periods "
+                "from the dataset's column_types and names (e.g. 2024-01, Jan-24, Q1 2024, P01)."
+            ),
+        },
+        "only_significant": {
+            "type": "boolean",
+            "description": "If true, only include accounts where at least one period change exceeds its threshold.",
+            "default": False,
+        },
+        "rolling_window": {
+            "type": "integer",
+            "minimum": 1,
+            "description": "Number of periods in the rolling mean (default 3).",
+            "default": 3,
+        },
+        "top_k": {
+            "type": "integer",
+            "minimum": 0,
+            "description": "Limit the result to the first k accounts.",
+        },
+    },
+    "required": ["data_id"],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "periods": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Period columns in order. Per-account arrays are indexed by this list.",
+        },
+        "rolling_window": {"type": "integer"},
+        "total_count": {"type": "integer", "description": "Number of matching accounts before top_k."},
+        "accounts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "account_id": {"type": "string"},
+                    "account_name": {"type": "string"},
+                    "category": {"type": "string"},
+                    "amounts": {
+                        "type": "array",
+                        "description": "Amount per period (null when missing).",
+                    },
+                    "changes": {
+                        "type": "array",
+                        "description": "changes[i] = amounts[i + 1] - amounts[i] (null when either is missing).",
+                    },
+                    "change_percents": {
+                        "type": "array",
+                        "description": "Percent change per consecutive pair (null when the earlier amount is 0 or missing).",
+                    },
+                    "exceeds": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "Indexes into changes that meet/exceed the threshold.",
+                    },
+                    "rolling_mean": {
+                        "type": "array",
+                        "description": "Mean of the available amounts in the rolling window ending at each period.",
+                    },
+                    "mean_change": {"type": "number", "nullable": True},
+                    "stdev_change": {"type": "number", "nullable": True},
+                },
+            },
+        },
+    },
+    "required": ["periods", "total_count", "accounts"],
+}
+
+
+async def handle(
+    data_id: str,
+    store: DataStore,
+    period_columns: list[str] | None = None,
+    only_significant: bool = False,
+    rolling_window: int = 3,
+    top_k: int | None = None,
+) -> dict[str, Any]:
+    try:
+        return await run_locked(
+            store.locked(data_id),
+            _analyze,
+            data_id,
+            store,
+            period_columns,
+            only_significant,
+            rolling_window,
+            top_k,
+        )
+    except Exception as exc:
+        return {"error": {"message": f"Failed to compute period analysis: {exc}"}}
+
+
+def _analyze(
+    data_id: str,
+    store: DataStore,
+    period_columns: list[str] | None,
+    only_significant: bool,
+    rolling_window: int,
+    top_k: int | None,
+) -> dict[str, Any]:
+    dataset = store.get_data(data_id)
+    if not dataset:
+        return {"error": {"message": "No dataset found for the given data_id."}}
+    if top_k is not None and top_k < 0:
+        return {"error": {"message": "top_k must not be negative."}}
+
+    meta = dataset.get("meta", {})
+    if not period_columns:
+        period_columns = detect_period_columns(
+            meta.get("columns", []), meta.get("column_types"), meta.get("column_profile")
+        )
+        if not period_columns:
+            return {"error": {"message": "No period columns detected; pass period_columns explicitly."}}
+
+    flux = compute_period_flux(
+        dataset["table"],
+        period_columns,
+        config.DEFAULT_THRESHOLD_PERCENT,
+        rolling_window,
+    )
+    positions = flux.significant_positions() if only_significant else list(range(len(flux)))
+    total = len(positions)
+    if top_k is not None:
+        positions = positions[:top_k]
+
+    return {
+        "periods": flux.period_columns,
+        "rolling_window": flux.rolling_window,
+        "total_count": total,
+        "accounts": flux.to_records(positions),
+    }
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any
+
+from flux_analysis_agent.core.profiling import Profiler
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "profile_id": {
+            "type": "string",
+            "description": "Fetch one profile with its stage timeline and top functions. Omit to list recent profiles.",
+        },
+        "data_id": {
+            "type": "string",
+            "description": "When listing, only return profiles captured for this dataset.",
+        },
+        "tool": {
+            "type": "string",
+            "description": "When listing, only return profiles of this tool (e.g. flux_agent, upload_data).",
+        },
+        "limit": {
+            "type": "integer",
+            "minimum": 1,
+            "description": "When listing, the maximum number of profiles (newest first, default 20). "
+            "When fetching, the number of functions in stats (default 40).",
+        },
+        "sort_by": {
+            "type": "string",
+            "enum": ["cumulative", "tottime", "ncalls"],
+            "description": "Ordering of the function statistics when fetching a profile.",
+            "default": "cumulative",
+        },
+    },
+    "required": [],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "profiles": {
+            "type": "array",
+            "description": "Recent profiles, newest first (list mode).",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "profile_id": {"type": "string"},
+                    "tool": {"type": "string"},
+                    "data_id": {"type": "string", "nullable": True},
+                    "started_at": {"type": "number", "description": "Unix timestamp."},
+                    "seconds": {"type": "number"},
+                    "trigger": {"type": "string", "enum": ["requested", "sampled"]},
+                    "failed": {"type": "boolean"},
+                    "cprofile": {
+                        "type": "boolean",
+                        "description": (
+                            "False when another capture held the profiler, so only the timeline was recorded. "
+                            "cProfile covers stages run in worker threads only."
+                        ),
+                    },
+                    "stages": {
+                        "type": "array",
+                        "description": "Timeline entries {stage, start_seconds, seconds}.",
+                    },
+                },
+            },
+        },
+        "profile": {
+            "type": "object",
+            "description": "One profile (fetch mode), with stats text and the path of the .prof file for snakeviz/pstats.",
+        },
+    },
+}
+
+
+async def handle(
+    profiler: Profiler,
+    profile_id: str | None = None,
+    data_id: str | None = None,
+    tool: str | None = None,
+    limit: int | None = None,
+    sort_by: str = "cumulative",
+) -> dict[str, Any]:
+    try:
+        if limit is not None and limit < 1:
+            return {"error": {"message": "limit must be at least 1."}}
+        if profile_id:
+            if sort_by not in ("cumulative", "tottime", "ncalls"):
+                return {"error": {"message": "sort_by must be one of: cumulative, tottime, ncalls."}}
+            profile = await asyncio.to_thread(profiler.get_profile, profile_id, sort_by=sort_by, limit=limit or 40)
+            if profile is None:
+                return {"error": {"message": "No profile found for the given profile_id."}}
+            return {"profile": profile}
+        profiles = await asyncio.to_thread(profiler.list_profiles, data_id=data_id, tool=tool, limit=limit or 20)
+        return {"profiles": profiles}
+    except Exception as exc:
+        return {"error": {"message": f"Failed to read profiles: {exc}"}}
@@ -0,0 +1,95 @@
+from typing import Any
+
+from flux_analysis_agent.core.concurrency import run_locked
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.rollups import CATEGORY_LEVEL, get_rollups
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "data_id": {
+            "type": "string",
+            "description": "The identifier of the dataset (as returned by upload_data).",
+        },
+        "level": {
+            "type": "string",
+            "description": (
+                "Rollup level: category (default), or account_prefix_<n> for each prefix length "
+                "configured in ROLLUP_PREFIX_LENGTHS."
+            ),
+            "default": CATEGORY_LEVEL,
+        },
+        "limit": {
+            "type": "integer",
+            "minimum": 1,
+            "description": "Return only the groups with the largest absolute change.",
+        },
+    },
+    "required": ["data_id"],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "level": {"type": "string"},
+        "levels": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Rollup levels available for this dataset.",
+        },
+        "total_count": {"type": "integer", "description": "Number of groups at this level."},
+        "groups": {
+            "type": "array",
+            "description": "Groups ordered by absolute change amount, largest first.",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "category": {"type": "string"},
+                    "account_prefix": {"type": "string"},
+                    "parent": {
+                        "type": "string",
+                        "description": "Prefix of the next shorter account_prefix level, if any.",
+                    },
+                    "count": {"type": "integer"},
+                    "significant_count": {
+                        "type": "integer",
+                        "description": "Accounts in the group that exceed their threshold.",
+                    },
+                    "current_period_amount": {"type": "number"},
+                    "prior_period_amount": {"type": "number"},
+                    "change_amount": {"type": "number"},
+                },
+            },
+        },
+    },
+    "required": ["level", "levels", "total_count", "groups"],
+}
+
+
+async def handle(
+    data_id: str,
+    store: DataStore,
+    level: str = CATEGORY_LEVEL,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    try:
+        return await run_locked(store.locked(data_id), _read_rollups, data_id, store, level, limit)
+    except Exception as exc:
+        return {"error": {"message": f"Failed to read rollups: {exc}"}}
+
+
+def _read_rollups(data_id: str, store: DataStore, level: str, limit: int | None) -> dict[str, Any]:
+    dataset = store.get_data(data_id)
+    if not dataset:
+        return {"error": {"message": "No dataset found for the given data_id."}}
+    if limit is not None and limit < 1:
+        return {"error": {"message": "limit must be at least 1."}}
+
+    rollups = get_rollups(dataset)
+    groups = rollups.summary(level)
+    return {
+        "level": level,
+        "levels": rollups.levels,
+        "total_count": len(groups),
+        "groups": groups if limit is None else groups[:limit],
+    }
@@ -0,0 +1,83 @@
+from typing import Any
+
+from flux_analysis_agent.core.concurrency import run_locked
+from flux_analysis_agent.core.data_store import DataStore
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {},
+    "required": [],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "datasets": {
+            "type": "array",
+            "description": "Datasets known to the server; loaded ones first, in least- to most-recently-used order.",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "data_id": {"type": "string"},
+                    "data_name": {"type": "string"},
+                    "state": {
+                        "type": "string",
+                        "description": "loaded (in memory), on_disk (persisted, not loaded) or spilled (evicted to the spill cache).",
+                    },
+                    "row_count": {"type": "integer"},
+                    "schema_status": {
+                        "type": "string",
+                        "enum": ["pending", "done", "failed"],
+                        "description": "State of the background LLM schema description.",
+                    },
+                    "schema_summary": {
+                        "type": "string",
+                        "description": "Natural language summary of the schema, once available.",
+                    },
+                    "schema_error": {
+                        "type": "string",
+                        "description": "Why the schema description failed, when schema_status is failed.",
+                    },
+                    "memory_bytes": {
+                        "type": "integer",
+                        "description": "Approximate heap memory held by the dataset's columns.",
+                    },
+                    "mapped_bytes": {
+                        "type": "integer",
+                        "description": "Bytes of column files memory-mapped from disk.",
+                    },
+                    "alias_of": {
+                        "type": "string",
+                        "description": "Set when this upload duplicated an existing dataset; the data_id whose storage it shares.",
+                    },
+                    "references": {
+                        "type": "integer",
+                        "description": "Number of data_ids (this one plus its aliases) sharing the stored dataset, when more than one.",
+                    },
+                },
+                "required": ["data_id", "state"],
+            },
+        },
+        "memory": {
+            "type": "object",
+            "description": "Store-wide memory usage and the configured budget (0 means unlimited).",
+            "properties": {
+                "memory_bytes": {"type": "integer"},
+                "max_memory_bytes": {"type": "integer"},
+                "loaded_datasets": {"type": "integer"},
+            },
+        },
+    },
+    "required": ["datasets", "memory"],
+}
+
+
+async def handle(store: DataStore) -> dict[str, Any]:
+    try:
+        return await run_locked(store.lock, _list, store)
+    except Exception as exc:
+        return {"error": {"message": f"Failed to list datasets: {exc}"}}
+
+
+def _list(store: DataStore) -> dict[str, Any]:
+    return {"datasets": store.list_datasets(), "memory": store.memory_usage()}
@@ -0,0 +1,93 @@
+from typing import Any
+
+from flux_analysis_agent.core.concurrency import run_locked
+from flux_analysis_agent.core.data_store import DataStore
+from flux_analysis_agent.core.flux_cache import FluxCache
+from flux_analysis_agent.core.profiling import stage
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "data_id": {
+            "type": "string",
+            "description": "The identifier of the dataset to update (as returned by upload_data).",
+        },
+        "upserts": {
+            "type": "array",
+            "description": (
+                "Rows to insert or update, keyed by account_id. Existing rows with the same account_id "
+                "are updated in place (only the given columns change); other rows are appended."
+            ),
+            "items": {
+                "type": "object",
+                "properties": {"account_id": {"type": "string"}},
+                "required": ["account_id"],
+            },
+        },
+        "delete_account_ids": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "account_id values whose rows should be removed.",
+        },
+        "profile": {
+            "type": "boolean",
+            "description": "Capture a cProfile and stage timeline for this call; its profile_id is returned for get_profiles.",
+            "default": False,
+        },
+    },
+    "required": ["data_id"],
+}
+
+OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "data_id": {"type": "string"},
+        "revision": {
+            "type": "integer",
+            "description": "Dataset revision after the update. Cursors from earlier revisions are rejected.",
+        },
+        "updated_rows": {"type": "integer"},
+        "inserted_rows": {"type": "integer"},
+        "deleted_rows": {"type": "integer"},
+        "row_count": {"type": "integer"},
+        "profile_id": {
+            "type": "string",
+            "description": "Identifier of the captured profile, present when profile was requested.",
+        },
+    },
+    "required": ["data_id", "revision", "updated_rows", "inserted_rows", "deleted_rows", "row_count"],
+}
+
+
+async def handle(
+    data_id: str,
+    store: DataStore,
+    flux_cache: FluxCache,
+    upserts: list[dict[str, Any]] | None = None,
+    delete_account_ids: list[str] | None = None,
+) -> dict[str, Any]:
+    try:
+        return await run_locked(store.locked(data_id), _update, data_id, store, flux_cache, upserts, delete_account_ids)
+    except Exception as exc:
+        return {"error": {"message": f"Failed to update data: {exc}"}}
+
+
+def _update(
+    data_id: str,
+    store: DataStore,
+    flux_cache: FluxCache,
+    upserts: list[dict[str, Any]] | None,
+    delete_account_ids: list[str] | None,
+) -> dict[str, Any]:
+    with stage("update"):
+        update = store.update_rows(data_id, upserts=upserts, delete_account_ids=delete_account_ids)
+        flux_cache.apply_update(update)
+    dataset = store.get_data(data_id)
+    return {
+        "data_id": data_id,
+        "revision": update.revision,
+        "updated_rows": len(update.updated_rows),
+        "inserted_rows": len(update.inserted_rows),
+        "deleted_rows": len(update.deleted_rows),
+        "row_count": len(dataset["table"]) if dataset else 0,
+    }
@@ -1,8 +1,12 @@
+import asyncio
 from typing import Any
 
 from flux_analysis_agent.core import schema_inference
+from flux_analysis_agent.core.concurrency import run_locked
 from flux_analysis_agent.core.data_store import DataStore
 from flux_analysis_agent.core.llm_manager import LLMManager
+from flux_analysis_agent.core.profiling import stage
+from flux_analysis_agent.core.schema_cache import SchemaCache
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -16,6 +20,11 @@ INPUT_SCHEMA = {
             "description": "Optional name/label for the dataset for reference.",
             "examples": ["Q1 Financials", "Sales Data 2025"],
         },
+        "profile": {
+            "type": "boolean",
+            "description": "Capture a cProfile and stage timeline for this call; its profile_id is returned for get_profiles.",
+            "default": False,
+        },
     },
     "required": ["csv_data"],
 }
@@ -32,42 +41,170 @@ OUTPUT_SCHEMA = {
             "items": {"type": "string"},
             "description": "List of column names detected from the header.",
         },
+        "column_types": {
+            "type": "object",
+            "description": "Heuristic type of each column, available immediately.",
+            "additionalProperties": {"type": "string"},
+        },
+        "column_profile": {
+            "type": "object",
+            "description": (
+                "Per-column statistics over every uploaded row: numeric_rate (share of non-empty values "
+                "that parse as numbers), null_ratio, distinct (estimated for large numeric columns), "
+                "and min/max of the numeric values. Null for datasets stored before profiling was added."
+            ),
+            "additionalProperties": {"type": "object"},
+            "nullable": True,
+        },
         "schema_summary": {
             "type": "string",
-            "description": "Optional natural language summary of the dataset schema or contents.",
+            "description": "Natural language summary of the schema, present when it was served from the schema cache.",
+        },
+        "schema_status": {
+            "type": "string",
+            "enum": ["pending", "done", "failed"],
+            "description": (
+                "State of the LLM schema description, which runs in the background after upload. "
+                "Check list_datasets for the final status."
+            ),
+        },
+        "deduplicated": {
+            "type": "boolean",
+            "description": (
+                "True when the content matched an already stored dataset; data_id is then an alias "
+                "that shares its storage and schema."
+            ),
+        },
+        "profile_id": {
+            "type": "string",
+            "description": "Identifier of the captured profile, present when profile was requested.",
         },
     },
-    "required": ["data_id", "columns"],
+    "required": ["data_id", "columns", "schema_status"],
 }
 
+_background_tasks: set[asyncio.Task] = set()
+
 
 async def handle(
     csv_data: str,
     data_name: str | None,
     store: DataStore,
     llm: LLMManager | None,
+    schema_cache: SchemaCache | None = None,
 ) -> dict[str, Any]:
     try:
-        data_id = store.add_data(csv_data, data_name=data_name)
-        dataset = store.get_data(data_id)
-        if not dataset:
-            return {"error": {"message": "Failed to store dataset."}}
-
-        meta = dataset.get("meta", {})
-        columns = meta.get("columns", [])
-
-        schema_summary = None
-        if llm:
-            schema_info = schema_inference.infer_schema(columns, dataset["data"][:5], llm)
-            store.set_schema(data_id, {
-                "schema_description": schema_info.get("description"),
-                "column_types": schema_info.get("column_types"),
-            })
-            schema_summary = schema_info.get("description")
-
-        result: dict[str, Any] = {"data_id": data_id, "columns": columns}
-        if schema_summary:
-            result["schema_summary"] = schema_summary
-        return result
+        data_id = await asyncio.to_thread(store.add_data, csv_data, data_name=data_name)
+        return await describe_upload(data_id, store, llm, schema_cache)
     except Exception as exc:
-        return {"error": {"message": f"Failed to upload data: {exc}"}}
\ No newline at end of file
+        return {"error": {"message": f"Failed to upload data: {exc}"}}
+
+
+async def describe_upload(
+    data_id: str,
+    store: DataStore,
+    llm: LLMManager | None,
+    schema_cache: SchemaCache | None = None,
+) -> dict[str, Any]:
+    result, sample_rows = await run_locked(
+        store.locked(data_id), _describe, data_id, store, llm is not None, schema_cache
+    )
+    if llm and sample_rows is not None:
+        task = asyncio.create_task(
+            _enrich_schema(
+                data_id, result["columns"], sample_rows, result.get("column_profile"), store, llm, schema_cache
+            )
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return result
+
+
+def _describe(
+    data_id: str,
+    store: DataStore,
+    use_llm: bool,
+    schema_cache: SchemaCache | None,
+) -> tuple[dict[str, Any], list[dict[str, Any]] | None]:
+    dataset = store.get_data(data_id)
+    if not dataset:
+        return {"error": {"message": "Failed to store dataset."}}, None
+
+    meta = dataset.get("meta", {})
+    columns = meta.get("columns", [])
+    profile = meta.get("column_profile")
+    deduplicated = store.resolve(data_id) != data_id
+    if deduplicated and meta.get("schema_status") in ("pending", "done"):
+        result = {
+            "data_id": data_id,
+            "columns": columns,
+            "column_types": meta.get("column_types"),
+            "column_profile": profile,
+            "schema_status": meta["schema_status"],
+            "deduplicated": True,
+        }
+        if meta.get("schema_description"):
+            result["schema_summary"] = meta["schema_description"]
+        return result, None
+
+    sample_rows = dataset["data"][:5]
+
+    cached = None
+    if use_llm:
+        cached = schema_inference.cached_schema(columns, sample_rows, schema_cache)
+    if cached is not None:
+        store.set_schema(data_id, {
+            "schema_description": cached.get("description"),
+            "column_types": cached.get("column_types"),
+            "schema_status": "done",
+        })
+        result: dict[str, Any] = {
+            "data_id": data_id,
+            "columns": columns,
+            "column_types": cached.get("column_types"),
+            "column_profile": profile,
+            "schema_status": "done",
+            "deduplicated": deduplicated,
+        }
+        if cached.get("description"):
+            result["schema_summary"] = cached["description"]
+        return result, None
+
+    with stage("schema"):
+        heuristic = schema_inference.heuristic_schema(columns, sample_rows, profile)
+    status = "pending" if use_llm else "done"
+    store.set_schema(data_id, {
+        "column_types": heuristic.get("column_types"),
+        "schema_status": status,
+    })
+    result = {
+        "data_id": data_id,
+        "columns": columns,
+        "column_types": heuristic.get("column_types"),
+        "column_profile": profile,
+        "schema_status": status,
+        "deduplicated": deduplicated,
+    }
+    return result, sample_rows if use_llm else None
+
+
+async def _enrich_schema(
+    data_id: str,
+    columns: list[str],
+    sample_rows: list[dict[str, Any]],
+    profile: dict[str, dict[str, Any]] | None,
+    store: DataStore,
+    llm: LLMManager,
+    schema_cache: SchemaCache | None,
+) -> None:
+    try:
+        schema_info = await schema_inference.arequest_schema(columns, sample_rows, llm, schema_cache, profile)
+    except Exception as exc:
+        await asyncio.to_thread(store.set_schema, data_id, {"schema_status": "failed", "schema_error": str(exc)})
+        return
+
+    await asyncio.to_thread(store.set_schema, data_id, {
+        "schema_description": schema_info.get("description"),
+        "column_types": schema_info.get("column_types"),
+        "schema_status": "done",
+    })